@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark concurrent summarizations: blocking calls on a thread pool vs. the async client.
+
+The blocking path models sync views, where every in-flight Gemini call holds
+one of a fixed number of worker threads. The async path issues all calls as
+coroutines on one event loop sharing one connection pool, as the ASGI views
+do. Both run the real google-genai client against a local fake Gemini server
+with a fixed response latency, and through the rate limiter and usage
+counters in a throwaway database.
+
+Usage (from the directory containing manage.py):
+    python -m benchmarks.bench_async_summarize [--requests 200] [--latency 0.5] [--threads 16]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'redbud.settings')
+os.environ.setdefault('GEMINI_API_KEY', 'benchmark')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test import override_settings  # noqa: E402
+
+from benchmarks.fixtures import FakeGeminiServer, benchmark_database  # noqa: E402
+from content.gemini_service import GeminiService  # noqa: E402
+
+
+def run_threads(service, requests, threads):
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda i: service.summarize_text(f"Document {i} to summarize."), range(requests)))
+
+
+async def run_async(service, requests):
+    await asyncio.gather(*(
+        service.asummarize_text(f"Document {i} to summarize.") for i in range(requests)
+    ))
+
+
+def measure(server, func):
+    server.max_in_flight = 0
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started, server.max_in_flight
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.5, help='Seconds the fake server takes per call')
+    parser.add_argument('--threads', type=int, default=16, help='Worker threads for the blocking path')
+    args = parser.parse_args()
+
+    with FakeGeminiServer(latency=args.latency) as server, benchmark_database(), \
+            override_settings(GEMINI_BASE_URL=server.url):
+        service = GeminiService()
+
+        print(f"requests={args.requests} latency={args.latency}s threads={args.threads}")
+        print(f"{'mode':>8} {'wall (s)':>9} {'req/s':>8} {'peak in-flight':>15}")
+
+        for mode, func in [
+            ('threads', lambda: run_threads(service, args.requests, args.threads)),
+            ('async', lambda: asyncio.run(run_async(service, args.requests))),
+        ]:
+            wall, peak = measure(server, func)
+            print(f"{mode:>8} {wall:>9.2f} {args.requests / wall:>8.1f} {peak:>15}")
+
+
+if __name__ == '__main__':
+    main()
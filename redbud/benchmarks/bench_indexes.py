@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark the list queries of the content and training viewsets with and without the composite indexes.
+
+Seeds a throwaway database with --rows content rows spread over trainings,
+trainers and enrolled employees. Each query is built the way the viewsets
+build it, then timed and explained twice: first with the models'
+Meta.indexes dropped, then with them created. Both runs are ANALYZEd first.
+
+Usage (from the directory containing manage.py):
+    python -m benchmarks.bench_indexes [--rows 1000000] [--trainings 2000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'redbud.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from benchmarks.fixtures import benchmark_database  # noqa: E402
+from content.models import Content  # noqa: E402
+from users.access import invalidate_access_scopes, load_access_scope  # noqa: E402
+from users.models import Training, TrainingModule, User  # noqa: E402
+
+INDEXED_MODELS = [Content, Training, TrainingModule, User]
+CONTENT_TYPES = ['pdf', 'video', 'youtube', 'link', 'text']
+
+
+def seed(rows, trainings, trainers, employees, enrollments):
+    """Insert users, trainings, enrollments and content rows with plain executemany."""
+    now = timezone.now()
+    rng = random.Random(0)
+
+    def insert(table, columns, values):
+        placeholders = ', '.join(['%s'] * len(columns))
+        names = ', '.join(connection.ops.quote_name(column) for column in columns)
+        with connection.cursor() as cursor:
+            cursor.executemany(f'INSERT INTO {table} ({names}) VALUES ({placeholders})', values)
+
+    with transaction.atomic():
+        user_columns = ['id', 'password', 'is_superuser', 'username', 'first_name', 'last_name', 'email',
+                        'is_staff', 'is_active', 'role', 'date_joined', 'updated_at']
+        roles = ['manager'] + ['trainer'] * trainers + ['employee'] * employees
+        insert(User._meta.db_table, user_columns, [
+            (i + 1, '!', False, f'user{i}', '', '', f'user{i}@example.com', False, True, role, now, now)
+            for i, role in enumerate(roles)
+        ])
+        trainer_ids = list(range(2, trainers + 2))
+        employee_ids = list(range(trainers + 2, trainers + employees + 2))
+
+        insert(Training._meta.db_table,
+               ['id', 'name', 'description', 'start_date', 'end_date', 'duration_days', 'created_by_id',
+                'assigned_trainer_id', 'is_active', 'created_at', 'updated_at'], [
+                   (t + 1, f'Training {t}', '', now.date(), now.date(), 1, 1, trainer_ids[t % trainers], True,
+                    now - timedelta(minutes=trainings - t), now)
+                   for t in range(trainings)
+               ])
+        insert(Training.employees.through._meta.db_table, ['training_id', 'user_id'], [
+            (training_id, user_id)
+            for user_id in employee_ids
+            for training_id in rng.sample(range(1, trainings + 1), enrollments)
+        ])
+
+        content_columns = ['training_id', 'title', 'description', 'content_type', 'file', 'url', 'text_content',
+                           'created_by_id', 'order', 'is_active', 'created_at', 'updated_at',
+                           'extraction_status', 'summary_status', 'index_status', 'ingestion_error']
+        batch = []
+        for i in range(rows):
+            training_id = i % trainings + 1
+            batch.append((
+                training_id, f'Content {i}', '', CONTENT_TYPES[i % len(CONTENT_TYPES)], '', '', '',
+                trainer_ids[(training_id - 1) % trainers], i // trainings, rng.random() > 0.1,
+                now, now - timedelta(seconds=rows - i), '', '', '', '',
+            ))
+            if len(batch) == 50000:
+                insert(Content._meta.db_table, content_columns, batch)
+                batch = []
+        if batch:
+            insert(Content._meta.db_table, content_columns, batch)
+
+    invalidate_access_scopes()
+    return User.objects.get(pk=1), User.objects.get(pk=trainer_ids[0]), User.objects.get(pk=employee_ids[0])
+
+
+def set_indexes(enabled):
+    with connection.schema_editor() as editor:
+        for model in INDEXED_MODELS:
+            for index in model._meta.indexes:
+                if enabled:
+                    editor.add_index(model, index)
+                else:
+                    editor.remove_index(model, index)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def build_queries(manager, trainer, employee, trainings, rows):
+    """(label, queryset, whether to count it) as ContentViewSet and TrainingViewSet build them."""
+    scopes = {user: load_access_scope(user) for user in (manager, trainer, employee)}
+
+    def content(user):
+        return Content.objects.in_scope(scopes[user]).select_related('training', 'created_by')
+
+    recent = timezone.now() - timedelta(seconds=rows // 1000)
+    return [
+        ('content list, manager', content(manager)[:10], False),
+        ('content count, manager', content(manager), True),
+        ('by_training', content(manager).filter(training_id=trainings // 2), False),
+        ('content list, employee', content(employee)[:10], False),
+        ('content count, employee', content(employee), True),
+        ('by_type, trainer', content(trainer).filter(content_type='pdf'), False),
+        ('trainer scope', Training.objects.filter(assigned_trainer=trainer).order_by().values('id'), False),
+        ('trainings deep page', Training.objects.all()[trainings - 20:trainings - 10], False),
+        ('content changes', Content.objects.filter(updated_at__gt=recent).order_by('updated_at', 'id')[:100], False),
+    ]
+
+
+def measure(queries, repeat):
+    """Median latency in milliseconds and query plan of each query."""
+    timings, plans = {}, {}
+    for label, queryset, count in queries:
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            if count:
+                queryset.count()
+            else:
+                list(queryset.all())
+            samples.append(time.perf_counter() - started)
+        timings[label] = statistics.median(samples) * 1000
+        plans[label] = queryset.explain() if not count else None
+    return timings, plans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000, help='Content rows to seed')
+    parser.add_argument('--trainings', type=int, default=2000)
+    parser.add_argument('--trainers', type=int, default=200)
+    parser.add_argument('--employees', type=int, default=1000)
+    parser.add_argument('--enrollments', type=int, default=5, help='Trainings per employee')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query')
+    args = parser.parse_args()
+
+    with benchmark_database():
+        started = time.perf_counter()
+        manager, trainer, employee = seed(args.rows, args.trainings, args.trainers, args.employees, args.enrollments)
+        print(f"seeded {args.rows} content rows, {args.trainings} trainings in {time.perf_counter() - started:.1f}s")
+
+        queries = build_queries(manager, trainer, employee, args.trainings, args.rows)
+        set_indexes(False)
+        before, plans_before = measure(queries, args.repeat)
+        set_indexes(True)
+        after, plans_after = measure(queries, args.repeat)
+
+        print(f"\n{'query':<26} {'before (ms)':>12} {'after (ms)':>11} {'speedup':>8}")
+        for label, _, _ in queries:
+            print(f"{label:<26} {before[label]:>12.2f} {after[label]:>11.2f} {before[label] / after[label]:>7.1f}x")
+
+        for label, _, count in queries:
+            if not count:
+                print(f"\n== {label}\n-- before\n{plans_before[label]}\n-- after\n{plans_after[label]}")
+
+
+if __name__ == '__main__':
+    main()
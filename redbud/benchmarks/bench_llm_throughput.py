@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+"""
+Load test the summarize and chat endpoints against the local stub LLM backend.
+
+Requests go through the full Django stack (authentication, permissions, the
+summary cache, retrieval, rate limiting, retries and the circuit breaker) on
+a pool of client threads, like sync workers serving concurrent users. The
+stub backend replaces the network call with a fixed latency and an optional
+share of failing calls, so the run needs no API key or network access.
+
+Usage (from the directory containing manage.py):
+    python -m benchmarks.bench_llm_throughput [--requests 200] [--threads 16]
+        [--latency 0.5] [--failure-rate 0.0]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'redbud.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from benchmarks.fixtures import benchmark_database  # noqa: E402
+from content.llm import get_llm_backend  # noqa: E402
+from content.models import Content, Training  # noqa: E402
+from content.retrieval import reconcile_index  # noqa: E402
+from users.models import User  # noqa: E402
+
+
+def create_training(contents):
+    user = User.objects.create_user(
+        username='manager', password='benchmark', email='manager@example.com', role='manager'
+    )
+    training = Training.objects.create(
+        name='Load test', start_date=date.today(), end_date=date.today(), duration_days=1, created_by=user
+    )
+    Content.objects.bulk_create([
+        Content(
+            title=f'Module {i}',
+            training=training,
+            content_type='text',
+            text_content=f'Module {i} covers safety procedure {i}. ' * 40,
+            created_by=user,
+        )
+        for i in range(contents)
+    ])
+    return user, training
+
+
+def run(label, requests, threads, send):
+    """Send requests from a thread pool and print latency percentiles and status codes."""
+    def timed(i):
+        started = time.perf_counter()
+        try:
+            return send(i), time.perf_counter() - started
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(timed, range(requests)))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(latency for _, latency in results)
+    statuses = Counter(status for status, _ in results)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:>10} {wall:>9.2f} {requests / wall:>8.1f} "
+          f"{statistics.median(latencies):>8.3f} {p95:>8.3f}  "
+          + ' '.join(f"{code}x{count}" for code, count in sorted(statuses.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=16, help='Concurrent client threads')
+    parser.add_argument('--latency', type=float, default=0.5, help='Seconds the stub takes per call')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of stub calls that fail, 0 to 1')
+    args = parser.parse_args()
+
+    backends = {
+        'stub': {
+            'BACKEND': 'content.stub_backend.StubBackend',
+            'MODEL': 'stub',
+            'OPTIONS': {'latency': args.latency, 'failure_rate': args.failure_rate, 'seed': 0},
+        },
+    }
+    with benchmark_database(), override_settings(
+            LLM_BACKEND='stub', LLM_BACKENDS=backends, ALLOWED_HOSTS=['testserver']):
+        user, training = create_training(args.requests)
+        content_ids = list(Content.objects.filter(training=training).values_list('id', flat=True))
+        # Chat only answers from indexed content; without a worker, index it here
+        reconcile_index(Content.objects.filter(training=training))
+
+        def client():
+            api = APIClient()
+            api.force_authenticate(user=user)
+            return api
+
+        def summarize(i):
+            url = reverse('content-summarize', kwargs={'pk': content_ids[i]})
+            return client().post(url, format='json').status_code
+
+        def chat(i):
+            data = {'training_id': training.id, 'question': f'What does safety procedure {i} say?'}
+            return client().post(reverse('content-chat'), data, format='json').status_code
+
+        print(f"requests={args.requests} threads={args.threads} "
+              f"latency={args.latency}s failure_rate={args.failure_rate}")
+        print(f"{'endpoint':>10} {'wall (s)':>9} {'req/s':>8} {'p50 (s)':>8} {'p95 (s)':>8}  statuses")
+        run('summarize', args.requests, args.threads, summarize)
+        run('cached', args.requests, args.threads, summarize)  # The same contents again
+        run('chat', args.requests, args.threads, chat)
+
+        breaker = get_llm_backend().breaker.snapshot()
+        print(f"backend calls={get_llm_backend().calls} retries={breaker['retries']} "
+              f"failures={breaker['failures']} short_circuited={breaker['short_circuited']} "
+              f"breaker={breaker['state']}")
+
+
+if __name__ == '__main__':
+    main()
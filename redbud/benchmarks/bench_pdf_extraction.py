@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark PDF text extraction: the original page loop vs. the page-range process pool.
+
+The pool is started by the first parallel extraction and reused after that,
+so the first and the later (warm) extractions are timed separately.
+
+Usage (from the directory containing manage.py):
+    python -m benchmarks.bench_pdf_extraction [--pages 100 500 1000] [--workers N] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'redbud.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from benchmarks.fixtures import make_text_pdf  # noqa: E402
+from content.text_extraction import extract_pdf_pages, join_pages  # noqa: E402
+
+
+def legacy_extract(pdf_path):
+    """The pre-engine implementation: one page at a time with string concatenation."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(pdf_path)
+    text = ""
+    for page in reader.pages:
+        page_text = page.extract_text()
+        if page_text:
+            text += page_text + "\n"
+    return text.strip()
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, nargs='+', default=[100, 500, 1000])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--repeat', type=int, default=5, help='Warm parallel extractions to average')
+    args = parser.parse_args()
+
+    print(f"workers={args.workers} cpus={os.cpu_count()} repeat={args.repeat}")
+    print(f"{'pages':>6} {'legacy (s)':>11} {'sequential (s)':>15} {'first (s)':>10} {'warm (s)':>9} {'speedup':>8}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for page_count in args.pages:
+            pdf_path = os.path.join(tmp, f"bench-{page_count}.pdf")
+            with open(pdf_path, 'wb') as fh:
+                fh.write(make_text_pdf(page_count))
+
+            legacy = timed(legacy_extract, pdf_path)
+            sequential = timed(lambda: join_pages(extract_pdf_pages(pdf_path, workers=1)))
+            parallel = [
+                timed(lambda: join_pages(extract_pdf_pages(pdf_path, workers=args.workers)))
+                for _ in range(args.repeat + 1)
+            ]
+            first, warm = parallel[0], sum(parallel[1:]) / args.repeat
+
+            print(f"{page_count:>6} {legacy:>11.2f} {sequential:>15.2f} {first:>10.2f} {warm:>9.2f} {legacy / warm:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark training access checks for trainings with large enrollments.
+
+Compares the original membership test, which loads every enrolled employee
+(`user in training.employees.all()`), with the access scope check now used
+by CanAccessTraining and IsManagerOrTrainerForContent (one query for the
+user's training ids, when no shared cache holds the scope). Also times a content
+detail request by an enrolled employee through the full Django stack.
+
+Usage (from the directory containing manage.py):
+    python -m benchmarks.bench_permissions [--employees 100 1000 10000 50000] [--checks 50]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'redbud.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test import override_settings  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from benchmarks.fixtures import benchmark_database  # noqa: E402
+from content.models import Content  # noqa: E402
+from users.models import Training, User  # noqa: E402
+from users.access import load_access_scope  # noqa: E402
+
+
+def create_training(manager, employees):
+    """Create a training with `employees` enrolled employees and one content."""
+    training = Training.objects.create(
+        name=f'{employees} employees', description='Benchmark', start_date=date.today(),
+        end_date=date.today(), duration_days=1, created_by=manager,
+    )
+    offset = User.objects.count()
+    users = User.objects.bulk_create([
+        User(username=f'employee{offset + i}', email=f'employee{offset + i}@example.com', role='employee')
+        for i in range(employees)
+    ], batch_size=5000)
+    Training.employees.through.objects.bulk_create([
+        Training.employees.through(training_id=training.id, user_id=user.id) for user in users
+    ], batch_size=5000)
+    content = Content.objects.create(
+        title='Handbook', training=training, content_type='text', text_content='Text.', created_by=manager,
+    )
+    # The last enrolled employee is the worst case for the original linear scan
+    return training, content, users[-1]
+
+
+def median_ms(func, checks):
+    timings = []
+    for _ in range(checks):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--employees', type=int, nargs='+', default=[100, 1000, 10000, 50000])
+    parser.add_argument('--checks', type=int, default=50, help='Timed repetitions per measurement')
+    args = parser.parse_args()
+
+    with benchmark_database(), override_settings(ALLOWED_HOSTS=['testserver']):
+        manager = User.objects.create_user(
+            username='manager', password='benchmark', email='manager@example.com', role='manager'
+        )
+        print(f"checks={args.checks}")
+        print(f"{'employees':>10} {'load all (ms)':>14} {'scope (ms)':>12} {'speedup':>8} {'detail GET (ms)':>16}")
+
+        for employees in args.employees:
+            training, content, employee = create_training(manager, employees)
+
+            legacy = median_ms(lambda: employee in Training.objects.get(pk=training.pk).employees.all(), args.checks)
+            scope = median_ms(lambda: load_access_scope(employee).can_access_training(training.pk), args.checks)
+
+            client = APIClient()
+            client.force_authenticate(user=employee)
+            url = reverse('content-detail', kwargs={'pk': content.pk})
+            assert client.get(url).status_code == 200
+            detail = median_ms(lambda: client.get(url), args.checks)
+
+            print(f"{employees:>10} {legacy:>14.2f} {scope:>12.3f} {legacy / scope:>7.0f}x {detail:>16.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+"""
+Synthetic data builders and fakes shared by benchmarks and tests.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_text_pdf(page_count: int, lines_per_page: int = 40) -> bytes:
+    """
+    Build a PDF with text on every page, without any PDF writer dependency.
+
+    Args:
+        page_count: Number of pages to generate
+        lines_per_page: Lines of text per page
+
+    Returns:
+        PDF file bytes
+    """
+    # Object numbers: 1 catalog, 2 page tree, 3 font, then a page and content stream per page
+    bodies = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{4 + 2 * n} 0 R" for n in range(page_count)), page_count
+        ).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+
+    for n in range(page_count):
+        lines = " ".join(
+            f"(Page {n + 1} line {i + 1}: onboarding manual sample text) Tj T*"
+            for i in range(lines_per_page)
+        )
+        stream = f"BT /F1 10 Tf 12 TL 50 780 Td {lines} ET".encode()
+        bodies.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * n} 0 R >>".encode()
+        )
+        bodies.append(
+            f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream"
+        )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(bodies, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+    xref_offset = len(out)
+    out += f"xref\n0 {len(bodies) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += (
+        f"trailer\n<< /Size {len(bodies) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref_offset}\n%%EOF\n"
+    ).encode()
+
+    return bytes(out)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # Accept bursts of concurrent connections
+
+
+class FakeGeminiServer:
+    """
+    Local HTTP server answering Gemini generateContent calls after a fixed latency.
+
+    Point GEMINI_BASE_URL at `url` to exercise the real google-genai client
+    without network access. Tracks request count and peak concurrency.
+
+    Usage:
+        with FakeGeminiServer(latency=0.5) as server:
+            ...
+    """
+
+    def __init__(self, latency: float = 0.0, reply: str = "Fake summary."):
+        self.latency = latency
+        self.reply = reply
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._server = _Server(('127.0.0.1', 0), self._handler_class())
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive, like the real API
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with fake._lock:
+                    fake.requests += 1
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                try:
+                    time.sleep(fake.latency)
+                    payload = json.dumps({
+                        'candidates': [{
+                            'content': {'role': 'model', 'parts': [{'text': fake.reply}]},
+                            'finishReason': 'STOP',
+                        }],
+                    })
+                    if ':streamGenerateContent' in self.path:
+                        body, content_type = f"data: {payload}\r\n\r\n".encode(), 'text/event-stream'
+                    else:
+                        body, content_type = payload.encode(), 'application/json'
+
+                    self.send_response(200)
+                    self.send_header('Content-Type', content_type)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with fake._lock:
+                        fake.in_flight -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+@contextmanager
+def benchmark_database():
+    """
+    Create a throwaway on-disk test database for the duration of a benchmark.
+
+    A file rather than SQLite's shared in-memory database, so worker threads
+    can write concurrently. Requires django.setup() to have run.
+    """
+    from django.db import connection
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tmp, 'benchmark.sqlite3')
+        connection.settings_dict['TEST']['MIGRATE'] = False  # Create tables from models, as the tests do
+        # Writers queue for the lock instead of failing with "database is locked"
+        connection.settings_dict['OPTIONS'].update(timeout=30, transaction_mode='IMMEDIATE')
+        old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Content
+from .models import Content, GeminiUsage, IngestionJob, SummaryCache, SummaryJob
 
 
 class ContentAdmin(admin.ModelAdmin):
@@ -9,7 +9,8 @@ class ContentAdmin(admin.ModelAdmin):
     list_display = ['title', 'training', 'content_type', 'order', 'is_active', 'created_by', 'created_at']
     list_filter = ['content_type', 'is_active', 'training', 'created_by', 'created_at']
     search_fields = ['title', 'description', 'training__name']
-    readonly_fields = ['created_by', 'created_at', 'updated_at']
+    readonly_fields = ['created_by', 'created_at', 'updated_at', 'extraction_status', 'summary_status',
+                       'index_status', 'ingestion_error', 'ingested_at']
 
     # Exclude created_by from the form
     exclude = ['created_by']
@@ -21,6 +22,9 @@ class ContentAdmin(admin.ModelAdmin):
         ('Content Data', {
             'fields': ('file', 'url', 'text_content')
         }),
+        ('Ingestion', {
+            'fields': ('extraction_status', 'summary_status', 'index_status', 'ingestion_error', 'ingested_at')
+        }),
         ('Status & Meta', {
             'fields': ('is_active', 'created_at', 'updated_at')
         }),
@@ -35,5 +39,48 @@ class ContentAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
-# Only register Content model here
+class SummaryCacheAdmin(admin.ModelAdmin):
+    """
+    Admin interface for cached AI summaries
+    """
+    list_display = ['content', 'max_length', 'model_name', 'prompt_version', 'hit_count', 'created_at', 'last_accessed_at']
+    list_filter = ['model_name', 'prompt_version']
+    search_fields = ['content__title']
+    readonly_fields = ['key', 'content_hash', 'created_at', 'last_accessed_at']
+
+
+class SummaryJobAdmin(admin.ModelAdmin):
+    """
+    Admin interface for asynchronous summarization jobs
+    """
+    list_display = ['content', 'max_length', 'status', 'attempts', 'requested_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['content__title']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+
+
+class IngestionJobAdmin(admin.ModelAdmin):
+    """
+    Admin interface for content ingestion jobs
+    """
+    list_display = ['content', 'status', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['content__title']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+
+
+class GeminiUsageAdmin(admin.ModelAdmin):
+    """
+    Admin interface for daily Gemini usage per user and training
+    """
+    list_display = ['date', 'user', 'training', 'requests', 'input_tokens', 'output_tokens']
+    list_filter = ['date', 'training']
+    search_fields = ['user__email', 'training__name']
+    date_hierarchy = 'date'
+
+
 admin.site.register(Content, ContentAdmin)
+admin.site.register(SummaryCache, SummaryCacheAdmin)
+admin.site.register(SummaryJob, SummaryJobAdmin)
+admin.site.register(IngestionJob, IngestionJobAdmin)
+admin.site.register(GeminiUsage, GeminiUsageAdmin)
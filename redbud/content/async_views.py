@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+
+"""
+ASGI-native views for content summarization.
+
+These are plain async Django views rather than DRF viewsets, so a request
+waiting on Gemini does not pin a worker thread when served by the ASGI
+application in redbud/asgi.py. Authentication uses the same JWT scheme as
+the REST API.
+
+One ASGI worker can keep hundreds of summarize requests in flight: they
+share the worker's pooled Gemini connections and only borrow a thread for
+short database queries.
+"""
+
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from content.models import Content
+from content.llm import get_llm_backend, get_model_name
+from content.map_reduce import estimate_tokens
+from content.rate_limit import RateLimitExceeded
+from content.resilience import UpstreamError, UpstreamUnavailable, get_breaker
+from content.summaries import (
+    content_fingerprint,
+    get_cached_summary,
+    get_last_summary,
+    parse_max_length,
+    store_summary,
+    asummarize_content,
+    summarize_content,
+    summary_cache_key,
+)
+from content.text_extraction import get_content_text
+from content.usage import usage_scope
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _authenticate(request):
+    """Return the JWT-authenticated user, or None."""
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except (AuthenticationFailed, InvalidToken):
+        return None
+    return result[0] if result else None
+
+
+def _rate_limited(error: RateLimitExceeded) -> JsonResponse:
+    retry_after = math.ceil(error.retry_after)
+    response = JsonResponse({'error': str(error), 'retry_after': retry_after}, status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def _upstream_error(error: UpstreamError) -> JsonResponse:
+    if isinstance(error, UpstreamUnavailable):
+        retry_after = math.ceil(error.retry_after)
+        response = JsonResponse({'error': str(error), 'retry_after': retry_after}, status=503)
+        response['Retry-After'] = str(retry_after)
+        return response
+    return JsonResponse({'error': f'Failed to generate summary: {str(error)}'}, status=502)
+
+
+def _stale_summary(content):
+    """The last cached summary to serve while Gemini is failing, counted in the backend metrics."""
+    summary = get_last_summary(content)
+    if summary is not None:
+        get_breaker(settings.LLM_BACKEND).count('stale_served')
+    return summary
+
+
+def _request_data(request) -> dict:
+    """Parse a JSON or form-encoded request body."""
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+    return request.POST
+
+
+def _load_content(request, pk):
+    """
+    Resolve the user and the content they may summarize.
+
+    The JWT user replaces request.user, as DRF does for its views.
+
+    Returns:
+        Tuple of (content, error response)
+    """
+    user = _authenticate(request)
+    if user is None:
+        return None, JsonResponse(
+            {'error': 'Authentication credentials were not provided or are invalid.'}, status=401
+        )
+    request.user = user
+
+    content = Content.objects.visible_to(user).filter(pk=pk).first()
+    if content is None:
+        return None, JsonResponse({'error': 'Not found.'}, status=404)
+
+    if content.content_type not in ['text', 'pdf']:
+        return None, JsonResponse(
+            {'error': 'Summarization is only supported for text and PDF content'}, status=400
+        )
+    if content.content_type == 'text' and not content.text_content:
+        return None, JsonResponse({'error': 'No text content available to summarize'}, status=400)
+    if content.content_type == 'pdf' and not content.file:
+        return None, JsonResponse({'error': 'No PDF file available to summarize'}, status=400)
+
+    return content, None
+
+
+@csrf_exempt
+@require_http_methods(['POST'])
+async def summarize(request, pk):
+    """
+    Generate an AI summary of text or PDF content.
+
+    Same request and response as ContentViewSet.summarize, served without
+    pinning a thread while Gemini works. Accepts an optional max_length in
+    the JSON or form body.
+    """
+    content, error = await sync_to_async(_load_content)(request, pk)
+    if error is not None:
+        return error
+
+    try:
+        max_length = parse_max_length(_request_data(request).get('max_length'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    try:
+        with usage_scope(request.user.id, content.training_id):
+            summary, cached = await asummarize_content(content, max_length, get_service=get_llm_backend)
+    except RateLimitExceeded as e:
+        return _rate_limited(e)
+    except UpstreamError as e:
+        summary = await sync_to_async(_stale_summary)(content)
+        if summary is None:
+            return _upstream_error(e)
+        return JsonResponse({
+            'summary': summary,
+            'content_id': content.id,
+            'content_type': content.content_type,
+            'cached': True,
+            'stale': True,
+        })
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': f'Failed to generate summary: {str(e)}'}, status=500)
+
+    response_data = {
+        'summary': summary,
+        'content_id': content.id,
+        'content_type': content.content_type,
+        'cached': cached,
+    }
+    if max_length:
+        response_data['max_length'] = max_length
+    return JsonResponse(response_data)
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+async def summarize_stream(request, pk):
+    """
+    Stream an AI summary of text or PDF content as Server-Sent Events.
+
+    Emits `chunk` events with summary fragments as Gemini generates them,
+    then a `done` event with the full summary, or an `error` event. Cached
+    summaries are sent as a single chunk, as is the last cached summary
+    (with stale set in the `done` event) when Gemini fails before the first
+    fragment. Accepts an optional max_length query parameter.
+    """
+    content, error = await sync_to_async(_load_content)(request, pk)
+    if error is not None:
+        return error
+
+    try:
+        max_length = parse_max_length(request.GET.get('max_length'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    async def events():
+        with usage_scope(request.user.id, content.training_id):
+            parts = []
+            try:
+                content_hash = await sync_to_async(content_fingerprint)(content)
+                key = summary_cache_key(content_hash, max_length, get_model_name())
+
+                summary = await sync_to_async(get_cached_summary)(key)
+                if summary is not None:
+                    yield _sse('chunk', {'text': summary})
+                    yield _sse('done', {'content_id': content.id, 'summary': summary, 'cached': True})
+                    return
+
+                text = await sync_to_async(get_content_text)(content)
+                if estimate_tokens(text) > settings.SUMMARY_CHUNK_TOKENS:
+                    # Map-reduce summaries are produced in one piece at the end
+                    summary, cached = await sync_to_async(summarize_content)(
+                        content, max_length, get_service=get_llm_backend
+                    )
+                    yield _sse('chunk', {'text': summary})
+                    yield _sse('done', {'content_id': content.id, 'summary': summary, 'cached': cached})
+                    return
+
+                backend = await sync_to_async(get_llm_backend)()
+                async for part in backend.astream_summary(text, max_length):
+                    parts.append(part)
+                    yield _sse('chunk', {'text': part})
+
+                summary = ''.join(parts).strip()
+                await sync_to_async(store_summary)(
+                    key, content, content_hash, max_length, get_model_name(), summary
+                )
+                yield _sse('done', {'content_id': content.id, 'summary': summary, 'cached': False})
+
+            except RateLimitExceeded as e:
+                yield _sse('error', {'error': str(e), 'retry_after': math.ceil(e.retry_after)})
+            except UpstreamError as e:
+                summary = None if parts else await sync_to_async(_stale_summary)(content)
+                if summary is not None:
+                    yield _sse('chunk', {'text': summary})
+                    yield _sse('done', {'content_id': content.id, 'summary': summary, 'cached': True, 'stale': True})
+                elif isinstance(e, UpstreamUnavailable):
+                    yield _sse('error', {'error': str(e), 'retry_after': math.ceil(e.retry_after)})
+                else:
+                    yield _sse('error', {'error': f'Failed to generate summary: {str(e)}'})
+            except Exception as e:
+                yield _sse('error', {'error': f'Failed to generate summary: {str(e)}'})
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable proxy buffering so events flush immediately
+    return response
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+"""
+Summarization of every eligible content of a training.
+
+The API starts a SummaryBatch, which queues one SummaryJob per content that
+has no cached summary and reports progress from the jobs' statuses. The
+`manage.py summarize_training` command runs the same work in-process on a
+bounded thread pool for pre-warming before a course starts.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, NamedTuple, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Q, QuerySet
+
+from content.models import Content, JobStatus, SummaryBatch, SummaryJob, Training
+from content.llm import BaseLLMBackend, get_llm_backend
+from content.summaries import cached_content_ids, summarize_content
+from content.usage import usage_scope
+
+
+class BatchResult(NamedTuple):
+    """Outcome counts of an in-process training summarization."""
+    total: int
+    cached: int
+    generated: int
+    failed: int
+
+
+def eligible_contents(training: Training) -> QuerySet:
+    """Active text and PDF contents of a training that have something to summarize."""
+    return (
+        Content.objects.filter(training=training, is_active=True)
+        .filter(
+            (Q(content_type='text') & ~Q(text_content='') & Q(text_content__isnull=False))
+            | (Q(content_type='pdf') & ~Q(file='') & Q(file__isnull=False))
+        )
+        .order_by('id')
+    )
+
+
+def start_summary_batch(training: Training, max_length: Optional[int] = None, user=None) -> SummaryBatch:
+    """Queue summary jobs for the uncached eligible contents of a training."""
+    content_ids = list(eligible_contents(training).values_list('id', flat=True))
+    cached = cached_content_ids(content_ids, max_length)
+
+    with transaction.atomic():
+        batch = SummaryBatch.objects.create(
+            training=training,
+            max_length=max_length,
+            requested_by=user,
+            total=len(content_ids),
+            cached=len(cached),
+        )
+        SummaryJob.objects.bulk_create([
+            SummaryJob(content_id=content_id, max_length=max_length, requested_by=user, batch=batch)
+            for content_id in content_ids if content_id not in cached
+        ])
+    return batch
+
+
+def batch_progress(batch: SummaryBatch) -> dict:
+    """Count a batch's contents by state."""
+    counts = batch.jobs.aggregate(**{
+        state: Count('id', filter=Q(status=state)) for state in JobStatus.values
+    })
+    completed = batch.cached + counts[JobStatus.SUCCEEDED] + counts[JobStatus.FAILED]
+    return {
+        **counts,
+        'completed': completed,
+        'percent_complete': round(100 * completed / batch.total) if batch.total else 100,
+        'done': completed >= batch.total,
+    }
+
+
+def summarize_training(training: Training, max_length: Optional[int] = None, workers: Optional[int] = None,
+                       get_service: Callable[[], BaseLLMBackend] = get_llm_backend,
+                       progress: Optional[Callable[[int, int, Content, Optional[Exception]], None]] = None
+                       ) -> BatchResult:
+    """
+    Summarize the uncached eligible contents of a training in this process.
+
+    Args:
+        training: Training whose contents are summarized
+        max_length: Optional maximum summary length in words
+        workers: Concurrent summaries (default: SUMMARY_BATCH_WORKERS)
+        get_service: Factory returning the LLM backend
+        progress: Called as progress(done, todo, content, error) after each content
+
+    Returns:
+        BatchResult with the outcome counts
+    """
+    workers = workers or settings.SUMMARY_BATCH_WORKERS
+    contents = list(eligible_contents(training))
+    cached = cached_content_ids(contents, max_length)
+    todo = [content for content in contents if content.id not in cached]
+
+    def run(content):
+        try:
+            with usage_scope(training_id=content.training_id):
+                summarize_content(content, max_length, get_service=get_service)
+        except Exception as e:
+            return content, e
+        finally:
+            if workers > 1:
+                close_old_connections()
+        return content, None
+
+    if workers > 1:
+        pool = ThreadPoolExecutor(max_workers=workers)
+        outcomes = as_completed([pool.submit(run, content) for content in todo])
+        outcomes = (future.result() for future in outcomes)
+    else:
+        pool = None
+        outcomes = map(run, todo)
+
+    failed = 0
+    try:
+        for done, (content, error) in enumerate(outcomes, start=1):
+            failed += error is not None
+            if progress:
+                progress(done, len(todo), content, error)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return BatchResult(total=len(contents), cached=len(cached), generated=len(todo) - failed, failed=failed)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+"""
+Serving of uploaded content files after the permission checks.
+
+With MEDIA_SENDFILE_BACKEND set, Django only checks access and hands the
+bytes off to the front proxy:
+
+- 'nginx': X-Accel-Redirect to MEDIA_ACCEL_REDIRECT_PREFIX + the file name.
+  The prefix must map to MEDIA_ROOT in an `internal` location, e.g.
+  `location /protected-media/ { internal; alias /srv/redbud/media/; }`
+- 'sendfile': X-Sendfile with the absolute path, for Apache mod_xsendfile
+  and lighttpd.
+
+Otherwise, and for storages without local paths, the file is streamed from
+Django. Single byte ranges are honoured with 206 Partial Content, so videos
+can be seeked without downloading them in full. MEDIA_ROOT itself should
+not be exposed by the proxy.
+"""
+
+import mimetypes
+import os
+import re
+from typing import Iterator, Optional, Tuple
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    First and last byte of a single-range Range header.
+
+    Returns:
+        None for headers to ignore (malformed or several ranges), which get the whole file
+
+    Raises:
+        ValueError: The range starts past the end of the file, or the file is empty
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # Suffix range: the last `end` bytes
+        length = int(end)
+        if length == 0:
+            raise ValueError('Empty suffix range')
+        if size == 0:
+            raise ValueError('Suffix range of an empty file')
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size:
+        raise ValueError('Range starts past the end of the file')
+    if end < start:
+        return None
+    return start, end
+
+
+def _read(file, start: int, length: int, block_size: int = FileResponse.block_size) -> Iterator[bytes]:
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(block_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def _local_path(field_file) -> Optional[str]:
+    try:
+        return field_file.path
+    except NotImplementedError:
+        return None
+
+
+def _modified_time(field_file) -> Optional[float]:
+    try:
+        return field_file.storage.get_modified_time(field_file.name).timestamp()
+    except (NotImplementedError, OSError):
+        return None
+
+
+def serve_file(request, field_file) -> HttpResponse:
+    """Response serving a FieldFile the user has already been allowed to read."""
+    filename = os.path.basename(field_file.name)
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    backend = settings.MEDIA_SENDFILE_BACKEND
+    path = _local_path(field_file)
+
+    if backend and path is not None:
+        response = HttpResponse(content_type=content_type)
+        if backend == 'nginx':
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(field_file.name)
+        else:
+            response['X-Sendfile'] = path
+        response['Content-Disposition'] = content_disposition_header(False, filename)
+        return response
+
+    size = field_file.size
+    modified = _modified_time(field_file)
+    byte_range = None
+    header = request.META.get('HTTP_RANGE')
+    # A client whose copy changed since If-Range gets the whole new file
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if header and (not if_range or (modified and parse_http_date_safe(if_range) == int(modified))):
+        try:
+            byte_range = parse_range(header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if byte_range is None:
+        response = FileResponse(field_file.open('rb'), content_type=content_type, filename=filename)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read(field_file.open('rb'), start, end - start + 1), status=206, content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Disposition'] = content_disposition_header(False, filename)
+
+    response['Accept-Ranges'] = 'bytes'
+    if modified:
+        response['Last-Modified'] = http_date(modified)
+    return response
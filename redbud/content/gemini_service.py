@@ -1,135 +1,126 @@
 #!/usr/bin/env python3
 
 """
-Gemini AI service for content summarization.
+Gemini backend for content summarization.
 
-Handles interactions with Google's Gemini API for text and PDF summarization.
+Implements the raw calls of BaseLLMBackend with Google's Gemini API.
+Blocking calls serve the sync DRF views; the async client serves the ASGI
+views in async_views.py without holding a thread per request.
 """
 
+import asyncio
 import os
-from typing import Optional
+from typing import AsyncIterator, List, Optional
+
+import httpx
 from google import genai
 from google.genai import types
 from django.conf import settings
 
+from content.llm import BaseLLMBackend, Completion
+
 
-class GeminiService:
-    """Service class to handle Gemini API interactions for summarization."""
+class GeminiService(BaseLLMBackend):
+    """LLM backend for the Gemini API."""
 
-    def __init__(self):
-        """Initialize Gemini client with API key from environment."""
-        api_key = os.getenv('GEMINI_API_KEY') or settings.GEMINI_API_KEY
+    def __init__(self, alias: str = 'gemini', model: Optional[str] = None, api_key: Optional[str] = None):
+        """Initialize Gemini client with API key from the options, environment or settings."""
+        api_key = api_key or os.getenv('GEMINI_API_KEY') or settings.GEMINI_API_KEY
         if not api_key:
             raise ValueError("GEMINI_API_KEY not found in environment or settings")
 
-        self.client = genai.Client(api_key=api_key)
-        self.model = "gemini-2.5-flash"
-
-    def summarize_text(self, text: str, max_length: Optional[int] = None) -> str:
+        super().__init__(alias, model or settings.GEMINI_MODEL)
+        self.api_key = api_key
+        self.client = genai.Client(api_key=api_key, http_options=self._http_options())
+        self._async_clients = {}
+
+    @staticmethod
+    def _http_options(**async_client_args) -> types.HttpOptions:
+        return types.HttpOptions(
+            base_url=settings.GEMINI_BASE_URL or None,
+            timeout=int(settings.GEMINI_TIMEOUT * 1000),  # Per attempt, in milliseconds
+            async_client_args=async_client_args or None,
+        )
+
+    @property
+    def aio(self) -> genai.client.AsyncClient:
         """
-        Summarize text content using Gemini API.
-
-        Args:
-            text: The text content to summarize
-            max_length: Optional maximum length for the summary in words
+        Async Gemini client for the running event loop.
 
-        Returns:
-            Summarized text
-
-        Raises:
-            Exception: If API call fails
+        httpx connections cannot move between event loops, so each loop gets
+        its own client. Under ASGI that is one client per worker, whose pool
+        of up to GEMINI_MAX_CONNECTIONS keep-alive connections is shared by
+        every request the worker serves.
         """
-        if not text or not text.strip():
-            raise ValueError("Text content cannot be empty")
-
-        # Build prompt
-        prompt = "Please provide a concise summary of the following text:\n\n"
-        if max_length:
-            prompt = f"Please provide a concise summary (max {max_length} words) of the following text:\n\n"
-
-        prompt += text
-
-        try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.3,  # Lower temperature for more focused summaries
-                    max_output_tokens=500,
-                )
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            # Drop clients of finished loops, e.g. from async views served under WSGI
+            for closed in [other for other in self._async_clients if other.is_closed()]:
+                del self._async_clients[closed]
+
+            limits = httpx.Limits(
+                max_connections=settings.GEMINI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GEMINI_MAX_CONNECTIONS,
             )
+            # An explicit transport also keeps google-genai on httpx when aiohttp is installed
+            client = genai.Client(
+                api_key=self.api_key,
+                http_options=self._http_options(transport=httpx.AsyncHTTPTransport(limits=limits)),
+            )
+            self._async_clients[loop] = client
+        return client.aio
+
+    def _complete(self, prompt: str, max_output_tokens: int) -> Completion:
+        response = self.client.models.generate_content(
+            model=self.model,
+            contents=prompt,
+            config=self._generation_config(max_output_tokens),
+        )
+        return self._completion(response)
+
+    async def _acomplete(self, prompt: str, max_output_tokens: int) -> Completion:
+        response = await self.aio.models.generate_content(
+            model=self.model,
+            contents=prompt,
+            config=self._generation_config(max_output_tokens),
+        )
+        return self._completion(response)
+
+    async def _astream(self, prompt: str, max_output_tokens: int) -> AsyncIterator[Completion]:
+        stream = await self.aio.models.generate_content_stream(
+            model=self.model,
+            contents=prompt,
+            config=self._generation_config(max_output_tokens),
+        )
+
+        async def fragments():
+            async for chunk in stream:
+                yield self._completion(chunk, strip=False)
+
+        return fragments()
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        response = self.client.models.embed_content(
+            model=settings.GEMINI_EMBEDDING_MODEL,
+            contents=texts,
+        )
+        return [embedding.values for embedding in response.embeddings]
+
+    @staticmethod
+    def _completion(response: types.GenerateContentResponse, strip: bool = True) -> Completion:
+        usage = response.usage_metadata
+        text = response.text or ''
+        return Completion(
+            text.strip() if strip else text,
+            usage and usage.prompt_token_count,
+            usage and usage.candidates_token_count,
+        )
+
+    @staticmethod
+    def _generation_config(max_output_tokens: int) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            temperature=0.3,  # Lower temperature for more focused summaries
+            max_output_tokens=max_output_tokens,
+        )
 
-            return response.text.strip()
-
-        except Exception as e:
-            raise Exception(f"Failed to summarize text: {str(e)}")
-
-    def summarize_pdf(self, pdf_path: str, max_length: Optional[int] = None) -> str:
-        """
-        Extract text from PDF and summarize it using Gemini API.
-
-        Args:
-            pdf_path: Path to the PDF file
-            max_length: Optional maximum length for the summary in words
-
-        Returns:
-            Summarized text from PDF
-
-        Raises:
-            Exception: If PDF extraction or API call fails
-        """
-        try:
-            # Extract text from PDF
-            extracted_text = self._extract_text_from_pdf(pdf_path)
-
-            if not extracted_text or not extracted_text.strip():
-                raise ValueError("No text could be extracted from the PDF")
-
-            # Summarize the extracted text
-            return self.summarize_text(extracted_text, max_length)
-
-        except Exception as e:
-            raise Exception(f"Failed to summarize PDF: {str(e)}")
-
-    def _extract_text_from_pdf(self, pdf_path: str) -> str:
-        """
-        Extract text from PDF file using PyPDF library.
-
-        Args:
-            pdf_path: Path to the PDF file
-
-        Returns:
-            Extracted text from all pages
-
-        Raises:
-            Exception: If PDF extraction fails
-        """
-        try:
-            from pypdf import PdfReader
-
-            reader = PdfReader(pdf_path)
-            text = ""
-
-            # Extract text from all pages
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-
-            return text.strip()
-
-        except ImportError:
-            raise Exception("pypdf library not installed. Install with: pip install pypdf")
-        except Exception as e:
-            raise Exception(f"Failed to extract text from PDF: {str(e)}")
-
-
-# Singleton instance
-_gemini_service = None
-
-def get_gemini_service() -> GeminiService:
-    """Get or create GeminiService singleton instance."""
-    global _gemini_service
-    if _gemini_service is None:
-        _gemini_service = GeminiService()
-    return _gemini_service
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+"""
+Ingestion pipeline that prepares new and changed content before anyone asks.
+
+When text or PDF content is created, or its text or file changes, an
+IngestionJob is queued once the save commits. The summary worker
+(`manage.py run_summary_worker`) runs it after any waiting summary jobs,
+in three stages whose progress is recorded on the content:
+
+1. extraction: read and store the PDF text (skipped for text content)
+2. summary: generate cached summaries for INGESTION_SUMMARY_LENGTHS
+3. index: embed the content's chunks for retrieval
+
+Every stage reuses the caches the request paths read from, so the first
+summarize call and the first chat about fresh content are served from them.
+A failed run is retried like a summary job; stages that already succeeded
+are cache hits on the retry.
+"""
+
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from content.llm import BaseLLMBackend, get_llm_backend
+from content.models import Content, IngestionJob, JobStatus, StageStatus
+from content.rate_limit import RateLimitExceeded
+from content.resilience import UpstreamUnavailable
+from content.retrieval import index_content
+from content.summaries import summarize_content
+from content.text_extraction import get_extracted_text
+from content.usage import usage_scope
+from users.response_cache import invalidate_responses
+
+STAGES = ['extraction_status', 'summary_status', 'index_status']
+
+
+def is_ingestible(content: Content) -> bool:
+    """Whether the content has text or a file the pipeline can work with."""
+    if content.content_type == 'text':
+        return bool(content.text_content)
+    return content.content_type == 'pdf' and bool(content.file)
+
+
+def update_progress(content_id: int, **fields) -> None:
+    """
+    Write pipeline fields of a content without sending signals.
+
+    updated_at is touched and cached responses are invalidated, so clients
+    revalidating or syncing see the new stage statuses.
+    """
+    Content.objects.filter(pk=content_id).update(updated_at=timezone.now(), **fields)
+    invalidate_responses(Content)
+
+
+def start_ingestion(content_id: int) -> Optional[IngestionJob]:
+    """
+    Reset the content's stages and queue the pipeline, unless a run is already waiting.
+
+    Returns:
+        The queued job, or None for content without text to ingest
+    """
+    content = Content.objects.filter(pk=content_id).first()
+    if content is None or not is_ingestible(content):
+        return None
+
+    update_progress(content_id, ingestion_error='', **{stage: StageStatus.PENDING for stage in STAGES})
+    waiting = IngestionJob.objects.filter(content_id=content_id, status=JobStatus.PENDING).first()
+    if waiting is not None:
+        return waiting
+    return IngestionJob.objects.create(content_id=content_id)
+
+
+def _set_stage(content: Content, stage: str, status: str) -> None:
+    setattr(content, stage, status)
+    update_progress(content.pk, **{stage: status})
+
+
+def run_pipeline(content: Content,
+                 get_service: Callable[[], BaseLLMBackend] = get_llm_backend) -> None:
+    """
+    Run the ingestion stages for one content, recording each stage's status.
+
+    Stages after a failed extraction are skipped; a failed summary stage does
+    not stop indexing. Usage is attributed to the content's creator.
+
+    Raises:
+        Exception: The first stage error, once the remaining stages have run
+    """
+    error = None
+
+    def stage(name: str, func: Callable[[], None]) -> None:
+        nonlocal error
+        _set_stage(content, name, StageStatus.RUNNING)
+        try:
+            func()
+        except Exception as e:
+            # Out of quota or an open circuit breaker: the stage waits for the retry
+            postponed = isinstance(e, (RateLimitExceeded, UpstreamUnavailable))
+            _set_stage(content, name, StageStatus.PENDING if postponed else StageStatus.FAILED)
+            error = error or e
+        else:
+            _set_stage(content, name, StageStatus.SUCCEEDED)
+
+    def summaries():
+        for max_length in settings.INGESTION_SUMMARY_LENGTHS:
+            summarize_content(content, max_length or None, get_service=get_service)
+
+    with usage_scope(content.created_by_id, content.training_id):
+        if content.content_type == 'pdf':
+            stage('extraction_status', lambda: _extract(content))
+        else:
+            _set_stage(content, 'extraction_status', StageStatus.SKIPPED)
+
+        if content.extraction_status == StageStatus.FAILED:
+            _set_stage(content, 'summary_status', StageStatus.SKIPPED)
+            _set_stage(content, 'index_status', StageStatus.SKIPPED)
+        else:
+            stage('summary_status', summaries)
+            stage('index_status', lambda: index_content(content))
+
+    if error is not None:
+        raise error
+    update_progress(content.pk, ingestion_error='', ingested_at=timezone.now())
+
+
+def _extract(content: Content) -> None:
+    if not get_extracted_text(content).text.strip():
+        raise ValueError("No text could be extracted from the PDF")
+
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+
+"""
+Database-backed queue for asynchronous summarization jobs.
+
+The summarize endpoint enqueues a SummaryJob and returns immediately; a
+worker started with `manage.py run_summary_worker` claims pending jobs and
+runs them on a thread pool. Jobs are claimed with a conditional UPDATE, so
+several worker processes can share the queue without an external broker.
+Failed jobs are retried with exponential backoff up to SUMMARY_JOB_MAX_ATTEMPTS.
+
+The same worker runs the ingestion pipeline for new and changed content
+(see ingestion.py) whenever no summary job is waiting.
+"""
+
+import logging
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from content.ingestion import run_pipeline, update_progress
+from content.models import Content, IngestionJob, JobStatus, SummaryJob
+from content.llm import get_llm_backend
+from content.rate_limit import RateLimitExceeded
+from content.resilience import UpstreamUnavailable
+from content.summaries import summarize_content
+from content.usage import usage_scope
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_summary_job(content: Content, max_length: Optional[int] = None, user=None) -> SummaryJob:
+    """Queue a summarization job for the background worker."""
+    return SummaryJob.objects.create(content=content, max_length=max_length, requested_by=user)
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Return summary and ingestion jobs left running by a crashed worker to the queue.
+
+    Jobs that already had SUMMARY_JOB_MAX_ATTEMPTS attempts are marked failed
+    instead, so a job that keeps crashing its worker is not retried forever.
+
+    Returns:
+        The number of jobs requeued or failed
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=settings.SUMMARY_JOB_TIMEOUT)
+    error = 'The worker stopped while running the job'
+    handled = 0
+    for model in (SummaryJob, IngestionJob):
+        stale = model.objects.filter(status=JobStatus.RUNNING, started_at__lt=cutoff)
+        exhausted = stale.filter(attempts__gte=settings.SUMMARY_JOB_MAX_ATTEMPTS)
+        if model is IngestionJob:
+            for content_id in exhausted.values_list('content_id', flat=True):
+                update_progress(content_id, ingestion_error=error)
+        handled += exhausted.update(status=JobStatus.FAILED, error=error, finished_at=now)
+        handled += stale.update(status=JobStatus.PENDING, run_after=now)
+    return handled
+
+
+def claim_next_job() -> Optional[SummaryJob]:
+    """Atomically mark the oldest runnable job as running and return it."""
+    while True:
+        job_id = (
+            SummaryJob.objects.filter(status=JobStatus.PENDING, run_after__lte=timezone.now())
+            .order_by('run_after', 'id')
+            .values_list('id', flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+
+        claimed = SummaryJob.objects.filter(id=job_id, status=JobStatus.PENDING).update(
+            status=JobStatus.RUNNING,
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return SummaryJob.objects.select_related('content').get(id=job_id)
+        # Another worker claimed it first, try the next one
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter for the given attempt number."""
+    base = settings.SUMMARY_JOB_RETRY_BACKOFF * (2 ** (attempts - 1))
+    return base + random.uniform(0, base / 2)
+
+
+def run_job(job: SummaryJob) -> None:
+    """Run a claimed job and record its result, scheduling a retry on failure."""
+    try:
+        with usage_scope(job.requested_by_id, job.content.training_id):
+            summary, cached = summarize_content(job.content, job.max_length, get_service=get_llm_backend)
+
+    except (RateLimitExceeded, UpstreamUnavailable) as e:
+        # Out of quota or an open circuit breaker is not a failure of the job, so the attempt is given back
+        job.status = JobStatus.PENDING
+        job.attempts -= 1
+        job.run_after = timezone.now() + timedelta(seconds=e.retry_after)
+
+    except ValueError as e:
+        # Bad input will not succeed on retry
+        job.status = JobStatus.FAILED
+        job.error = str(e)
+        job.finished_at = timezone.now()
+
+    except Exception as e:
+        logger.warning("Summary job %s attempt %s failed: %s", job.id, job.attempts, e)
+        job.error = str(e)
+        if job.attempts < settings.SUMMARY_JOB_MAX_ATTEMPTS:
+            job.status = JobStatus.PENDING
+            job.run_after = timezone.now() + timedelta(seconds=retry_delay(job.attempts))
+        else:
+            job.status = JobStatus.FAILED
+            job.finished_at = timezone.now()
+
+    else:
+        job.status = JobStatus.SUCCEEDED
+        job.summary = summary
+        job.cached = cached
+        job.error = ''
+        job.finished_at = timezone.now()
+
+    job.save(update_fields=['status', 'attempts', 'summary', 'cached', 'error', 'run_after', 'finished_at'])
+
+
+def claim_next_ingestion_job() -> Optional[IngestionJob]:
+    """
+    Atomically mark the oldest runnable ingestion job as running and return it.
+
+    Content already being ingested is passed over, so a run queued by a
+    later edit waits for the one in progress.
+    """
+    while True:
+        job_id = (
+            IngestionJob.objects.filter(status=JobStatus.PENDING, run_after__lte=timezone.now())
+            .exclude(content__ingestion_jobs__status=JobStatus.RUNNING)
+            .order_by('run_after', 'id')
+            .values_list('id', flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+
+        claimed = IngestionJob.objects.filter(id=job_id, status=JobStatus.PENDING).update(
+            status=JobStatus.RUNNING,
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return IngestionJob.objects.select_related('content').get(id=job_id)
+
+
+def run_ingestion_job(job: IngestionJob) -> None:
+    """Run a claimed ingestion job, scheduling a retry on failure."""
+    try:
+        run_pipeline(job.content, get_service=get_llm_backend)
+
+    except (RateLimitExceeded, UpstreamUnavailable) as e:
+        job.status = JobStatus.PENDING
+        job.attempts -= 1
+        job.run_after = timezone.now() + timedelta(seconds=e.retry_after)
+
+    except ValueError as e:
+        # No usable text will not change on retry
+        job.status = JobStatus.FAILED
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        update_progress(job.content_id, ingestion_error=str(e))
+
+    except Exception as e:
+        logger.warning("Ingestion job %s attempt %s failed: %s", job.id, job.attempts, e)
+        job.error = str(e)
+        if job.attempts < settings.SUMMARY_JOB_MAX_ATTEMPTS:
+            job.status = JobStatus.PENDING
+            job.run_after = timezone.now() + timedelta(seconds=retry_delay(job.attempts))
+        else:
+            job.status = JobStatus.FAILED
+            job.finished_at = timezone.now()
+            update_progress(job.content_id, ingestion_error=str(e))
+
+    else:
+        job.status = JobStatus.SUCCEEDED
+        job.error = ''
+        job.finished_at = timezone.now()
+
+    job.save(update_fields=['status', 'attempts', 'error', 'run_after', 'finished_at'])
+
+
+def process_next_job() -> bool:
+    """
+    Claim and run one job in the current thread, summary jobs before ingestion jobs.
+
+    Returns False when both queues are empty.
+    """
+    job = claim_next_job()
+    if job is not None:
+        run_job(job)
+        return True
+
+    ingestion_job = claim_next_ingestion_job()
+    if ingestion_job is not None:
+        run_ingestion_job(ingestion_job)
+        return True
+    return False
+
+
+class SummaryWorker:
+    """Poll the job table and run jobs on a pool of worker threads."""
+
+    def __init__(self, workers: Optional[int] = None, poll_interval: Optional[float] = None):
+        self.workers = workers or settings.SUMMARY_JOB_WORKERS
+        self.poll_interval = poll_interval or settings.SUMMARY_JOB_POLL_INTERVAL
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self, once: bool = False) -> None:
+        """
+        Process jobs until stopped.
+
+        Args:
+            once: Exit as soon as the queue is drained instead of polling
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while not self._stop.is_set():
+                requeue_stale_jobs()
+                results = [pool.submit(self._drain) for _ in range(self.workers)]
+                processed = sum(future.result() for future in results)
+
+                if once and not processed:
+                    break
+                if not processed:
+                    self._stop.wait(self.poll_interval)
+
+    def _drain(self) -> int:
+        """Run jobs in this thread until the queue is empty."""
+        processed = 0
+        try:
+            while not self._stop.is_set() and process_next_job():
+                processed += 1
+        except Exception:
+            logger.exception("Summary worker thread failed")
+        finally:
+            close_old_connections()
+        return processed
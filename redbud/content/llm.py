@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+
+"""
+Pluggable LLM backends for summarization, chat and embeddings.
+
+LLM_BACKENDS in settings maps aliases to a backend class, its model name and
+constructor options, in the style of Django's CACHES; LLM_BACKEND picks the
+alias the application uses. get_llm_backend() returns one shared instance
+per alias, rebuilt whenever those settings change (e.g. override_settings).
+
+BaseLLMBackend owns everything providers have in common: the prompts, the
+shared rate limit, retries and the circuit breaker, and usage accounting.
+A provider only implements the four raw calls (_complete, _acomplete,
+_astream and _embed). Rate limit buckets and circuit breakers are named
+after the alias, so each backend has its own.
+"""
+
+import threading
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from content.rate_limit import RateLimiter, RateLimitExceeded, estimate_tokens
+from content.resilience import (
+    UpstreamError,
+    acall_with_retries,
+    call_with_retries,
+    get_breaker,
+    is_retryable,
+)
+from content.usage import record_usage
+
+
+# Bump whenever the summary prompts change so cached summaries are regenerated
+PROMPT_VERSION = "1"
+
+DEFAULT_OUTPUT_TOKENS = 500
+CHUNK_OUTPUT_TOKENS = 400
+
+
+class Completion(NamedTuple):
+    """Generated text and the token counts reported by the provider, if any."""
+    text: str
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+
+
+class BaseLLMBackend:
+    """Interface and shared behaviour of LLM backends."""
+
+    def __init__(self, alias: str, model: str):
+        self.alias = alias
+        self.model = model
+        self.limiter = RateLimiter(alias)
+        self.breaker = get_breaker(alias)
+
+    def _complete(self, prompt: str, max_output_tokens: int) -> Completion:
+        """Send one prompt and return the completion. Errors are retried by the caller."""
+        raise NotImplementedError
+
+    async def _acomplete(self, prompt: str, max_output_tokens: int) -> Completion:
+        """Coroutine version of _complete."""
+        raise NotImplementedError
+
+    async def _astream(self, prompt: str, max_output_tokens: int) -> AsyncIterator[Completion]:
+        """
+        Open a streamed completion.
+
+        Returns an async iterator of text fragments; token counts may be set
+        on any fragment and the last reported ones win.
+        """
+        raise NotImplementedError
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        """Return one embedding vector per text."""
+        raise NotImplementedError
+
+    def summarize_text(self, text: str, max_length: Optional[int] = None) -> str:
+        """
+        Summarize text content.
+
+        Args:
+            text: The text content to summarize
+            max_length: Optional maximum length for the summary in words
+
+        Returns:
+            Summarized text
+
+        Raises:
+            UpstreamError: If the API call fails or the circuit breaker is open
+        """
+        prompt = self._summary_prompt(text, max_length)
+
+        try:
+            return self._generate(prompt, self._output_token_budget(max_length))
+        except (RateLimitExceeded, UpstreamError):
+            raise
+        except Exception as e:
+            raise UpstreamError(f"Failed to summarize text: {str(e)}") from e
+
+    async def asummarize_text(self, text: str, max_length: Optional[int] = None) -> str:
+        """
+        Summarize text content without blocking the event loop.
+
+        Args:
+            text: The text content to summarize
+            max_length: Optional maximum length for the summary in words
+
+        Returns:
+            Summarized text
+
+        Raises:
+            UpstreamError: If the API call fails or the circuit breaker is open
+        """
+        prompt = self._summary_prompt(text, max_length)
+
+        try:
+            return await self._agenerate(prompt, self._output_token_budget(max_length))
+        except (RateLimitExceeded, UpstreamError):
+            raise
+        except Exception as e:
+            raise UpstreamError(f"Failed to summarize text: {str(e)}") from e
+
+    async def astream_summary(self, text: str, max_length: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        Summarize text content, yielding the summary as it is generated.
+
+        Args:
+            text: The text content to summarize
+            max_length: Optional maximum length for the summary in words
+
+        Yields:
+            Summary text fragments in order
+
+        Raises:
+            UpstreamError: If the API call fails or the circuit breaker is open
+        """
+        prompt = self._summary_prompt(text, max_length)
+        max_output_tokens = self._output_token_budget(max_length)
+        estimate = estimate_tokens(prompt)
+
+        async def attempt():
+            await self.limiter.aacquire(estimate)
+            return await self._astream(prompt, max_output_tokens)
+
+        try:
+            # Only opening the stream is retried; fragments already sent cannot be taken back
+            stream = await acall_with_retries(self.breaker, attempt)
+            usage = Completion('')
+            try:
+                async for fragment in stream:
+                    if fragment.input_tokens is not None or fragment.output_tokens is not None:
+                        usage = fragment
+                    if fragment.text:
+                        yield fragment.text
+            except Exception as e:
+                if is_retryable(e):
+                    self.breaker.record_failure()
+                raise
+            await sync_to_async(self._record_usage)(usage, estimate)
+        except (RateLimitExceeded, UpstreamError):
+            raise
+        except Exception as e:
+            raise UpstreamError(f"Failed to summarize text: {str(e)}") from e
+
+    def summarize_chunk(self, text: str) -> str:
+        """
+        Summarize one section of a document too large for a single prompt.
+
+        Args:
+            text: The section text
+
+        Returns:
+            Summary of the section
+
+        Raises:
+            UpstreamError: If the API call fails or the circuit breaker is open
+        """
+        prompt = (
+            "The following is one section of a longer document. Summarize it, "
+            "keeping every key fact, term and instruction:\n\n" + text
+        )
+
+        try:
+            return self._generate(prompt, CHUNK_OUTPUT_TOKENS)
+        except (RateLimitExceeded, UpstreamError):
+            raise
+        except Exception as e:
+            raise UpstreamError(f"Failed to summarize text: {str(e)}") from e
+
+    def combine_summaries(self, summaries: List[str], max_length: Optional[int] = None) -> str:
+        """
+        Combine summaries of consecutive document sections into one summary.
+
+        Args:
+            summaries: Section summaries in document order
+            max_length: Optional maximum length for the summary in words
+
+        Returns:
+            Combined summary
+
+        Raises:
+            UpstreamError: If the API call fails or the circuit breaker is open
+        """
+        limit = f" (max {max_length} words)" if max_length else ""
+        prompt = (
+            "The following are summaries of consecutive sections of one document. "
+            f"Combine them into a single concise summary{limit} of the whole document:\n\n"
+            + "\n\n".join(summaries)
+        )
+
+        try:
+            return self._generate(prompt, self._output_token_budget(max_length))
+        except (RateLimitExceeded, UpstreamError):
+            raise
+        except Exception as e:
+            raise UpstreamError(f"Failed to summarize text: {str(e)}") from e
+
+    def answer_question(self, question: str, passages: List[str]) -> str:
+        """
+        Answer a question using only the given training material passages.
+
+        Args:
+            question: The learner's question
+            passages: Relevant passages retrieved from the training content
+
+        Returns:
+            Answer text
+
+        Raises:
+            UpstreamError: If the API call fails or the circuit breaker is open
+        """
+        if not question or not question.strip():
+            raise ValueError("Question cannot be empty")
+
+        context = "\n\n".join(f"[{i}] {passage}" for i, passage in enumerate(passages, start=1))
+        prompt = (
+            "You are a training assistant. Answer the question using only the numbered "
+            "passages from the training material below, citing passage numbers in brackets. "
+            "If the passages do not contain the answer, say so.\n\n"
+            f"Passages:\n{context}\n\nQuestion: {question}"
+        )
+
+        try:
+            return self._generate(prompt, DEFAULT_OUTPUT_TOKENS)
+        except (RateLimitExceeded, UpstreamError):
+            raise
+        except Exception as e:
+            raise UpstreamError(f"Failed to answer question: {str(e)}") from e
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Compute embeddings for a batch of texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One embedding vector per text
+
+        Raises:
+            UpstreamError: If the API call fails or the circuit breaker is open
+        """
+        estimate = sum(estimate_tokens(text) for text in texts)
+
+        def attempt():
+            self.limiter.acquire(estimate)
+            return self._embed(texts)
+
+        try:
+            vectors = call_with_retries(self.breaker, attempt)
+            record_usage(estimate, 0)
+            return vectors
+        except (RateLimitExceeded, UpstreamError):
+            raise
+        except Exception as e:
+            raise UpstreamError(f"Failed to embed text: {str(e)}") from e
+
+    def _generate(self, prompt: str, max_output_tokens: int) -> str:
+        """Send a prompt within the rate limits and return the response text."""
+        estimate = estimate_tokens(prompt)
+
+        def attempt():
+            # Each retry is a new request, so it takes its own rate limit budget
+            self.limiter.acquire(estimate)
+            return self._complete(prompt, max_output_tokens)
+
+        completion = call_with_retries(self.breaker, attempt)
+        self._record_usage(completion, estimate)
+
+        return completion.text.strip()
+
+    async def _agenerate(self, prompt: str, max_output_tokens: int) -> str:
+        """Send a prompt on the async client and return the response text."""
+        estimate = estimate_tokens(prompt)
+
+        async def attempt():
+            await self.limiter.aacquire(estimate)
+            return await self._acomplete(prompt, max_output_tokens)
+
+        completion = await acall_with_retries(self.breaker, attempt)
+        await sync_to_async(self._record_usage)(completion, estimate)
+
+        return completion.text.strip()
+
+    def _record_usage(self, completion: Completion, estimate: int) -> None:
+        """Correct the token bucket to the actual input tokens and update usage counters."""
+        input_tokens = completion.input_tokens or estimate
+        output_tokens = completion.output_tokens or 0
+        # The tokens-per-minute quota counts input tokens
+        self.limiter.adjust(input_tokens - estimate)
+        record_usage(input_tokens, output_tokens)
+
+    @staticmethod
+    def _summary_prompt(text: str, max_length: Optional[int]) -> str:
+        """Build the summary prompt, rejecting empty text."""
+        if not text or not text.strip():
+            raise ValueError("Text content cannot be empty")
+
+        prompt = "Please provide a concise summary of the following text:\n\n"
+        if max_length:
+            prompt = f"Please provide a concise summary (max {max_length} words) of the following text:\n\n"
+
+        return prompt + text
+
+    @staticmethod
+    def _output_token_budget(max_length: Optional[int]) -> int:
+        """Allow roughly two tokens per requested word, never less than the default."""
+        if not max_length:
+            return DEFAULT_OUTPUT_TOKENS
+        return max(DEFAULT_OUTPUT_TOKENS, max_length * 2)
+
+
+_backends: Dict[str, BaseLLMBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def _backend_config(alias: str) -> dict:
+    try:
+        return settings.LLM_BACKENDS[alias]
+    except KeyError:
+        raise ImproperlyConfigured(f"LLM backend '{alias}' is not defined in LLM_BACKENDS")
+
+
+def get_llm_backend(alias: Optional[str] = None) -> BaseLLMBackend:
+    """Get or create the shared backend for an alias, by default LLM_BACKEND."""
+    alias = alias or settings.LLM_BACKEND
+    with _backends_lock:
+        backend = _backends.get(alias)
+        if backend is None:
+            config = _backend_config(alias)
+            backend = import_string(config['BACKEND'])(
+                alias=alias, model=config.get('MODEL', alias), **config.get('OPTIONS', {})
+            )
+            _backends[alias] = backend
+        return backend
+
+
+def get_model_name(alias: Optional[str] = None) -> str:
+    """
+    Model name of a backend, by default LLM_BACKEND, without creating it.
+
+    Cached summaries are keyed by it, so switching backend or model never
+    serves another model's summaries.
+    """
+    alias = alias or settings.LLM_BACKEND
+    return _backend_config(alias).get('MODEL', alias)
+
+
+@receiver(setting_changed)
+def _reset_backends(*, setting, **kwargs):
+    """Rebuild backends after their settings change, e.g. under override_settings."""
+    if setting.startswith(('LLM_', 'GEMINI_')):
+        with _backends_lock:
+            _backends.clear()
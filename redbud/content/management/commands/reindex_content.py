@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+from django.core.management.base import BaseCommand
+
+from content.models import Content, ContentChunk
+from content.retrieval import INDEXABLE_TYPES, get_embedder, reconcile_index
+
+
+class Command(BaseCommand):
+    help = "Reconcile retrieval chunks and embeddings with the current content"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--training', type=int, action='append', help='Only reconcile this training (repeatable)')
+        parser.add_argument('--batch-size', type=int, help='Chunks per embedding call (default: RETRIEVAL_EMBED_BATCH_SIZE)')
+
+    def handle(self, *args, **options):
+        contents = Content.objects.filter(content_type__in=INDEXABLE_TYPES, is_active=True).order_by('id')
+        if options['training']:
+            contents = contents.filter(training_id__in=options['training'])
+
+        embedder = get_embedder()
+        self.stdout.write(f"Reconciling {contents.count()} contents with embedder {embedder.name}")
+
+        result = reconcile_index(contents.iterator(), embedder, options['batch_size'])
+
+        orphaned = ContentChunk.objects.exclude(content__content_type__in=INDEXABLE_TYPES)
+        if options['training']:
+            orphaned = orphaned.filter(training_id__in=options['training'])
+        result = result._replace(deleted=result.deleted + orphaned.delete()[0])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Kept {result.kept} chunks, embedded {result.embedded}, deleted {result.deleted}"
+            + (f", {result.failed} contents failed" if result.failed else "")
+        ))
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+
+from django.core.management.base import BaseCommand
+
+from content.jobs import SummaryWorker
+
+
+class Command(BaseCommand):
+    help = "Run the background worker that processes queued summarization jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, help='Worker threads (default: SUMMARY_JOB_WORKERS)')
+        parser.add_argument('--poll-interval', type=float, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is drained')
+
+    def handle(self, *args, **options):
+        worker = SummaryWorker(workers=options['workers'], poll_interval=options['poll_interval'])
+        self.stdout.write(f"Summary worker started with {worker.workers} threads")
+
+        try:
+            worker.run(once=options['once'])
+        except KeyboardInterrupt:
+            worker.stop()
+
+        self.stdout.write(self.style.SUCCESS("Summary worker stopped"))
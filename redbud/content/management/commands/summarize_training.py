@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+from django.core.management.base import BaseCommand, CommandError
+
+from content.batches import summarize_training
+from content.llm import get_llm_backend
+from content.models import Training
+from content.summaries import parse_max_length
+
+
+class Command(BaseCommand):
+    help = "Generate and cache summaries for every text and PDF content of one or more trainings"
+
+    def add_arguments(self, parser):
+        parser.add_argument('training_ids', nargs='+', type=int, help='Trainings to summarize')
+        parser.add_argument('--max-length', type=int, help='Maximum summary length in words (50-1000)')
+        parser.add_argument('--workers', type=int, help='Concurrent summaries (default: SUMMARY_BATCH_WORKERS)')
+
+    def handle(self, *args, **options):
+        try:
+            max_length = parse_max_length(options['max_length'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for training_id in options['training_ids']:
+            training = Training.objects.filter(id=training_id).first()
+            if training is None:
+                raise CommandError(f"Training {training_id} does not exist")
+
+            self.stdout.write(f"Summarizing {training.name}")
+            result = summarize_training(
+                training, max_length, workers=options['workers'],
+                get_service=get_llm_backend, progress=self.report,
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"{training.name}: {result.generated} generated, {result.cached} cached, "
+                f"{result.failed} failed of {result.total}"
+            ))
+
+    def report(self, done, todo, content, error):
+        if error is None:
+            self.stdout.write(f"  [{done}/{todo}] {content.title}")
+        else:
+            self.stderr.write(f"  [{done}/{todo}] {content.title}: {error}")
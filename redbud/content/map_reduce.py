@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+
+"""
+Map-reduce summarization for documents larger than one prompt.
+
+The text is split into chunks under a token budget, chunks are summarized
+concurrently (map) and the chunk summaries are combined into one summary
+(reduce). Chunk summaries are cached by a hash of the chunk text, and chunk
+boundaries are chosen from the content itself, so editing one section of a
+document only re-summarizes the chunks around the edit.
+"""
+
+import contextvars
+import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from django.conf import settings
+from django.db import connection
+
+from content.models import ChunkSummary
+from content.llm import PROMPT_VERSION, BaseLLMBackend, get_model_name
+from content.rate_limit import estimate_tokens
+
+# A paragraph closes a chunk once the chunk is half full and the paragraph
+# hash hits this modulus, which keeps boundaries stable across edits
+BOUNDARY_MODULUS = 4
+
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+
+def _split_oversized(paragraph: str, chunk_tokens: int) -> List[str]:
+    """Split a paragraph larger than the budget at whitespace."""
+    limit = chunk_tokens * 4
+    pieces = []
+    while len(paragraph) > limit:
+        cut = paragraph.rfind(' ', 0, limit)
+        if cut <= 0:
+            cut = limit
+        pieces.append(paragraph[:cut])
+        paragraph = paragraph[cut:].lstrip()
+    if paragraph:
+        pieces.append(paragraph)
+    return pieces
+
+
+def _is_boundary(paragraph: str) -> bool:
+    return hashlib.sha256(paragraph.encode('utf-8')).digest()[0] % BOUNDARY_MODULUS == 0
+
+
+def split_into_chunks(text: str, chunk_tokens: int) -> List[str]:
+    """
+    Split text into chunks of at most chunk_tokens estimated tokens.
+
+    Chunks are built from whole paragraphs where possible.
+    """
+    paragraphs = []
+    for paragraph in PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if paragraph:
+            paragraphs.extend(_split_oversized(paragraph, chunk_tokens))
+
+    chunks = []
+    current = []
+    current_tokens = 0
+    for paragraph in paragraphs:
+        tokens = estimate_tokens(paragraph) + 1
+        if current and current_tokens + tokens > chunk_tokens:
+            chunks.append('\n\n'.join(current))
+            current, current_tokens = [], 0
+
+        current.append(paragraph)
+        current_tokens += tokens
+
+        if current_tokens >= chunk_tokens // 2 and _is_boundary(paragraph):
+            chunks.append('\n\n'.join(current))
+            current, current_tokens = [], 0
+
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+
+class MapReduceSummarizer:
+    """Summarize long text by summarizing chunks concurrently and combining the results."""
+
+    def __init__(self, service: BaseLLMBackend, chunk_tokens: Optional[int] = None,
+                 concurrency: Optional[int] = None):
+        self.service = service
+        self.chunk_tokens = chunk_tokens or settings.SUMMARY_CHUNK_TOKENS
+        self.concurrency = concurrency or settings.SUMMARY_MAP_CONCURRENCY
+
+    def summarize(self, text: str, max_length: Optional[int] = None) -> str:
+        """
+        Summarize text of any length.
+
+        Args:
+            text: The text content to summarize
+            max_length: Optional maximum length for the final summary in words
+
+        Returns:
+            Summarized text
+        """
+        chunks = split_into_chunks(text, self.chunk_tokens)
+        summaries = self._cached_map('map', chunks, self.service.summarize_chunk)
+
+        # Reduce in rounds until the partial summaries fit in one prompt
+        while len(summaries) > 1 and estimate_tokens('\n\n'.join(summaries)) > self.chunk_tokens:
+            groups = self._group(summaries)
+            if len(groups) == len(summaries):
+                break
+            summaries = self._cached_map(
+                'reduce', groups, lambda group: self.service.combine_summaries([group])
+            )
+
+        return self.service.combine_summaries(summaries, max_length)
+
+    def _group(self, summaries: List[str]) -> List[str]:
+        """Pack consecutive summaries into groups that fit the token budget."""
+        groups = []
+        current = []
+        current_tokens = 0
+        for summary in summaries:
+            tokens = estimate_tokens(summary) + 1
+            if current and current_tokens + tokens > self.chunk_tokens:
+                groups.append('\n\n'.join(current))
+                current, current_tokens = [], 0
+            current.append(summary)
+            current_tokens += tokens
+        if current:
+            groups.append('\n\n'.join(current))
+        return groups
+
+    def _cached_map(self, stage: str, items: List[str], func: Callable[[str], str]) -> List[str]:
+        """Apply func to items concurrently, reusing cached results by item hash."""
+        keys = [self._key(stage, item) for item in items]
+        results = dict(
+            ChunkSummary.objects.filter(key__in=set(keys)).values_list('key', 'summary')
+        )
+
+        missing = {}
+        for key, item in zip(keys, items):
+            if key not in results:
+                missing[key] = item
+
+        if missing:
+            # API calls run in worker threads with the caller's usage scope; the
+            # rate limiter's queries there use per-thread connections, closed after each call
+            context = contextvars.copy_context()
+
+            def call(item):
+                try:
+                    return context.copy().run(func, item)
+                finally:
+                    connection.close()
+
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                generated = dict(zip(missing, pool.map(call, missing.values())))
+
+            ChunkSummary.objects.bulk_create(
+                [
+                    ChunkSummary(
+                        key=key,
+                        model_name=get_model_name(),
+                        prompt_version=PROMPT_VERSION,
+                        summary=summary,
+                    )
+                    for key, summary in generated.items()
+                ],
+                ignore_conflicts=True,
+            )
+            results.update(generated)
+
+        return [results[key] for key in keys]
+
+    def _key(self, stage: str, text: str) -> str:
+        raw = '|'.join([stage, get_model_name(), PROMPT_VERSION, text])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
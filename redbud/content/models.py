@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from users.models import User, Training
 
 
@@ -10,6 +12,35 @@ class ContentType(models.TextChoices):
     TEXT = 'text', 'Text Content'
 
 
+class StageStatus(models.TextChoices):
+    NOT_STARTED = '', 'Not started'
+    PENDING = 'pending', 'Pending'
+    RUNNING = 'running', 'Running'
+    SUCCEEDED = 'succeeded', 'Succeeded'
+    FAILED = 'failed', 'Failed'
+    SKIPPED = 'skipped', 'Skipped'
+
+
+class ContentQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Content a user may see: everything for managers, assigned trainings
+        for trainers, and active content of enrolled trainings otherwise
+        """
+        from users.access import load_access_scope
+
+        return self.in_scope(load_access_scope(user))
+
+    def in_scope(self, scope):
+        """Content visible within an access scope, see visible_to"""
+        if scope.sees_everything:
+            return self.all()
+        queryset = self.filter(training_id__in=scope.training_filter())
+        if scope.role == 'trainer':
+            return queryset
+        return queryset.filter(is_active=True)
+
+
 class Content(models.Model):
     """
     Content model to store training materials
@@ -35,8 +66,23 @@ class Content(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Ingestion pipeline run in the background when the text or file changes
+    extraction_status = models.CharField(max_length=20, choices=StageStatus.choices, default='', blank=True)
+    summary_status = models.CharField(max_length=20, choices=StageStatus.choices, default='', blank=True)
+    index_status = models.CharField(max_length=20, choices=StageStatus.choices, default='', blank=True)
+    ingestion_error = models.TextField(blank=True)
+    ingested_at = models.DateTimeField(blank=True, null=True, help_text="When the last ingestion finished")
+
+    objects = ContentQuerySet.as_manager()
+
     class Meta:
         ordering = ['training', 'order']
+        indexes = [
+            # Content of a training in order, active content for employees, delta sync
+            models.Index(fields=['training', 'order'], name='content_training_order_idx'),
+            models.Index(fields=['training', 'is_active', 'order'], name='content_training_active_idx'),
+            models.Index(fields=['updated_at'], name='content_updated_at_idx'),
+        ]
         verbose_name = 'Content'
         verbose_name_plural = 'Contents'
 
@@ -56,3 +102,243 @@ class Content(models.Model):
         elif self.content_type == 'text':
             if not self.text_content:
                 raise ValidationError('Text content is required for text content type')
+
+
+class ExtractedText(models.Model):
+    """
+    Text extracted from a content file, keyed by the file checksum
+    """
+    content = models.OneToOneField(Content, on_delete=models.CASCADE, related_name='extracted_text')
+    file_name = models.CharField(max_length=255)
+    checksum = models.CharField(max_length=64, db_index=True)
+    text = models.TextField(blank=True)
+    page_count = models.PositiveIntegerField(default=0)
+    page_offsets = models.JSONField(default=list, help_text="Start offset of each page within text")
+    extracted_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Extracted Text'
+        verbose_name_plural = 'Extracted Texts'
+
+    def __str__(self):
+        return f"{self.content.title} ({self.page_count} pages)"
+
+    def get_pages(self, start=0, stop=None):
+        """Return the text of pages [start, stop) without re-reading the PDF"""
+        bounds = self.page_offsets + [len(self.text) + 1]
+        return [
+            self.text[bounds[i]:bounds[i + 1] - 1]
+            for i in range(len(self.page_offsets))[start:stop]
+        ]
+
+
+class SummaryCache(models.Model):
+    """
+    Cached AI summary keyed by content hash, max_length, model and prompt version
+    """
+    key = models.CharField(max_length=64, unique=True)
+    content = models.ForeignKey(Content, on_delete=models.CASCADE, related_name='cached_summaries')
+    content_hash = models.CharField(max_length=64)
+    max_length = models.PositiveIntegerField(blank=True, null=True)
+    model_name = models.CharField(max_length=100)
+    prompt_version = models.CharField(max_length=20)
+    summary = models.TextField()
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_accessed_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['-last_accessed_at']
+        verbose_name = 'Summary Cache Entry'
+        verbose_name_plural = 'Summary Cache Entries'
+
+    def __str__(self):
+        return f"{self.content.title} ({self.max_length or 'default'} words, {self.model_name})"
+
+
+class ChunkSummary(models.Model):
+    """
+    Cached summary of one document chunk, shared by every document containing it
+    """
+    key = models.CharField(max_length=64, unique=True)
+    model_name = models.CharField(max_length=100)
+    prompt_version = models.CharField(max_length=20)
+    summary = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Chunk Summary'
+        verbose_name_plural = 'Chunk Summaries'
+
+    def __str__(self):
+        return self.key
+
+
+class SummaryLock(models.Model):
+    """
+    Cross-process lock held while one worker generates a summary
+    """
+    key = models.CharField(max_length=64, unique=True)
+    token = models.CharField(max_length=32)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Summary Lock'
+        verbose_name_plural = 'Summary Locks'
+
+    def __str__(self):
+        return self.key
+
+
+class JobStatus(models.TextChoices):
+    PENDING = 'pending', 'Pending'
+    RUNNING = 'running', 'Running'
+    SUCCEEDED = 'succeeded', 'Succeeded'
+    FAILED = 'failed', 'Failed'
+
+
+class SummaryBatch(models.Model):
+    """
+    Request to summarize every eligible content of a training, tracked through its jobs
+    """
+    training = models.ForeignKey(Training, on_delete=models.CASCADE, related_name='summary_batches')
+    max_length = models.PositiveIntegerField(blank=True, null=True)
+    requested_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='summary_batches'
+    )
+    total = models.PositiveIntegerField(default=0, help_text="Eligible contents in the training")
+    cached = models.PositiveIntegerField(default=0, help_text="Contents skipped because a summary was cached")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Summary Batch'
+        verbose_name_plural = 'Summary Batches'
+
+    def __str__(self):
+        return f"{self.training.name} ({self.total} contents)"
+
+
+class SummaryJob(models.Model):
+    """
+    Queued summarization request processed by the background summary worker
+    """
+    content = models.ForeignKey(Content, on_delete=models.CASCADE, related_name='summary_jobs')
+    max_length = models.PositiveIntegerField(blank=True, null=True)
+    requested_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='summary_jobs'
+    )
+    batch = models.ForeignKey(
+        SummaryBatch, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs'
+    )
+    status = models.CharField(max_length=20, choices=JobStatus.choices, default=JobStatus.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now, help_text="Earliest time the job may run")
+    summary = models.TextField(blank=True)
+    cached = models.BooleanField(default=False)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['status', 'run_after'])]
+        verbose_name = 'Summary Job'
+        verbose_name_plural = 'Summary Jobs'
+
+    def __str__(self):
+        return f"{self.content.title} ({self.get_status_display()})"
+
+
+class ContentChunk(models.Model):
+    """
+    Embedded chunk of content text used for retrieval-augmented chat
+    """
+    content = models.ForeignKey(Content, on_delete=models.CASCADE, related_name='chunks')
+    training = models.ForeignKey(Training, on_delete=models.CASCADE, related_name='content_chunks')
+    position = models.PositiveIntegerField(help_text="Order of the chunk within the content")
+    text = models.TextField()
+    text_hash = models.CharField(max_length=64)
+    embedder = models.CharField(max_length=100)
+    embedding = models.BinaryField(help_text="float32 vector")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['content', 'position']
+        indexes = [models.Index(fields=['training', 'embedder'])]
+        verbose_name = 'Content Chunk'
+        verbose_name_plural = 'Content Chunks'
+
+    def __str__(self):
+        return f"{self.content.title} #{self.position}"
+
+
+class RateLimitBucket(models.Model):
+    """
+    Requests and tokens left in a rate limit shared by every process
+    """
+    name = models.CharField(max_length=100, unique=True)
+    requests = models.FloatField(help_text="Requests left at updated_at")
+    tokens = models.FloatField(help_text="Tokens left at updated_at")
+    updated_at = models.DateTimeField()
+    version = models.PositiveBigIntegerField(default=0, help_text="Bumped on every write for compare-and-set updates")
+
+    class Meta:
+        verbose_name = 'Rate Limit Bucket'
+        verbose_name_plural = 'Rate Limit Buckets'
+
+    def __str__(self):
+        return self.name
+
+
+class GeminiUsage(models.Model):
+    """
+    Daily Gemini API usage per user and training
+    """
+    date = models.DateField()
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='gemini_usage')
+    training = models.ForeignKey(
+        Training, on_delete=models.SET_NULL, null=True, blank=True, related_name='gemini_usage'
+    )
+    requests = models.PositiveIntegerField(default=0)
+    input_tokens = models.PositiveBigIntegerField(default=0)
+    output_tokens = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date']
+        indexes = [models.Index(fields=['date', 'user', 'training'])]
+        constraints = [
+            # One row per day and scope; NULL user or training coalesced so they count as equal
+            models.UniqueConstraint(
+                'date', Coalesce('user', 0), Coalesce('training', 0), name='gemini_usage_day_scope_uniq'
+            ),
+        ]
+        verbose_name = 'Gemini Usage'
+        verbose_name_plural = 'Gemini Usage'
+
+    def __str__(self):
+        return f"{self.date} {self.user or '-'} {self.training or '-'}"
+
+
+class IngestionJob(models.Model):
+    """
+    Queued run of the ingestion pipeline for new or changed content
+    """
+    content = models.ForeignKey(Content, on_delete=models.CASCADE, related_name='ingestion_jobs')
+    status = models.CharField(max_length=20, choices=JobStatus.choices, default=JobStatus.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now, help_text="Earliest time the job may run")
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['status', 'run_after'])]
+        verbose_name = 'Ingestion Job'
+        verbose_name_plural = 'Ingestion Jobs'
+
+    def __str__(self):
+        return f"{self.content.title} ({self.get_status_display()})"
@@ -13,6 +13,8 @@ The class ensures:
 
 from rest_framework import permissions
 
+from users.access import get_access_scope
+
 
 class IsManagerOrTrainerForContent(permissions.BasePermission):
     """
@@ -24,9 +26,12 @@ class IsManagerOrTrainerForContent(permissions.BasePermission):
 
     message = "Only managers or trainers can manage content."
 
+    # Chat only reads content the user can already see, so any authenticated user may POST to it
+    READ_ONLY_ACTIONS = ['chat']
+
     def has_permission(self, request, view):
         """Check if user can perform action based on role."""
-        if request.method in permissions.SAFE_METHODS:
+        if request.method in permissions.SAFE_METHODS or getattr(view, 'action', None) in self.READ_ONLY_ACTIONS:
             return request.user.is_authenticated
 
         return (
@@ -34,33 +39,6 @@ class IsManagerOrTrainerForContent(permissions.BasePermission):
             and request.user.role in ['manager', 'trainer']
             )
 
-    def has_object_permission(self, request, view, obj):
-        """Verify if user can act on specific content."""
-        user = request.user
-
-        # Read permissions
-        if request.method in permissions.SAFE_METHODS:
-            if user.role == 'manager':
-                return True
-            elif user.role == 'trainer':
-                return obj.training.assigned_trainer == user
-            else:
-                return user in obj.training.employees.all()
-
-        # Write permissions
-        if user.role == 'manager':
-            return True
-        elif user.role == 'trainer':
-            return obj.training.assigned_trainer == user
-
-        return False
-
-
-
-
-
-    # Modify the has_object_permission method in IsManagerOrTrainerForContent class
-
     def has_object_permission(self, request, view, obj):
         """Verify if user can act on specific content."""
         user = request.user
@@ -71,17 +49,12 @@ class IsManagerOrTrainerForContent(permissions.BasePermission):
 
         # Read permissions
         if request.method in permissions.SAFE_METHODS:
-            if user.role == 'manager':
-                return True
-            elif user.role == 'trainer':
-                return obj.training.assigned_trainer == user
-            else:
-                return user in obj.training.employees.all()
+            return get_access_scope(request).can_access_training(obj.training_id)
 
         # Write permissions
         if user.role == 'manager':
             return True
         elif user.role == 'trainer':
-            return obj.training.assigned_trainer == user
+            return get_access_scope(request).can_access_training(obj.training_id)
 
         return False
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+
+"""
+Client-side rate limiting for the Gemini API.
+
+Requests-per-minute and tokens-per-minute budgets are token buckets kept in
+one RateLimitBucket row, so every web process and worker draws from the same
+quota. The row is updated with compare-and-set on a version column, the same
+way summary jobs are claimed. Callers estimate input tokens before sending,
+wait up to GEMINI_RATE_LIMIT_MAX_WAIT seconds for budget, and otherwise get
+RateLimitExceeded with the number of seconds to wait before retrying.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from typing import Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from content.models import RateLimitBucket
+
+# Wait briefly and retry when another process updated the bucket concurrently
+CONTENTION_RETRY = 0.05
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of text (about four characters per token)."""
+    return math.ceil(len(text) / 4)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call would exceed the budget for longer than the caller may wait."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"Gemini rate limit reached, retry in {math.ceil(retry_after)} seconds")
+
+
+def _take(level: float, capacity: int, elapsed: float, cost: float) -> Tuple[float, float]:
+    """
+    Refill a bucket for the elapsed seconds and take cost from it.
+
+    Returns:
+        Tuple of (new level, seconds to wait). A capacity of 0 means unlimited.
+    """
+    if capacity <= 0:
+        return level, 0
+    rate = capacity / 60
+    level = min(capacity, level + elapsed * rate)
+    # A single call above the whole budget would otherwise wait forever
+    cost = min(cost, capacity)
+    if level < cost:
+        return level, (cost - level) / rate
+    return level - cost, 0
+
+
+class RateLimiter:
+    """Requests- and tokens-per-minute token buckets shared through the database."""
+
+    def __init__(self, name: str = 'gemini', requests_per_minute: Optional[int] = None,
+                 tokens_per_minute: Optional[int] = None, max_wait: Optional[float] = None):
+        self.name = name
+        self._requests_per_minute = requests_per_minute
+        self._tokens_per_minute = tokens_per_minute
+        self._max_wait = max_wait
+        # Corrections from adjust() are charged with the next acquire instead of an extra write
+        self._pending_tokens = 0
+        self._pending_lock = threading.Lock()
+
+    @property
+    def requests_per_minute(self) -> int:
+        if self._requests_per_minute is not None:
+            return self._requests_per_minute
+        return settings.GEMINI_REQUESTS_PER_MINUTE
+
+    @property
+    def tokens_per_minute(self) -> int:
+        if self._tokens_per_minute is not None:
+            return self._tokens_per_minute
+        return settings.GEMINI_TOKENS_PER_MINUTE
+
+    @property
+    def max_wait(self) -> float:
+        return self._max_wait if self._max_wait is not None else settings.GEMINI_RATE_LIMIT_MAX_WAIT
+
+    def try_acquire(self, tokens: int) -> float:
+        """
+        Take one request and the given tokens if both budgets allow it.
+
+        Returns:
+            0 if acquired, otherwise seconds until enough budget is available
+        """
+        rpm, tpm = self.requests_per_minute, self.tokens_per_minute
+        if rpm <= 0 and tpm <= 0:
+            return 0
+
+        now = timezone.now()
+        row = self._load(now)
+        elapsed = max(0.0, (now - row.updated_at).total_seconds())
+        pending = self._pending_tokens
+
+        requests_left, requests_wait = _take(row.requests, rpm, elapsed, 1)
+        tokens_left, tokens_wait = _take(row.tokens, tpm, elapsed, tokens + pending)
+        wait = max(requests_wait, tokens_wait)
+        if wait:
+            return wait
+
+        updated = RateLimitBucket.objects.filter(name=self.name, version=row.version).update(
+            requests=requests_left, tokens=tokens_left, updated_at=now, version=F('version') + 1
+        )
+        if not updated:
+            return CONTENTION_RETRY
+
+        with self._pending_lock:
+            self._pending_tokens -= pending
+        return 0
+
+    def acquire(self, tokens: int) -> None:
+        """
+        Wait for budget for one request with the given input tokens.
+
+        Raises:
+            RateLimitExceeded: If budget would take longer than max_wait to free up
+        """
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            if time.monotonic() + wait > deadline:
+                raise RateLimitExceeded(wait)
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int) -> None:
+        """Coroutine version of acquire that waits without blocking the event loop."""
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = await sync_to_async(self.try_acquire)(tokens)
+            if not wait:
+                return
+            if time.monotonic() + wait > deadline:
+                raise RateLimitExceeded(wait)
+            await asyncio.sleep(wait)
+
+    def adjust(self, tokens: int) -> None:
+        """Charge (or refund, if negative) tokens once a call's actual usage is known."""
+        with self._pending_lock:
+            self._pending_tokens += tokens
+
+    def _load(self, now) -> RateLimitBucket:
+        """Fetch the bucket row, creating a full bucket on first use."""
+        row = RateLimitBucket.objects.filter(name=self.name).first()
+        if row is not None:
+            return row
+
+        try:
+            with transaction.atomic():
+                return RateLimitBucket.objects.create(
+                    name=self.name,
+                    requests=self.requests_per_minute,
+                    tokens=self.tokens_per_minute,
+                    updated_at=now,
+                )
+        except IntegrityError:
+            return RateLimitBucket.objects.get(name=self.name)
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+
+"""
+Retries, deadlines and a circuit breaker for calls to the Gemini API.
+
+Every Gemini request goes through call_with_retries (or acall_with_retries
+on the async client). Timeouts, connection errors and 408/429/5xx responses
+are retried with exponential backoff and full jitter, as long as the next
+attempt can still start within GEMINI_DEADLINE seconds of the first one.
+Each attempt is bounded by GEMINI_TIMEOUT through the HTTP client.
+
+A call that is still failing after its retries counts against the circuit
+breaker. After GEMINI_BREAKER_FAILURE_THRESHOLD consecutive failures the
+breaker opens and calls fail fast with UpstreamUnavailable, without touching
+the network, for GEMINI_BREAKER_RESET_TIMEOUT seconds. Then a single trial
+call is let through: success closes the breaker, failure opens it again.
+
+Breaker state and counters are kept per process, like the async client
+pools, and are reported by the backend metrics endpoint.
+"""
+
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+from django.conf import settings
+from google.genai import errors as genai_errors
+
+T = TypeVar('T')
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class UpstreamError(Exception):
+    """Raised when the Gemini API keeps failing after all retries."""
+
+
+class UpstreamUnavailable(UpstreamError):
+    """Raised without calling Gemini while the circuit breaker is open."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"Gemini is unavailable, retry in {math.ceil(retry_after)} seconds")
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an error is a transient upstream failure worth retrying."""
+    retryable = getattr(error, 'retryable', None)
+    if retryable is not None:
+        return retryable
+    if isinstance(error, genai_errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    # Timeouts, refused and dropped connections
+    return isinstance(error, httpx.TransportError)
+
+
+def backoff_delay(retry: int) -> float:
+    """Exponential backoff with full jitter for the given retry number (0-based)."""
+    ceiling = min(settings.GEMINI_RETRY_MAX_BACKOFF, settings.GEMINI_RETRY_BACKOFF * (2 ** retry))
+    return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with call and retry counters."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None,
+                 reset_timeout: Optional[float] = None):
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._opened = False
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.consecutive_failures = 0
+        self.stats = Counter()
+
+    @property
+    def failure_threshold(self) -> int:
+        if self._failure_threshold is not None:
+            return self._failure_threshold
+        return settings.GEMINI_BREAKER_FAILURE_THRESHOLD
+
+    @property
+    def reset_timeout(self) -> float:
+        if self._reset_timeout is not None:
+            return self._reset_timeout
+        return settings.GEMINI_BREAKER_RESET_TIMEOUT
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if not self._opened:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_call(self) -> None:
+        """
+        Admit a call, or fail fast while the breaker is open.
+
+        Raises:
+            UpstreamUnavailable: If the breaker is open or its trial call is in flight
+        """
+        with self._lock:
+            state = self._state()
+            if state == self.OPEN or (state == self.HALF_OPEN and self._trial_in_flight):
+                self.stats['short_circuited'] += 1
+                retry_after = self._opened_at + self.reset_timeout - time.monotonic()
+                raise UpstreamUnavailable(max(retry_after, 1))
+            if state == self.HALF_OPEN:
+                self._trial_in_flight = True
+            self.stats['calls'] += 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._opened = False
+            self._trial_in_flight = False
+            self.consecutive_failures = 0
+            self.stats['successes'] += 1
+
+    def record_failure(self) -> None:
+        """Count an upstream failure, opening the breaker at the threshold."""
+        with self._lock:
+            self.stats['failures'] += 1
+            self.consecutive_failures += 1
+            state = self._state()
+            if state == self.HALF_OPEN or (
+                state == self.CLOSED and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.stats['opened'] += 1
+                self._opened = True
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def record_rejection(self) -> None:
+        """Count an error that says nothing about upstream health, e.g. a bad request."""
+        with self._lock:
+            self.stats['errors'] += 1
+            self._trial_in_flight = False
+
+    def count(self, metric: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[metric] += amount
+
+    def reset(self) -> None:
+        """Close the breaker and clear its counters."""
+        with self._lock:
+            self._opened = False
+            self._trial_in_flight = False
+            self.consecutive_failures = 0
+            self.stats.clear()
+
+    def snapshot(self) -> dict:
+        """Current state and counters, for the metrics endpoint."""
+        with self._lock:
+            state = self._state()
+            data = {
+                'state': state,
+                'consecutive_failures': self.consecutive_failures,
+                'retry_after': (
+                    math.ceil(max(self._opened_at + self.reset_timeout - time.monotonic(), 0))
+                    if state == self.OPEN else 0
+                ),
+            }
+            for metric in ['calls', 'successes', 'failures', 'errors', 'retries', 'timeouts',
+                           'short_circuited', 'opened', 'stale_served']:
+                data[metric] = self.stats[metric]
+            return data
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Get or create the process-wide circuit breaker for a backend."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+def breaker_snapshots() -> Dict[str, dict]:
+    """Snapshots of every breaker created in this process."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+
+def _next_delay(breaker: CircuitBreaker, error: Exception, retry: int, deadline: float) -> Optional[float]:
+    """
+    Record a failed attempt and decide whether to retry it.
+
+    Returns:
+        Seconds to wait before the next attempt, or None to give up
+    """
+    if isinstance(error, httpx.TimeoutException):
+        breaker.count('timeouts')
+
+    if not is_retryable(error):
+        breaker.record_rejection()
+        return None
+
+    if retry < settings.GEMINI_MAX_RETRIES:
+        delay = backoff_delay(retry)
+        if time.monotonic() + delay < deadline:
+            breaker.count('retries')
+            return delay
+
+    breaker.record_failure()
+    return None
+
+
+def call_with_retries(breaker: CircuitBreaker, func: Callable[[], T]) -> T:
+    """
+    Call func through the circuit breaker, retrying transient failures.
+
+    Raises:
+        UpstreamUnavailable: If the breaker is open
+        UpstreamError: If func still fails with a retryable error after all retries
+        Exception: Non-retryable errors from func, unchanged
+    """
+    breaker.before_call()
+    deadline = time.monotonic() + settings.GEMINI_DEADLINE
+    retry = 0
+    while True:
+        try:
+            result = func()
+        except Exception as e:
+            delay = _next_delay(breaker, e, retry, deadline)
+            if delay is None:
+                if is_retryable(e):
+                    raise UpstreamError(f"Gemini request failed after {retry + 1} attempts: {e}") from e
+                raise
+            time.sleep(delay)
+            retry += 1
+        else:
+            breaker.record_success()
+            return result
+
+
+async def acall_with_retries(breaker: CircuitBreaker, func: Callable[[], Awaitable[T]]) -> T:
+    """Coroutine version of call_with_retries for the async client."""
+    breaker.before_call()
+    deadline = time.monotonic() + settings.GEMINI_DEADLINE
+    retry = 0
+    while True:
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            # Let the next caller run the half-open trial
+            breaker.record_rejection()
+            raise
+        except Exception as e:
+            delay = _next_delay(breaker, e, retry, deadline)
+            if delay is None:
+                if is_retryable(e):
+                    raise UpstreamError(f"Gemini request failed after {retry + 1} attempts: {e}") from e
+                raise
+            await asyncio.sleep(delay)
+            retry += 1
+        else:
+            breaker.record_success()
+            return result
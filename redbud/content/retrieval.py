@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+
+"""
+Retrieval layer for RAG chat over training content.
+
+Text and extracted PDF text are split into chunks, embedded with a pluggable
+embedder (RETRIEVAL_EMBEDDER) and stored as ContentChunk rows keyed by a hash
+of their text, so re-indexing edited content only embeds the chunks that
+changed. For queries, each training's active chunks are loaded once into an
+in-memory NumPy matrix, which is rebuilt only when that training's chunks
+change. Top-k search is a
+single matrix-vector product, so chat prompts contain only relevant chunks
+instead of whole documents.
+
+Embedding happens in the ingestion pipeline, never in a chat request. Chat
+answers from the chunks indexed so far and queues content that was never
+ingested; until any of a training's content is indexed it raises
+IndexingInProgress.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.module_loading import import_string
+
+from content.models import Content, ContentChunk, StageStatus
+from content.llm import BaseLLMBackend, get_llm_backend
+from content.map_reduce import split_into_chunks
+from content.text_extraction import get_content_text
+
+logger = logging.getLogger(__name__)
+
+INDEXABLE_TYPES = ('text', 'pdf')
+
+WORD = re.compile(r'\w+')
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+class BaseEmbedder:
+    """Interface for embedding backends. Vectors are returned L2-normalized."""
+
+    name = ''
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Return a (len(texts), dimension) float32 array."""
+        raise NotImplementedError
+
+
+class HashingEmbedder(BaseEmbedder):
+    """
+    Deterministic local embedder using feature hashing of words and word pairs.
+
+    Needs no network or model download, which makes it suitable for tests and
+    offline development.
+    """
+
+    dimension = 256
+    name = f'hashing-{dimension}'
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = WORD.findall(text.lower())
+            features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+            for feature in features:
+                digest = hashlib.md5(feature.encode('utf-8')).digest()
+                column = int.from_bytes(digest[:4], 'little') % self.dimension
+                vectors[row, column] += 1.0 if digest[4] & 1 else -1.0
+        return _normalize(vectors)
+
+
+class GeminiEmbedder(BaseEmbedder):
+    """Embedder backed by the Gemini embedding API."""
+
+    batch_size = 100
+
+    @property
+    def name(self):
+        return f'gemini:{settings.GEMINI_EMBEDDING_MODEL}'
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        service = get_llm_backend('gemini')
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(service.embed_texts(texts[start:start + self.batch_size]))
+        return _normalize(np.asarray(vectors, dtype=np.float32))
+
+
+@lru_cache(maxsize=None)
+def _load_embedder(path: str) -> BaseEmbedder:
+    return import_string(path)()
+
+
+def get_embedder() -> BaseEmbedder:
+    """Return the embedder configured by RETRIEVAL_EMBEDDER."""
+    return _load_embedder(settings.RETRIEVAL_EMBEDDER)
+
+
+def chunk_text(text: str) -> List[str]:
+    """Split text into retrieval-sized chunks."""
+    return split_into_chunks(text, settings.RETRIEVAL_CHUNK_TOKENS)
+
+
+class IndexResult(NamedTuple):
+    """Chunk counts from an indexing run."""
+    kept: int = 0
+    embedded: int = 0
+    deleted: int = 0
+    failed: int = 0
+
+    def __add__(self, other):
+        return IndexResult(*(a + b for a, b in zip(self, other)))
+
+
+class _IndexPlan:
+    """Chunks of one content split into rows to keep, to embed and to delete."""
+
+    def __init__(self, content: Content, embedder_name: str):
+        chunks = chunk_text(get_content_text(content)) if content.content_type in INDEXABLE_TYPES else []
+
+        existing: Dict[str, List[ContentChunk]] = {}
+        stale_ids = []
+        for row in ContentChunk.objects.filter(content=content).only('id', 'text_hash', 'embedder', 'position', 'training_id'):
+            if row.embedder == embedder_name:
+                existing.setdefault(row.text_hash, []).append(row)
+            else:
+                stale_ids.append(row.id)
+
+        self.content = content
+        self.kept: List[ContentChunk] = []
+        self.missing: List[Tuple[int, str, str]] = []
+        for position, text in enumerate(chunks):
+            text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+            if existing.get(text_hash):
+                row = existing[text_hash].pop()
+                row.position, row.training_id = position, content.training_id
+                self.kept.append(row)
+            else:
+                self.missing.append((position, text, text_hash))
+
+        self.stale_ids = stale_ids + [row.id for rows in existing.values() for row in rows]
+
+    def apply(self, vectors, embedder_name: str) -> IndexResult:
+        with transaction.atomic():
+            ContentChunk.objects.filter(id__in=self.stale_ids).delete()
+            ContentChunk.objects.bulk_update(self.kept, ['position', 'training_id'])
+            ContentChunk.objects.bulk_create([
+                ContentChunk(
+                    content=self.content,
+                    training_id=self.content.training_id,
+                    position=position,
+                    text=text,
+                    text_hash=text_hash,
+                    embedder=embedder_name,
+                    embedding=vector.tobytes(),
+                )
+                for (position, text, text_hash), vector in zip(self.missing, vectors)
+            ])
+        return IndexResult(kept=len(self.kept), embedded=len(self.missing), deleted=len(self.stale_ids))
+
+
+def index_content(content: Content, embedder: Optional[BaseEmbedder] = None) -> IndexResult:
+    """
+    Bring the stored chunks of one content up to date with its text.
+
+    Chunks are matched by text hash, so only new or edited chunks are
+    embedded and chunks that no longer occur are deleted.
+    """
+    embedder = embedder or get_embedder()
+    plan = _IndexPlan(content, embedder.name)
+    vectors = embedder.embed([text for _, text, _ in plan.missing]) if plan.missing else []
+    return plan.apply(vectors, embedder.name)
+
+
+def reconcile_index(contents: Iterable[Content], embedder: Optional[BaseEmbedder] = None,
+                    batch_size: Optional[int] = None) -> IndexResult:
+    """
+    Incrementally index many contents, sharing embedding calls between them.
+
+    Missing chunks are collected across contents and embedded batch_size at
+    a time. Contents whose text cannot be read are logged and skipped.
+    """
+    embedder = embedder or get_embedder()
+    batch_size = batch_size or settings.RETRIEVAL_EMBED_BATCH_SIZE
+    result = IndexResult()
+    plans: List[_IndexPlan] = []
+
+    def flush():
+        texts = [text for plan in plans for _, text, _ in plan.missing]
+        vectors = iter(embedder.embed(texts) if texts else [])
+        total = IndexResult()
+        for plan in plans:
+            total += plan.apply([next(vectors) for _ in plan.missing], embedder.name)
+        plans.clear()
+        return total
+
+    for content in contents:
+        try:
+            plans.append(_IndexPlan(content, embedder.name))
+        except Exception as e:
+            logger.warning("Could not index content %s: %s", content.id, e)
+            result += IndexResult(failed=1)
+            continue
+        if sum(len(plan.missing) for plan in plans) >= batch_size:
+            result += flush()
+
+    return result + flush()
+
+
+def reindex_content(content_id: int) -> None:
+    """
+    Re-index content that changed after it was indexed.
+
+    Content that was never indexed is left to the ingestion pipeline.
+    Errors are logged rather than raised; the content's chunks are then
+    dropped so the next search rebuilds them instead of serving stale text.
+    """
+    content = Content.objects.filter(pk=content_id).first()
+    if content is None or not content.chunks.exists():
+        return
+
+    try:
+        index_content(content)
+    except Exception as e:
+        logger.warning("Could not re-index content %s: %s", content_id, e)
+        ContentChunk.objects.filter(content_id=content_id).delete()
+
+
+class IndexingInProgress(Exception):
+    """Raised when none of a training's content is indexed yet, but some is queued."""
+
+    def __init__(self):
+        self.retry_after = settings.RETRIEVAL_INDEXING_RETRY_AFTER
+        super().__init__(f"The training's content is being indexed, retry in {self.retry_after} seconds")
+
+
+def _indexable(training_id: int):
+    return Content.objects.filter(training_id=training_id, content_type__in=INDEXABLE_TYPES, is_active=True)
+
+
+def queue_unindexed_content(training_id: int, embedder_name: str) -> int:
+    """
+    Queue active text and PDF content of a training that was never ingested.
+
+    Covers content from before the ingestion pipeline or saved without
+    signals. Chunks of a previous embedder are rebuilt by the
+    reindex_content command instead.
+
+    Returns:
+        The number of contents queued
+    """
+    from content.ingestion import start_ingestion  # ingestion imports this module
+
+    never_ingested = (
+        _indexable(training_id).filter(index_status=StageStatus.NOT_STARTED)
+        .exclude(chunks__embedder=embedder_name)
+        .values_list('pk', flat=True)
+    )
+    return sum(start_ingestion(content_id) is not None for content_id in never_ingested)
+
+
+class VectorIndex:
+    """In-memory matrix of chunk embeddings for one training."""
+
+    def __init__(self, chunk_ids: np.ndarray, matrix: np.ndarray):
+        self.chunk_ids = chunk_ids
+        self.matrix = matrix
+
+    @classmethod
+    def load(cls, training_id: int, embedder_name: str) -> 'VectorIndex':
+        rows = list(_active_chunks(training_id, embedder_name).values_list('id', 'embedding'))
+        if not rows:
+            return cls(np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32))
+
+        chunk_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        matrix = np.vstack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+        return cls(chunk_ids, matrix)
+
+    def search(self, vector: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """Return up to k (chunk id, cosine score) pairs, best first."""
+        if not len(self.chunk_ids):
+            return []
+
+        scores = self.matrix @ vector
+        if k < len(scores):
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        return [(int(self.chunk_ids[i]), float(scores[i])) for i in top]
+
+
+def _active_chunks(training_id: int, embedder_name: str):
+    return ContentChunk.objects.filter(
+        training_id=training_id, embedder=embedder_name, content__is_active=True
+    )
+
+
+_indexes: Dict[Tuple[int, str], Tuple[tuple, VectorIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_training_index(training_id: int, embedder_name: str) -> VectorIndex:
+    """Return the cached index of a training, reloading it if its chunks changed."""
+    signature = tuple(
+        _active_chunks(training_id, embedder_name)
+        .aggregate(count=Count('id'), last=Max('id'), updated=Max('created_at'))
+        .values()
+    )
+    key = (training_id, embedder_name)
+
+    cached = _indexes.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    index = VectorIndex.load(training_id, embedder_name)
+    with _indexes_lock:
+        _indexes[key] = (signature, index)
+    return index
+
+
+def search_training(training_id: int, query: str, k: Optional[int] = None) -> List[Tuple[ContentChunk, float]]:
+    """
+    Find the chunks of a training most relevant to a query.
+
+    Returns:
+        List of (chunk, score) pairs, best first
+    """
+    embedder = get_embedder()
+    queue_unindexed_content(training_id, embedder.name)
+
+    index = get_training_index(training_id, embedder.name)
+    hits = index.search(embedder.embed([query])[0], k or settings.RETRIEVAL_TOP_K)
+
+    chunks = ContentChunk.objects.select_related('content').in_bulk([chunk_id for chunk_id, _ in hits])
+    return [(chunks[chunk_id], score) for chunk_id, score in hits if chunk_id in chunks]
+
+
+def answer_question(training_id: int, question: str, k: Optional[int] = None,
+                    get_service: Callable[[], BaseLLMBackend] = get_llm_backend
+                    ) -> Tuple[str, List[Tuple[ContentChunk, float]]]:
+    """
+    Answer a question about a training from its most relevant chunks.
+
+    Returns:
+        Tuple of (answer, retrieved (chunk, score) pairs)
+
+    Raises:
+        IndexingInProgress: Nothing is indexed yet, but some content is queued
+    """
+    if not question or not question.strip():
+        raise ValueError("Question cannot be empty")
+
+    hits = search_training(training_id, question, k)
+    if not hits:
+        waiting = (StageStatus.PENDING, StageStatus.RUNNING)
+        if _indexable(training_id).filter(index_status__in=waiting).exists():
+            raise IndexingInProgress()
+        raise ValueError("No text or PDF content is available for this training")
+
+    answer = get_service().answer_question(question, [chunk.text for chunk, _ in hits])
+    return answer, hits
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 
 from rest_framework import serializers
-from .models import Content
+from rest_framework.reverse import reverse
+from .models import Content, SummaryBatch, SummaryJob
+from .batches import batch_progress
 from users.serializers import UserListSerializer
 from typing import Optional
 
@@ -13,14 +15,19 @@ class ContentSerializer(serializers.ModelSerializer):
     training_name = serializers.CharField(source='training.name', read_only=True)
     content_type_display = serializers.CharField(source='get_content_type_display', read_only=True)
     file_url = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Content
         fields = ['id', 'training', 'training_name', 'title', 'description',
-                  'content_type', 'content_type_display', 'file', 'file_url',
+                  'content_type', 'content_type_display', 'file', 'file_url', 'download_url',
                   'url', 'text_content', 'order', 'is_active',
-                  'created_by', 'created_by_name', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_by', 'created_at', 'updated_at']
+                  'created_by', 'created_by_name', 'created_at', 'updated_at',
+                  'extraction_status', 'summary_status', 'index_status',
+                  'ingestion_error', 'ingested_at']
+        read_only_fields = ['id', 'created_by', 'created_at', 'updated_at',
+                            'extraction_status', 'summary_status', 'index_status',
+                            'ingestion_error', 'ingested_at']
 
     def get_file_url(self, obj)-> Optional[str]:
         if obj.file:
@@ -29,6 +36,14 @@ class ContentSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.file.url)
         return None
 
+    def get_download_url(self, obj)-> Optional[str]:
+        # Permission-checked and range-capable, unlike the media URL served in DEBUG only
+        if obj.file:
+            request = self.context.get('request')
+            if request:
+                return reverse('content-download', args=[obj.pk], request=request)
+        return None
+
     def validate(self, data):
         """
         Validate that appropriate field is filled based on content_type
@@ -78,7 +93,70 @@ class ContentSummarySerializer(serializers.Serializer):
     summary = serializers.CharField(read_only=True)
     content_id = serializers.IntegerField(read_only=True)
     content_type = serializers.CharField(read_only=True)
+    cached = serializers.BooleanField(read_only=True)
+    stale = serializers.BooleanField(
+        read_only=True,
+        help_text='Present and true when Gemini is unavailable and the last cached summary is served instead'
+    )
     max_length = serializers.IntegerField(required=False, min_value=50, max_value=1000)
 
     class Meta:
-        fields = ['summary', 'content_id', 'content_type', 'max_length']
+        fields = ['summary', 'content_id', 'content_type', 'cached', 'stale', 'max_length']
+
+
+class SummaryJobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for asynchronous summarization jobs
+    """
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    status_url = serializers.HyperlinkedIdentityField(view_name='summary-job-detail')
+
+    class Meta:
+        model = SummaryJob
+        fields = ['id', 'content', 'max_length', 'status', 'status_display', 'attempts',
+                  'summary', 'cached', 'error', 'created_at', 'started_at', 'finished_at', 'status_url']
+        read_only_fields = fields
+
+
+class SummaryBatchSerializer(serializers.ModelSerializer):
+    """
+    Serializer for training-wide summarization batches with their progress
+    """
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = SummaryBatch
+        fields = ['id', 'training', 'max_length', 'total', 'cached', 'progress', 'created_at']
+        read_only_fields = fields
+
+    def get_progress(self, obj) -> dict:
+        return batch_progress(obj)
+
+
+class ContentChatSerializer(serializers.Serializer):
+    """
+    Serializer for retrieval-augmented chat questions about a training
+    """
+    training_id = serializers.IntegerField()
+    question = serializers.CharField(max_length=2000)
+    top_k = serializers.IntegerField(required=False, min_value=1, max_value=20)
+
+
+class ChatSourceSerializer(serializers.Serializer):
+    """
+    Serializer for a content chunk used to answer a chat question
+    """
+    content_id = serializers.IntegerField(read_only=True)
+    content_title = serializers.CharField(read_only=True)
+    position = serializers.IntegerField(read_only=True)
+    text = serializers.CharField(read_only=True)
+    score = serializers.FloatField(read_only=True)
+
+
+class ContentChatResponseSerializer(serializers.Serializer):
+    """
+    Serializer for chat answers
+    """
+    answer = serializers.CharField(read_only=True)
+    training_id = serializers.IntegerField(read_only=True)
+    sources = ChatSourceSerializer(many=True, read_only=True)
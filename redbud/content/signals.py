@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+"""
+Signal handlers for the content app.
+
+Cached summaries are dropped as soon as the text or file they were built from
+changes, so the summary cache never outlives its source. New or changed
+content is queued for the ingestion pipeline once the change is committed;
+its index stage brings the retrieval chunks up to date. Deleted content leaves
+a tombstone for delta sync. Cached list responses showing content are
+invalidated on every save and deletion, at once and again on commit.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from content.models import Content, SummaryCache
+from content.ingestion import start_ingestion
+from content.retrieval import reindex_content
+from users.response_cache import invalidate_responses
+from users.sync import record_tombstone
+
+
+@receiver(pre_save, sender=Content)
+def invalidate_summary_cache(sender, instance, **kwargs):
+    """Delete cached summaries when text_content or file changes."""
+    if instance.pk is None:
+        return
+
+    previous = Content.objects.filter(pk=instance.pk).values('text_content', 'file').first()
+    if previous is None:
+        return
+
+    if (previous['text_content'] != instance.text_content
+            or (previous['file'] or '') != (instance.file.name or '')):
+        SummaryCache.objects.filter(content_id=instance.pk).delete()
+        instance._source_changed = True
+
+
+@receiver(post_save, sender=Content)
+def process_changed_content(sender, instance, created, **kwargs):
+    """
+    After the save commits, queue new or changed content for the ingestion
+    pipeline, which re-embeds its chunks. Changed content the pipeline
+    cannot take is re-indexed here instead.
+    """
+    source_changed = getattr(instance, '_source_changed', False)
+    instance._source_changed = False
+
+    def ingest():
+        if start_ingestion(instance.pk) is None and source_changed:
+            reindex_content(instance.pk)
+
+    if created or source_changed:
+        transaction.on_commit(ingest)
+
+
+@receiver(post_delete, sender=Content)
+def content_deleted(sender, instance, **kwargs):
+    record_tombstone(instance, training_id=instance.training_id)
+
+
+@receiver(post_save, sender=Content)
+@receiver(post_delete, sender=Content)
+def invalidate_cached_responses(sender, **kwargs):
+    """Invalidate cached responses showing content."""
+    invalidate_responses(Content)
+    transaction.on_commit(lambda: invalidate_responses(Content))
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+"""
+Single-flight deduplication for expensive calls.
+
+Concurrent callers with the same key share one in-flight call: within a
+process through SingleFlight (threads) or AsyncSingleFlight (coroutines), and
+across processes through a SummaryLock row that only one process can insert
+at a time. The row carries a random token, so a holder whose lock expired
+and was taken over cannot release its successor's lock.
+"""
+
+import asyncio
+import secrets
+import threading
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from content.models import SummaryLock
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run at most one call per key at a time and share its outcome with concurrent callers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Call func unless a call with the same key is already running.
+
+        Returns:
+            Tuple of (result, shared) where shared is True if the result
+            came from another caller's in-flight call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines: concurrent awaits of one key on an event loop share one call."""
+
+    def __init__(self):
+        self._calls: Dict[Tuple[int, str], asyncio.Future] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Await func() unless a call with the same key is already running on this loop.
+
+        Returns:
+            Tuple of (result, shared) where shared is True if the result
+            came from another caller's in-flight call
+        """
+        loop = asyncio.get_running_loop()
+        call_key = (id(loop), key)
+
+        future = self._calls.get(call_key)
+        if future is not None:
+            # Shield so a disconnecting follower does not cancel the leader's call
+            return await asyncio.shield(future), True
+
+        future = self._calls[call_key] = loop.create_future()
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved when there are no followers
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            del self._calls[call_key]
+
+        return result, False
+
+
+def acquire_lock(key: str) -> Optional[str]:
+    """
+    Try to take the cross-process lock for key, replacing it if expired.
+
+    Returns:
+        The token to release the lock with, or None if another holder has it
+    """
+    now = timezone.now()
+    SummaryLock.objects.filter(key=key, expires_at__lte=now).delete()
+
+    token = secrets.token_hex(16)
+    try:
+        with transaction.atomic():
+            SummaryLock.objects.create(
+                key=key, token=token, expires_at=now + timedelta(seconds=settings.SUMMARY_LOCK_TIMEOUT)
+            )
+    except IntegrityError:
+        return None
+    return token
+
+
+def release_lock(key: str, token: str) -> None:
+    """Release the lock for key if it is still held with token."""
+    SummaryLock.objects.filter(key=key, token=token).delete()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+"""
+Local LLM backend for load tests and offline development.
+
+Returns deterministic summaries and embeddings after a configurable delay,
+and fails a configurable share of calls, so the summarize and chat paths,
+including rate limiting, retries and the circuit breaker, can be exercised
+at realistic latencies on a machine without network access. Select it with
+LLM_BACKEND=stub; LLM_STUB_* environment variables set its options.
+"""
+
+import asyncio
+import hashlib
+import random
+import re
+import time
+from typing import AsyncIterator, List, Optional
+
+from content.llm import BaseLLMBackend, Completion
+from content.rate_limit import estimate_tokens
+from content.resilience import RETRYABLE_STATUS_CODES
+
+WORD = re.compile(r'\S+')
+
+STREAM_FRAGMENTS = 4
+
+
+class StubBackendError(Exception):
+    """Injected failure, retried like the HTTP status it stands for."""
+
+    def __init__(self, code: int):
+        self.code = code
+        self.retryable = code in RETRYABLE_STATUS_CODES
+        super().__init__(f"{code} Injected stub backend failure")
+
+
+class StubBackend(BaseLLMBackend):
+    """Deterministic LLM backend with configurable latency and failure injection."""
+
+    def __init__(self, alias: str = 'stub', model: Optional[str] = None, latency: float = 0.0,
+                 jitter: float = 0.0, failure_rate: float = 0.0, failure_status: int = 503,
+                 embedding_dimension: int = 64, seed: Optional[int] = None):
+        """
+        Args:
+            latency: Seconds each call takes
+            jitter: Up to this many seconds are added to each call at random
+            failure_rate: Share of calls, from 0 to 1, that fail with failure_status
+            failure_status: HTTP status the injected failures stand for
+            embedding_dimension: Length of the embedding vectors
+            seed: Seed for latency jitter and failure injection, for repeatable runs
+        """
+        super().__init__(alias, model or 'stub')
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.embedding_dimension = embedding_dimension
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    def _complete(self, prompt: str, max_output_tokens: int) -> Completion:
+        time.sleep(self._start_call())
+        return self._reply(prompt, max_output_tokens)
+
+    async def _acomplete(self, prompt: str, max_output_tokens: int) -> Completion:
+        await asyncio.sleep(self._start_call())
+        return self._reply(prompt, max_output_tokens)
+
+    async def _astream(self, prompt: str, max_output_tokens: int) -> AsyncIterator[Completion]:
+        delay = self._start_call()
+        reply = self._reply(prompt, max_output_tokens)
+        words = reply.text.split(' ')
+        size = max(1, -(-len(words) // STREAM_FRAGMENTS))
+
+        async def fragments():
+            # The delay is spread over the fragments, like a model generating tokens
+            for start in range(0, len(words), size):
+                await asyncio.sleep(delay / STREAM_FRAGMENTS)
+                text = ' '.join(words[start:start + size])
+                yield Completion(text if start == 0 else ' ' + text)
+            yield Completion('', reply.input_tokens, reply.output_tokens)
+
+        return fragments()
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self._start_call())
+        vectors = []
+        for text in texts:
+            digest = hashlib.sha256(text.encode('utf-8')).digest()
+            vectors.append([
+                digest[i % len(digest)] / 255 - 0.5 for i in range(self.embedding_dimension)
+            ])
+        return vectors
+
+    def _start_call(self) -> float:
+        """
+        Count a call and decide its outcome.
+
+        Returns:
+            Seconds the call takes
+
+        Raises:
+            StubBackendError: For the injected share of failing calls
+        """
+        self.calls += 1
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            raise StubBackendError(self.failure_status)
+        return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+
+    @staticmethod
+    def _reply(prompt: str, max_output_tokens: int) -> Completion:
+        """The first words of the prompt's material, as many as the output budget allows."""
+        material = prompt.split('\n\n', 1)[-1]
+        words = WORD.findall(material)[:max(1, max_output_tokens // 4)]
+        text = ' '.join(words)
+        return Completion(text, estimate_tokens(prompt), estimate_tokens(text))
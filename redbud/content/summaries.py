@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+
+"""
+Summary generation with a persistent, content-addressed cache.
+
+Summaries are stored in the database keyed by a hash of the source content,
+the requested max_length, the model name and the prompt version. Editing the
+text or replacing the file changes the hash, so stale entries are never served.
+Entries expire after SUMMARY_CACHE_TTL seconds and the least recently used
+ones are evicted once SUMMARY_CACHE_MAX_ENTRIES is exceeded.
+
+Text above SUMMARY_CHUNK_TOKENS is summarized with the map-reduce summarizer.
+Concurrent requests for the same summary are coalesced into one LLM call.
+asummarize_content is the coroutine equivalent of summarize_content for the
+ASGI views.
+"""
+
+import asyncio
+import hashlib
+import time
+from datetime import timedelta
+from typing import Callable, Optional, Set, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from content.models import ChunkSummary, Content, SummaryCache
+from content.llm import PROMPT_VERSION, BaseLLMBackend, get_llm_backend, get_model_name
+from content.map_reduce import MapReduceSummarizer, estimate_tokens
+from content.single_flight import AsyncSingleFlight, SingleFlight, acquire_lock, release_lock
+from content.text_extraction import get_content_text, get_extracted_text
+
+
+_summary_flights = SingleFlight()
+_async_summary_flights = AsyncSingleFlight()
+
+
+def parse_max_length(value) -> Optional[int]:
+    """
+    Validate the optional max_length request parameter.
+
+    Raises:
+        ValueError: With a message suitable for the API response
+    """
+    if not value:
+        return None
+
+    try:
+        max_length = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('max_length must be a valid integer')
+
+    if max_length < 50 or max_length > 1000:
+        raise ValueError('max_length must be between 50 and 1000')
+    return max_length
+
+
+def content_fingerprint(content: Content) -> str:
+    """Return a SHA-256 hash of the text or file the summary is built from."""
+    if content.content_type == 'text':
+        return hashlib.sha256((content.text_content or '').encode('utf-8')).hexdigest()
+    return get_extracted_text(content).checksum
+
+
+def summary_cache_key(content_hash: str, max_length: Optional[int],
+                      model_name: str, prompt_version: str = PROMPT_VERSION) -> str:
+    """Build the cache key for a summary request."""
+    raw = '|'.join([content_hash, str(max_length or ''), model_name, prompt_version])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def get_cached_summary(key: str) -> Optional[str]:
+    """Return a cached summary for the key, or None if missing or expired."""
+    entry = SummaryCache.objects.filter(key=key).only('id', 'summary', 'created_at').first()
+    if entry is None:
+        return None
+
+    if entry.created_at < timezone.now() - timedelta(seconds=settings.SUMMARY_CACHE_TTL):
+        entry.delete()
+        return None
+
+    SummaryCache.objects.filter(pk=entry.pk).update(
+        hit_count=F('hit_count') + 1,
+        last_accessed_at=timezone.now(),
+    )
+    return entry.summary
+
+
+def store_summary(key: str, content: Content, content_hash: str, max_length: Optional[int],
+                  model_name: str, summary: str) -> None:
+    """Store a generated summary and evict expired or least recently used entries."""
+    SummaryCache.objects.update_or_create(
+        key=key,
+        defaults={
+            'content': content,
+            'content_hash': content_hash,
+            'max_length': max_length,
+            'model_name': model_name,
+            'prompt_version': PROMPT_VERSION,
+            'summary': summary,
+            'hit_count': 0,
+            'created_at': timezone.now(),
+            'last_accessed_at': timezone.now(),
+        },
+    )
+    prune_summary_cache()
+
+
+def prune_summary_cache() -> None:
+    """Delete expired entries and keep at most SUMMARY_CACHE_MAX_ENTRIES rows."""
+    cutoff = timezone.now() - timedelta(seconds=settings.SUMMARY_CACHE_TTL)
+    SummaryCache.objects.filter(created_at__lt=cutoff).delete()
+    ChunkSummary.objects.filter(created_at__lt=cutoff).delete()
+
+    stale_ids = list(
+        SummaryCache.objects.order_by('-last_accessed_at')
+        .values_list('id', flat=True)[settings.SUMMARY_CACHE_MAX_ENTRIES:]
+    )
+    if stale_ids:
+        SummaryCache.objects.filter(id__in=stale_ids).delete()
+
+
+def cached_content_ids(contents, max_length: Optional[int]) -> Set[int]:
+    """
+    Return the ids of contents with an unexpired cached summary for max_length.
+
+    Cache rows are deleted whenever their content changes, so a row for the
+    current model and prompt version is enough to know the summary is fresh
+    without hashing each content.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.SUMMARY_CACHE_TTL)
+    return set(
+        SummaryCache.objects.filter(
+            content__in=contents,
+            max_length=max_length,
+            model_name=get_model_name(),
+            prompt_version=PROMPT_VERSION,
+            created_at__gte=cutoff,
+        ).values_list('content_id', flat=True)
+    )
+
+
+def get_last_summary(content: Content) -> Optional[str]:
+    """
+    Return the most recently generated summary of the content, of any length.
+
+    Served when Gemini is unavailable. Entries are deleted when the content
+    changes, so this is a summary of the current content, if possibly for a
+    different max_length or an older model or prompt version.
+    """
+    entry = SummaryCache.objects.filter(content=content).order_by('-created_at').only('summary').first()
+    return entry.summary if entry is not None else None
+
+
+def summarize_content(content: Content, max_length: Optional[int] = None,
+                      get_service: Callable[[], BaseLLMBackend] = get_llm_backend) -> Tuple[str, bool]:
+    """
+    Summarize text or PDF content, serving repeat requests from the cache.
+
+    Args:
+        content: Text or PDF content to summarize
+        max_length: Optional maximum length for the summary in words
+        get_service: Factory returning the LLM backend, only called on a cache miss
+
+    Returns:
+        Tuple of (summary, cached) where cached is True for a cache hit
+    """
+    content_hash = content_fingerprint(content)
+    model_name = get_model_name()
+    key = summary_cache_key(content_hash, max_length, model_name)
+
+    summary = get_cached_summary(key)
+    if summary is not None:
+        return summary, True
+
+    # Identical concurrent requests wait for one generation instead of each calling Gemini
+    (summary, cached), shared = _summary_flights.do(
+        key, lambda: _generate_once(key, content, content_hash, max_length, model_name, get_service)
+    )
+    return summary, cached or shared
+
+
+def _generate_once(key: str, content: Content, content_hash: str, max_length: Optional[int],
+                   model_name: str, get_service: Callable[[], BaseLLMBackend]) -> Tuple[str, bool]:
+    """Generate and cache a summary while holding the cross-process lock for its key."""
+    token = acquire_lock(key)
+    while token is None:
+        # Another process is generating this summary, wait for it to land in the cache
+        time.sleep(settings.SUMMARY_LOCK_POLL_INTERVAL)
+        summary = get_cached_summary(key)
+        if summary is not None:
+            return summary, True
+        token = acquire_lock(key)
+
+    try:
+        summary = get_cached_summary(key)
+        if summary is not None:
+            return summary, True
+
+        text = get_content_text(content)
+        if content.content_type == 'pdf' and not text.strip():
+            raise ValueError("No text could be extracted from the PDF")
+
+        backend = get_service()
+        if estimate_tokens(text) > settings.SUMMARY_CHUNK_TOKENS:
+            summary = MapReduceSummarizer(backend).summarize(text, max_length)
+        else:
+            summary = backend.summarize_text(text, max_length)
+
+        store_summary(key, content, content_hash, max_length, model_name, summary)
+        return summary, False
+    finally:
+        release_lock(key, token)
+
+
+async def asummarize_content(content: Content, max_length: Optional[int] = None,
+                             get_service: Callable[[], BaseLLMBackend] = get_llm_backend) -> Tuple[str, bool]:
+    """
+    Coroutine version of summarize_content for ASGI views.
+
+    Short texts are summarized with the async Gemini client, so waiting on
+    the API holds no thread. Map-reduce summaries of long documents still
+    run on a worker thread.
+
+    Returns:
+        Tuple of (summary, cached) where cached is True for a cache hit
+    """
+    content_hash = await sync_to_async(content_fingerprint)(content)
+    model_name = get_model_name()
+    key = summary_cache_key(content_hash, max_length, model_name)
+
+    summary = await sync_to_async(get_cached_summary)(key)
+    if summary is not None:
+        return summary, True
+
+    (summary, cached), shared = await _async_summary_flights.do(
+        key, lambda: _agenerate_once(key, content, content_hash, max_length, model_name, get_service)
+    )
+    return summary, cached or shared
+
+
+async def _agenerate_once(key: str, content: Content, content_hash: str, max_length: Optional[int],
+                          model_name: str, get_service: Callable[[], BaseLLMBackend]) -> Tuple[str, bool]:
+    """Coroutine version of _generate_once."""
+    token = await sync_to_async(acquire_lock)(key)
+    while token is None:
+        await asyncio.sleep(settings.SUMMARY_LOCK_POLL_INTERVAL)
+        summary = await sync_to_async(get_cached_summary)(key)
+        if summary is not None:
+            return summary, True
+        token = await sync_to_async(acquire_lock)(key)
+
+    try:
+        summary = await sync_to_async(get_cached_summary)(key)
+        if summary is not None:
+            return summary, True
+
+        text = await sync_to_async(get_content_text)(content)
+        if content.content_type == 'pdf' and not text.strip():
+            raise ValueError("No text could be extracted from the PDF")
+
+        backend = get_service()
+        if estimate_tokens(text) > settings.SUMMARY_CHUNK_TOKENS:
+            # Off the shared sync thread, so other requests' queries are not stuck behind it
+            summarizer = MapReduceSummarizer(backend)
+            summary = await sync_to_async(summarizer.summarize, thread_sensitive=False)(text, max_length)
+        else:
+            summary = await backend.asummarize_text(text, max_length)
+
+        await sync_to_async(store_summary)(key, content, content_hash, max_length, model_name, summary)
+        return summary, False
+    finally:
+        await sync_to_async(release_lock)(key, token)
@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework.test import APIClient
+from content.models import Content, Training
+from datetime import date
+import shutil
+import tempfile
+
+User = get_user_model()
+
+
+class SharedCacheMixin:
+    """
+    A file-based default cache, which like Redis is shared by every process.
+
+    Access scopes and list responses are only cached across requests with a
+    shared cache. Mix into any TestCase before the TestCase class.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.cache_location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_location, ignore_errors=True)
+        shared = override_settings(CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": self.cache_location,
+            },
+        })
+        shared.enable()
+        self.addCleanup(shared.disable)
+
+
+class ContentFixtureMixin:
+    """
+    A manager (self.user) with an authenticated API client and a training they created.
+
+    Mix into any TestCase before the TestCase class.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpass",
+            email="test@email.com",
+            role="manager",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.training = Training.objects.create(
+            name="Test Training",
+            start_date=date.today(),
+            end_date=date.today(),
+            duration_days=1,
+            created_by=self.user,
+        )
+
+    def make_user(self, username, role):
+        """A user with the given role, named after their username."""
+        return User.objects.create_user(
+            username=username,
+            password="testpass",
+            email=f"{username}@email.com",
+            role=role,
+        )
+
+    def make_content(self, **fields):
+        """Text content of the training created by the manager, with any fields overridden."""
+        return Content.objects.create(**{
+            "title": "Test Content",
+            "training": self.training,
+            "content_type": "text",
+            "text_content": "This is a sample text content for testing.",
+            "created_by": self.user,
+            **fields,
+        })
@@ -0,0 +1,87 @@
+import asyncio
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from benchmarks.fixtures import FakeGeminiServer
+from content.gemini_service import GeminiService
+from content.models import SummaryCache
+from content.single_flight import AsyncSingleFlight
+from content.tests.base import ContentFixtureMixin
+from unittest.mock import patch, MagicMock, AsyncMock
+
+
+class TestAsyncSummarize(ContentFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = self.make_content()
+        self.url = reverse("content-summarize-asgi", kwargs={"pk": self.content.id})
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    @patch("content.async_views.get_llm_backend")
+    async def test_summarize_and_cache(self, mock_gemini_service):
+        """Test the ASGI view summarizes with the async client and caches the result"""
+        mock_service_instance = MagicMock()
+        mock_service_instance.asummarize_text = AsyncMock(return_value="This is a summary.")
+        mock_gemini_service.return_value = mock_service_instance
+
+        response = await self.async_client.post(
+            self.url, {"max_length": 100}, content_type="application/json", headers=self.headers
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["summary"], "This is a summary.")
+        self.assertFalse(response.json()["cached"])
+        self.assertEqual(response.json()["max_length"], 100)
+        self.assertTrue(await SummaryCache.objects.filter(content=self.content, max_length=100).aexists())
+
+        response = await self.async_client.post(
+            self.url, {"max_length": 100}, content_type="application/json", headers=self.headers
+        )
+        self.assertTrue(response.json()["cached"])
+        mock_service_instance.asummarize_text.assert_awaited_once()
+
+    async def test_invalid_max_length(self):
+        """Test max_length is validated like the DRF view"""
+        response = await self.async_client.post(
+            self.url, {"max_length": 10}, content_type="application/json", headers=self.headers
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "max_length must be between 50 and 1000")
+
+    async def test_async_single_flight_coalesces_calls(self):
+        """Test concurrent awaits of one key share a single call"""
+        flights = AsyncSingleFlight()
+        calls = 0
+
+        async def generate():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "summary"
+
+        results = await asyncio.gather(*(flights.do("key", generate) for _ in range(10)))
+
+        self.assertEqual(calls, 1)
+        self.assertEqual([shared for _, shared in results].count(False), 1)
+        self.assertTrue(all(result == "summary" for result, _ in results))
+
+
+class TestAsyncGeminiClient(TransactionTestCase):
+    def test_async_client_shares_connections_per_loop(self):
+        """Test the real async client reuses one pooled client per event loop"""
+        with FakeGeminiServer(latency=0.05) as server, override_settings(
+            GEMINI_BASE_URL=server.url, GEMINI_API_KEY="test"
+        ):
+            service = GeminiService()
+
+            async def run():
+                self.assertIs(service.aio, service.aio)
+                return await asyncio.gather(*(service.asummarize_text(f"Text {i}") for i in range(20)))
+
+            self.assertEqual(asyncio.run(run()), ["Fake summary."] * 20)
+            self.assertEqual(asyncio.run(run()), ["Fake summary."] * 20)
+
+        self.assertEqual(server.requests, 40)
+        self.assertGreater(server.max_in_flight, 1)
+        self.assertEqual(len(service._async_clients), 1)
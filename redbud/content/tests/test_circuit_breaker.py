@@ -0,0 +1,128 @@
+import time
+import httpx
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from google.genai import errors as genai_errors
+from content.gemini_service import GeminiService
+from content.resilience import CircuitBreaker, UpstreamError, UpstreamUnavailable, get_breaker
+from content.tests.base import ContentFixtureMixin
+from unittest.mock import patch, MagicMock
+
+User = get_user_model()
+
+
+@override_settings(GEMINI_API_KEY="test", GEMINI_RETRY_BACKOFF=0, GEMINI_MAX_RETRIES=2)
+class TestRetries(TestCase):
+    def setUp(self):
+        get_breaker("gemini").reset()
+        self.service = GeminiService()
+        self.service.client = MagicMock()
+        self.generate = self.service.client.models.generate_content
+
+    def test_transient_errors_are_retried(self):
+        """Test 5xx responses and timeouts are retried until a call succeeds"""
+        self.generate.side_effect = [
+            genai_errors.ServerError(503, {"error": {"message": "overloaded"}}),
+            httpx.ReadTimeout("timed out"),
+            MagicMock(text="A summary.", usage_metadata=None),
+        ]
+
+        self.assertEqual(self.service.summarize_text("Some text."), "A summary.")
+
+        metrics = self.service.breaker.snapshot()
+        self.assertEqual((metrics["retries"], metrics["timeouts"], metrics["successes"]), (2, 1, 1))
+        self.assertEqual(metrics["state"], CircuitBreaker.CLOSED)
+
+    def test_client_errors_are_not_retried(self):
+        """Test a rejected request fails at once without counting against the breaker"""
+        self.generate.side_effect = genai_errors.ClientError(400, {"error": {"message": "bad request"}})
+
+        with self.assertRaises(UpstreamError):
+            self.service.summarize_text("Some text.")
+
+        self.assertEqual(self.generate.call_count, 1)
+        self.assertEqual(self.service.breaker.consecutive_failures, 0)
+
+    @override_settings(GEMINI_BREAKER_FAILURE_THRESHOLD=2, GEMINI_BREAKER_RESET_TIMEOUT=30)
+    def test_breaker_opens_and_fails_fast(self):
+        """Test repeated failures open the breaker so later calls skip the network"""
+        self.generate.side_effect = genai_errors.ServerError(500, {"error": {"message": "internal"}})
+
+        for _ in range(2):
+            with self.assertRaises(UpstreamError):
+                self.service.summarize_text("Some text.")
+        self.assertEqual(self.generate.call_count, 6)
+
+        with self.assertRaises(UpstreamUnavailable) as raised:
+            self.service.summarize_text("Some text.")
+        self.assertEqual(self.generate.call_count, 6)
+        self.assertAlmostEqual(raised.exception.retry_after, 30, delta=1)
+        self.assertEqual(self.service.breaker.snapshot()["state"], CircuitBreaker.OPEN)
+
+    def test_half_open_trial_closes_breaker(self):
+        """Test one trial call is let through after the reset timeout"""
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+        breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        time.sleep(0.06)
+        breaker.before_call()
+        with self.assertRaises(UpstreamUnavailable):
+            breaker.before_call()
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+class TestUnavailableViews(ContentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        get_breaker("gemini").reset()
+        self.content = self.make_content()
+        self.url = reverse("content-summarize", kwargs={"pk": self.content.id})
+
+    @patch("content.views.get_llm_backend")
+    def test_open_breaker_serves_last_cached_summary(self, mock_gemini_service):
+        """Test the last cached summary is served, marked stale, while Gemini is unavailable"""
+        mock_service_instance = MagicMock()
+        mock_service_instance.summarize_text.return_value = "A cached summary."
+        mock_gemini_service.return_value = mock_service_instance
+        self.client.post(self.url, data={"max_length": 100}, format="json")
+
+        mock_service_instance.summarize_text.side_effect = UpstreamUnavailable(20)
+        response = self.client.post(self.url, data={"max_length": 200}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["summary"], "A cached summary.")
+        self.assertTrue(response.data["stale"])
+        self.assertEqual(get_breaker("gemini").snapshot()["stale_served"], 1)
+
+    @patch("content.views.get_llm_backend")
+    def test_open_breaker_without_cached_summary(self, mock_gemini_service):
+        """Test 503 with Retry-After when there is nothing cached to fall back to"""
+        mock_service_instance = MagicMock()
+        mock_service_instance.summarize_text.side_effect = UpstreamUnavailable(20)
+        mock_gemini_service.return_value = mock_service_instance
+
+        response = self.client.post(self.url, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "20")
+
+    def test_metrics_endpoint(self):
+        """Test managers can read breaker state and counters, other roles cannot"""
+        response = self.client.get(reverse("backend-metrics"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["backends"]["gemini"]["state"], CircuitBreaker.CLOSED)
+        self.assertIn("retries", response.data["backends"]["gemini"])
+
+        employee = User.objects.create_user(
+            username="employee", password="testpass", email="employee@email.com", role="employee"
+        )
+        self.client.force_authenticate(user=employee)
+        self.assertEqual(self.client.get(reverse("backend-metrics")).status_code, status.HTTP_403_FORBIDDEN)
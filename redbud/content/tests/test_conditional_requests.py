@@ -0,0 +1,141 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from content.models import Content, Training
+from content.tests.base import SharedCacheMixin
+from content.views import ContentViewSet
+from unittest.mock import patch
+from datetime import date
+
+User = get_user_model()
+
+
+class TestConditionalRequests(SharedCacheMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.manager = User.objects.create_user(
+            username="manager",
+            password="testpass",
+            email="manager@email.com",
+            role="manager",
+        )
+        self.employee = User.objects.create_user(
+            username="employee",
+            password="testpass",
+            email="employee@email.com",
+            role="employee",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.employee)
+
+        self.training = Training.objects.create(
+            name="Test Training",
+            start_date=date.today(),
+            end_date=date.today(),
+            duration_days=1,
+            created_by=self.manager,
+        )
+        self.training.employees.add(self.employee)
+        self.contents = [
+            Content.objects.create(
+                title=f"Content {i}",
+                training=self.training,
+                content_type="text",
+                text_content=f"Sample text {i}.",
+                created_by=self.manager,
+            )
+            for i in range(3)
+        ]
+        self.url = reverse("content-by-training")
+        self.params = {"training_id": self.training.id}
+
+    def get(self, etag=None, url=None, params=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.client.get(url or self.url, self.params if params is None else params, **headers)
+
+    def test_unchanged_content_is_not_modified(self):
+        """Test a matching If-None-Match gets 304 without serializing"""
+        response = self.get()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        with patch.object(ContentViewSet, "get_serializer") as get_serializer:
+            not_modified = self.get(response["ETag"])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified["ETag"], response["ETag"])
+        get_serializer.assert_not_called()
+
+    def test_changes_invalidate_the_etag(self):
+        """Test updates, deletions, related renames and enrollment changes all change the ETag"""
+        etag = self.get()["ETag"]
+
+        def changed():
+            nonlocal etag
+            response = self.get(etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            etag = response["ETag"]
+
+        self.contents[0].title = "Updated"
+        self.contents[0].save()
+        changed()
+
+        self.contents[1].delete()
+        changed()
+
+        self.training.name = "Renamed"
+        self.training.save()
+        changed()
+
+        other = Training.objects.create(
+            name="Other Training",
+            start_date=date.today(),
+            end_date=date.today(),
+            duration_days=1,
+            created_by=self.manager,
+        )
+        other.employees.add(self.employee)
+        changed()
+
+    def test_deactivated_content_changes_the_list_etag(self):
+        """Test content hidden from employees changes their list's ETag"""
+        url = reverse("content-list")
+        etag = self.get(url=url, params={})["ETag"]
+
+        self.contents[0].is_active = False
+        self.contents[0].save()
+
+        response = self.get(etag, url=url, params={})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+
+    def test_etag_is_per_user(self):
+        """Test another user's ETag for the same URL is never current"""
+        etag = self.get()["ETag"]
+
+        self.client.force_authenticate(user=self.manager)
+        self.assertEqual(self.get(etag).status_code, status.HTTP_200_OK)
+
+    def test_if_modified_since_alone_is_not_enough(self):
+        """Test a deletion is not hidden from clients revalidating by date only"""
+        last_modified = self.get()["Last-Modified"]
+        self.contents[0].delete()
+
+        response = self.client.get(self.url, self.params, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+    def test_detail(self):
+        """Test content detail is conditional too"""
+        url = reverse("content-detail", kwargs={"pk": self.contents[0].id})
+        response = self.client.get(url)
+        self.assertEqual(
+            response["Last-Modified"],
+            http_date(max(self.contents[0].updated_at, self.training.updated_at, self.manager.updated_at).timestamp()),
+        )
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -0,0 +1,68 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from content.models import Content
+from content.tests.base import ContentFixtureMixin, SharedCacheMixin
+
+
+class TestContentQueryCounts(SharedCacheMixin, ContentFixtureMixin, APITestCase):
+    """Content list, filter and detail endpoints cost the same queries for 1, 5 and 25 rows."""
+
+    SIZES = [1, 5, 25]
+
+    def setUp(self):
+        super().setUp()
+        self.manager = self.user
+        self.employee = self.make_user("employee", "employee")
+        self.training.employees.add(self.employee)
+
+    def add_content(self, total):
+        """Top up the training to `total` content rows."""
+        for i in range(Content.objects.count(), total):
+            self.make_content(title=f"Content {i}", text_content=f"Sample text {i}.")
+
+    def query_counts(self, url, params=None):
+        counts = []
+        for size in self.SIZES:
+            self.add_content(size)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            counts.append(len(queries))
+        return counts
+
+    def test_list(self):
+        """Test a page of content costs its validators, a COUNT and one SELECT"""
+        self.client.force_authenticate(user=self.manager)
+        self.assertEqual(self.query_counts(reverse("content-list")), [3, 3, 3])
+
+    def test_list_as_employee(self):
+        """Test the enrolled trainings filter costs one query, on the first request only"""
+        self.client.force_authenticate(user=self.employee)
+        counts = self.query_counts(reverse("content-list"))
+        # The access scope is cached after the first request
+        self.assertEqual(counts, [4, 3, 3])
+
+    def test_by_training(self):
+        """Test content of a training is read in one query after its validators"""
+        self.client.force_authenticate(user=self.manager)
+        counts = self.query_counts(reverse("content-by-training"), {"training_id": self.training.id})
+        self.assertEqual(counts, [2, 2, 2])
+
+    def test_by_type(self):
+        """Test content of a type is read in one query after its validators"""
+        self.client.force_authenticate(user=self.manager)
+        counts = self.query_counts(reverse("content-by-type"), {"content_type": "text"})
+        self.assertEqual(counts, [2, 2, 2])
+
+    def test_detail(self):
+        """Test one content is read with its training and creator in one query"""
+        self.client.force_authenticate(user=self.manager)
+        self.add_content(1)
+        url = reverse("content-detail", kwargs={"pk": Content.objects.get().id})
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data["training_name"], "Test Training")
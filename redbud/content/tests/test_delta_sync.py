@@ -0,0 +1,151 @@
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from content.models import Content, Training
+from users.models import Tombstone
+from datetime import date, timedelta
+
+User = get_user_model()
+
+
+@override_settings(SYNC_OVERLAP=0)
+class TestDeltaSync(APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user(
+            username="manager",
+            password="testpass",
+            email="manager@email.com",
+            role="manager",
+        )
+        self.employee = User.objects.create_user(
+            username="employee",
+            password="testpass",
+            email="employee@email.com",
+            role="employee",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+
+        self.training = Training.objects.create(
+            name="Test Training",
+            start_date=date.today(),
+            end_date=date.today(),
+            duration_days=1,
+            created_by=self.manager,
+        )
+        self.training.employees.add(self.employee)
+        self.contents = [
+            Content.objects.create(
+                title=f"Content {i}",
+                training=self.training,
+                content_type="text",
+                text_content=f"Sample text {i}.",
+                created_by=self.manager,
+            )
+            for i in range(5)
+        ]
+
+    def changes(self, since, **params):
+        return self.client.get(reverse("content-changes"), {"updated_since": since.isoformat(), **params})
+
+    def test_cursor_pagination_is_opt_in(self):
+        """Test lists keep page numbers unless the client asks for cursors"""
+        url = reverse("content-list")
+        self.assertEqual(self.client.get(url).data["count"], 5)
+
+        ids = []
+        response = self.client.get(url, {"pagination": "cursor", "page_size": 2})
+        while True:
+            self.assertNotIn("count", response.data)
+            ids += [content["id"] for content in response.data["results"]]
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+
+        self.assertEqual(ids, sorted(content.id for content in self.contents))
+
+    def test_changes_since_last_sync(self):
+        """Test only updated content and the ids of deleted content are returned"""
+        since = timezone.now()
+        updated, deleted = self.contents[0], self.contents[1]
+        updated.title = "Updated"
+        updated.save()
+        deleted_id = deleted.id
+        deleted.delete()
+
+        response = self.changes(since)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([content["title"] for content in response.data["results"]], ["Updated"])
+        self.assertEqual(response.data["removed"], [deleted_id])
+        self.assertIn("access_version", response.data)
+
+        response = self.changes(response.data["synced_at"])
+        self.assertEqual((response.data["results"], response.data["removed"]), ([], []))
+
+    def test_deleting_training_leaves_tombstones(self):
+        """Test content deleted along with its training is reported as removed"""
+        since = timezone.now()
+        self.training.delete()
+
+        self.assertEqual(Tombstone.objects.filter(model="content.content").count(), 5)
+        response = self.changes(since)
+        self.assertEqual(sorted(response.data["removed"]), sorted(content.id for content in self.contents))
+
+    def test_deactivated_content_is_removed_for_employees(self):
+        """Test content hidden from employees is reported as removed to them"""
+        since = timezone.now()
+        content = self.contents[0]
+        content.is_active = False
+        content.save()
+
+        self.client.force_authenticate(user=self.employee)
+        response = self.changes(since)
+
+        self.assertEqual(response.data["results"], [])
+        self.assertEqual(response.data["removed"], [content.id])
+
+    def test_changes_are_paginated(self):
+        """Test large change sets come in keyset pages in update order"""
+        since = timezone.now()
+        for content in reversed(self.contents):
+            content.save()
+
+        response = self.changes(since, page_size=3)
+        ids = [content["id"] for content in response.data["results"]]
+        response = self.client.get(response.data["next"])
+        ids += [content["id"] for content in response.data["results"]]
+
+        self.assertEqual(ids, [content.id for content in reversed(self.contents)])
+        self.assertIsNone(response.data["next"])
+
+    def test_invalid_or_expired_updated_since(self):
+        """Test a malformed time is rejected and one past tombstone retention needs a full resync"""
+        for since in ["yesterday", "2024-13-45T00:00:00"]:
+            response = self.client.get(reverse("content-changes"), {"updated_since": since})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, since)
+
+        with override_settings(SYNC_TOMBSTONE_RETENTION=60):
+            response = self.changes(timezone.now() - timedelta(minutes=5))
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_access_version_follows_the_users_own_scope(self):
+        """Test enrollments of other users do not force a resync, but the user's own do"""
+        self.client.force_authenticate(user=self.employee)
+        since = timezone.now()
+        version = self.changes(since).data["access_version"]
+
+        other = User.objects.create_user(
+            username="other",
+            password="testpass",
+            email="other@email.com",
+            role="employee",
+        )
+        self.training.employees.add(other)
+        self.assertEqual(self.changes(since).data["access_version"], version)
+
+        self.training.employees.remove(self.employee)
+        self.assertNotEqual(self.changes(since).data["access_version"], version)
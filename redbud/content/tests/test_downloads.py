@@ -0,0 +1,157 @@
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from content.models import Content, Training
+from datetime import date
+import shutil
+import tempfile
+
+User = get_user_model()
+
+DATA = bytes(range(256)) * 4
+
+
+class TestDownloads(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root, MEDIA_SENDFILE_BACKEND="")
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.manager = User.objects.create_user(
+            username="manager",
+            password="testpass",
+            email="manager@email.com",
+            role="manager",
+        )
+        self.employee = User.objects.create_user(
+            username="employee",
+            password="testpass",
+            email="employee@email.com",
+            role="employee",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.employee)
+
+        self.training = Training.objects.create(
+            name="Test Training",
+            start_date=date.today(),
+            end_date=date.today(),
+            duration_days=1,
+            created_by=self.manager,
+        )
+        self.training.employees.add(self.employee)
+        self.content = Content.objects.create(
+            title="Video",
+            training=self.training,
+            content_type="video",
+            file=SimpleUploadedFile("clip.mp4", DATA, content_type="video/mp4"),
+            created_by=self.manager,
+        )
+        self.url = reverse("content-download", kwargs={"pk": self.content.id})
+
+    def test_full_download(self):
+        """Test the whole file is streamed with its type and length"""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), DATA)
+        self.assertEqual(response["Content-Type"], "video/mp4")
+        self.assertEqual(response["Content-Length"], str(len(DATA)))
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("Last-Modified", response)
+
+    def test_byte_ranges(self):
+        """Test single ranges are served as 206 Partial Content"""
+        for header, start, end in [("bytes=10-19", 10, 19), ("bytes=1000-", 1000, 1023), ("bytes=-5", 1019, 1023),
+                                   ("bytes=1000-5000", 1000, 1023)]:
+            response = self.client.get(self.url, HTTP_RANGE=header)
+
+            self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT, header)
+            self.assertEqual(b"".join(response.streaming_content), DATA[start:end + 1], header)
+            self.assertEqual(response["Content-Range"], f"bytes {start}-{end}/{len(DATA)}")
+            self.assertEqual(response["Content-Length"], str(end - start + 1))
+
+    def test_unsatisfiable_and_ignored_ranges(self):
+        """Test ranges past the end are 416 and several ranges get the whole file"""
+        response = self.client.get(self.url, HTTP_RANGE="bytes=5000-")
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(DATA)}")
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-1,5-6")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_range_of_empty_file(self):
+        """Test no range of an empty file is satisfiable"""
+        empty = Content.objects.create(
+            title="Empty",
+            training=self.training,
+            content_type="video",
+            file=SimpleUploadedFile("empty.mp4", b"", content_type="video/mp4"),
+            created_by=self.manager,
+        )
+        url = reverse("content-download", kwargs={"pk": empty.id})
+        for header in ["bytes=-5", "bytes=0-"]:
+            response = self.client.get(url, HTTP_RANGE=header)
+
+            self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, header)
+            self.assertEqual(response["Content-Range"], "bytes */0")
+
+    def test_if_range(self):
+        """Test a range is only served if the client's copy is still current"""
+        last_modified = self.client.get(self.url)["Last-Modified"]
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE="Mon, 01 Jan 2001 00:00:00 GMT")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_permissions(self):
+        """Test only users who can see the content may download it"""
+        outsider = User.objects.create_user(
+            username="outsider",
+            password="testpass",
+            email="outsider@email.com",
+            role="employee",
+        )
+        self.client.force_authenticate(user=outsider)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+        self.content.is_active = False
+        self.content.save()
+        self.client.force_authenticate(user=self.employee)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_proxy_hand_off(self):
+        """Test the front proxy is told which file to send"""
+        with override_settings(MEDIA_SENDFILE_BACKEND="nginx", MEDIA_ACCEL_REDIRECT_PREFIX="/protected-media/"):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{self.content.file.name}")
+        self.assertEqual(response.content, b"")
+
+        with override_settings(MEDIA_SENDFILE_BACKEND="sendfile"):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Sendfile"], self.content.file.path)
+
+    def test_content_without_file(self):
+        """Test text content has nothing to download"""
+        text = Content.objects.create(
+            title="Text",
+            training=self.training,
+            content_type="text",
+            text_content="Sample text.",
+            created_by=self.manager,
+        )
+        response = self.client.get(reverse("content-download", kwargs={"pk": text.id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        detail = self.client.get(reverse("content-detail", kwargs={"pk": self.content.id}))
+        self.assertTrue(detail.data["download_url"].endswith(self.url))
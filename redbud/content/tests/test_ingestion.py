@@ -0,0 +1,80 @@
+from django.urls import reverse
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from content.jobs import process_next_job
+from content.models import Content, ContentChunk, IngestionJob, JobStatus, StageStatus, SummaryCache
+from content.tests.base import ContentFixtureMixin
+from unittest.mock import patch, MagicMock
+
+
+@override_settings(INGESTION_SUMMARY_LENGTHS=[200])
+class TestIngestion(ContentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.service = MagicMock()
+        self.service.summarize_text.return_value = "This is a summary."
+
+    def create_content(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Content.objects.create(
+                title="Test Content",
+                training=self.training,
+                content_type="text",
+                text_content="This is a sample text content for testing.",
+                created_by=self.user,
+            )
+
+    def test_new_content_is_ingested(self):
+        """Test creating content queues a job that precomputes the summary and index"""
+        content = self.create_content()
+        self.assertEqual(IngestionJob.objects.get().status, JobStatus.PENDING)
+
+        with patch("content.jobs.get_llm_backend", return_value=self.service):
+            self.assertTrue(process_next_job())
+
+        content.refresh_from_db()
+        self.assertEqual(content.extraction_status, StageStatus.SKIPPED)
+        self.assertEqual(content.summary_status, StageStatus.SUCCEEDED)
+        self.assertEqual(content.index_status, StageStatus.SUCCEEDED)
+        self.assertIsNotNone(content.ingested_at)
+        self.assertEqual(IngestionJob.objects.get().status, JobStatus.SUCCEEDED)
+        self.assertTrue(SummaryCache.objects.filter(content=content, max_length=200).exists())
+        self.assertTrue(ContentChunk.objects.filter(content=content).exists())
+
+        url = reverse("content-summarize", kwargs={"pk": content.id})
+        with patch("content.views.get_llm_backend") as mock_service:
+            response = self.client.post(url, data={"max_length": 200}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["cached"])
+        mock_service.assert_not_called()
+
+    def test_failed_stage_is_retried(self):
+        """Test a failing stage is recorded and the job is scheduled again"""
+        content = self.create_content()
+        self.service.summarize_text.side_effect = Exception("API Error")
+
+        with patch("content.jobs.get_llm_backend", return_value=self.service):
+            process_next_job()
+
+        content.refresh_from_db()
+        self.assertEqual(content.summary_status, StageStatus.FAILED)
+        self.assertEqual(content.index_status, StageStatus.SUCCEEDED)
+        self.assertIsNone(content.ingested_at)
+
+        job = IngestionJob.objects.get()
+        self.assertEqual((job.status, job.attempts, job.error), (JobStatus.PENDING, 1, "API Error"))
+
+    def test_text_change_requeues_ingestion(self):
+        """Test editing the text resets the stages and queues another run"""
+        content = self.create_content()
+        IngestionJob.objects.update(status=JobStatus.SUCCEEDED)
+
+        content.text_content = "Updated text."
+        with self.captureOnCommitCallbacks(execute=True):
+            content.save()
+
+        content.refresh_from_db()
+        self.assertEqual(content.summary_status, StageStatus.PENDING)
+        self.assertEqual(IngestionJob.objects.filter(status=JobStatus.PENDING).count(), 1)
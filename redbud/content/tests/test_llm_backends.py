@@ -0,0 +1,102 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from content.llm import get_llm_backend, get_model_name
+from content.models import SummaryCache
+from content.resilience import UpstreamError, get_breaker
+from content.retrieval import index_content
+from content.stub_backend import StubBackend
+from content.tests.base import ContentFixtureMixin
+
+
+def stub_backends(**options):
+    return {
+        "stub": {
+            "BACKEND": "content.stub_backend.StubBackend",
+            "MODEL": "stub-model",
+            "OPTIONS": options,
+        },
+    }
+
+
+@override_settings(GEMINI_RETRY_BACKOFF=0, GEMINI_MAX_RETRIES=2)
+class TestBackendRegistry(TestCase):
+    def setUp(self):
+        get_breaker("stub").reset()
+
+    @override_settings(LLM_BACKEND="stub", LLM_BACKENDS=stub_backends(latency=0))
+    def test_backend_is_chosen_in_settings(self):
+        """Test LLM_BACKEND selects a shared instance of the configured class"""
+        backend = get_llm_backend()
+
+        self.assertIsInstance(backend, StubBackend)
+        self.assertIs(get_llm_backend(), backend)
+        self.assertEqual(get_model_name(), "stub-model")
+
+        with override_settings(LLM_BACKENDS=stub_backends(latency=0.01)):
+            self.assertEqual(get_llm_backend().latency, 0.01)
+
+    @override_settings(LLM_BACKEND="missing")
+    def test_unknown_backend(self):
+        """Test an alias missing from LLM_BACKENDS is a configuration error"""
+        with self.assertRaises(ImproperlyConfigured):
+            get_llm_backend()
+
+    def test_stub_is_deterministic(self):
+        """Test the stub returns the same summary and embeddings for the same input"""
+        backend = StubBackend(latency=0)
+        text = "Fire exits are marked in green. Extinguishers are checked monthly."
+
+        summary = backend.summarize_text(text)
+        self.assertEqual(summary, backend.summarize_text(text))
+        self.assertTrue(summary.startswith("Fire exits are marked"))
+        self.assertEqual(len(backend.embed_texts(["a", "b"])[0]), backend.embedding_dimension)
+
+    async def test_stub_streams_the_same_summary(self):
+        """Test the streamed fragments join up to the blocking call's summary"""
+        backend = StubBackend(latency=0)
+        text = "Fire exits are marked in green. Extinguishers are checked monthly."
+
+        streamed = "".join([part async for part in backend.astream_summary(text)])
+
+        self.assertEqual(streamed, await backend.asummarize_text(text))
+
+    def test_stub_failure_injection(self):
+        """Test injected 5xx failures are retried and 4xx failures are not"""
+        backend = StubBackend(latency=0, failure_rate=1)
+        with self.assertRaises(UpstreamError):
+            backend.summarize_text("Some text.")
+        self.assertEqual(backend.calls, 3)
+
+        backend = StubBackend(alias="stub-400", latency=0, failure_rate=1, failure_status=400)
+        with self.assertRaises(UpstreamError):
+            backend.summarize_text("Some text.")
+        self.assertEqual(backend.calls, 1)
+
+
+@override_settings(LLM_BACKEND="stub", LLM_BACKENDS=stub_backends(latency=0))
+class TestStubBackendViews(ContentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        get_breaker("stub").reset()
+        self.content = self.make_content()
+
+    def test_summarize_and_chat_without_network(self):
+        """Test the summarize and chat endpoints run end to end on the stub backend"""
+        url = reverse("content-summarize", kwargs={"pk": self.content.id})
+        response = self.client.post(url, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["summary"], "This is a sample text content for testing.")
+        self.assertEqual(SummaryCache.objects.get().model_name, "stub-model")
+
+        index_content(self.content)
+        response = self.client.post(
+            reverse("content-chat"),
+            data={"training_id": self.training.id, "question": "What is this?"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_llm_backend().calls, 2)
@@ -0,0 +1,93 @@
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from content.map_reduce import MapReduceSummarizer, estimate_tokens, split_into_chunks
+from content.models import ChunkSummary, Content
+from content.tests.base import ContentFixtureMixin
+from unittest.mock import patch, MagicMock
+
+
+def make_document(sections=200, marker=""):
+    return "\n\n".join(
+        f"Section {n}{marker if n == 70 else ''}: " + "onboarding policy details " * 3
+        for n in range(sections)
+    )
+
+
+def make_service():
+    service = MagicMock()
+    service.summarize_chunk.side_effect = lambda text: f"chunk summary of {text[:12]}"
+    service.combine_summaries.side_effect = lambda summaries, max_length=None: "final summary"
+    return service
+
+
+class TestChunking(TestCase):
+    def test_chunks_respect_token_budget(self):
+        """Test every chunk fits the budget and no text is lost"""
+        text = make_document()
+        chunks = split_into_chunks(text, chunk_tokens=500)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(estimate_tokens(chunk) <= 500 for chunk in chunks))
+        self.assertEqual(" ".join(chunks).split(), text.split())
+
+    def test_oversized_paragraph_is_split(self):
+        """Test a single paragraph larger than the budget is split at whitespace"""
+        chunks = split_into_chunks("word " * 1000, chunk_tokens=100)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(estimate_tokens(chunk) <= 100 for chunk in chunks))
+
+
+class TestMapReduceSummarizer(TestCase):
+    def test_chunks_are_summarized_and_combined(self):
+        """Test every chunk is summarized once and combined with max_length"""
+        service = make_service()
+        text = make_document()
+
+        summary = MapReduceSummarizer(service, chunk_tokens=500, concurrency=4).summarize(text, 200)
+
+        self.assertEqual(summary, "final summary")
+        chunk_count = len(split_into_chunks(text, 500))
+        self.assertEqual(service.summarize_chunk.call_count, chunk_count)
+        self.assertEqual(ChunkSummary.objects.count(), chunk_count)
+        self.assertEqual(service.combine_summaries.call_args.args[1], 200)
+
+    def test_editing_one_section_only_resummarizes_changed_chunks(self):
+        """Test unchanged chunks are served from the chunk summary cache"""
+        service = make_service()
+        summarizer = MapReduceSummarizer(service, chunk_tokens=500)
+        summarizer.summarize(make_document())
+        first_run = service.summarize_chunk.call_count
+
+        summarizer.summarize(make_document(marker=" (revised)"))
+
+        self.assertLessEqual(service.summarize_chunk.call_count - first_run, 2)
+
+
+class TestLongContentSummary(ContentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = Content.objects.create(
+            title="Long Manual",
+            training=self.training,
+            content_type="text",
+            text_content=make_document(),
+            created_by=self.user,
+        )
+
+    @override_settings(SUMMARY_CHUNK_TOKENS=500)
+    @patch("content.views.get_llm_backend")
+    def test_long_content_uses_map_reduce(self, mock_gemini_service):
+        """Test content above SUMMARY_CHUNK_TOKENS is not sent in one prompt"""
+        service = make_service()
+        mock_gemini_service.return_value = service
+
+        url = reverse("content-summarize", kwargs={"pk": self.content.id})
+        response = self.client.post(url, data={"max_length": 150}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["summary"], "final summary")
+        service.summarize_text.assert_not_called()
+        self.assertTrue(service.summarize_chunk.called)
@@ -0,0 +1,127 @@
+from django.db import IntegrityError, transaction
+from django.db.models.query import QuerySet
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from google.genai import types
+from content.gemini_service import GeminiService
+from content.jobs import process_next_job
+from content.models import GeminiUsage, JobStatus, RateLimitBucket, SummaryJob
+from content.rate_limit import RateLimiter, RateLimitExceeded
+from content.usage import record_usage, usage_scope
+from content.tests.base import ContentFixtureMixin
+from unittest.mock import patch, MagicMock
+
+
+class TestRateLimiter(ContentFixtureMixin, TestCase):
+    def test_requests_per_minute(self):
+        """Test the request bucket empties and reports when it refills"""
+        limiter = RateLimiter("test", requests_per_minute=2, tokens_per_minute=0)
+
+        self.assertEqual(limiter.try_acquire(10), 0)
+        self.assertEqual(limiter.try_acquire(10), 0)
+        self.assertAlmostEqual(limiter.try_acquire(10), 30, delta=1)
+
+    def test_tokens_per_minute(self):
+        """Test the token bucket charges estimated tokens and is shared through the database"""
+        RateLimiter("test", requests_per_minute=0, tokens_per_minute=1200).try_acquire(1000)
+
+        other_process = RateLimiter("test", requests_per_minute=0, tokens_per_minute=1200)
+        self.assertAlmostEqual(other_process.try_acquire(500), 15, delta=1)
+        self.assertEqual(other_process.try_acquire(100), 0)
+
+    def test_adjust_charges_actual_usage(self):
+        """Test actual token counts correct the estimate on the next acquire"""
+        limiter = RateLimiter("test", requests_per_minute=0, tokens_per_minute=1200)
+        limiter.try_acquire(100)
+        limiter.adjust(900)
+        limiter.try_acquire(100)
+
+        self.assertAlmostEqual(RateLimitBucket.objects.get(name="test").tokens, 100, delta=1)
+        self.assertGreater(limiter.try_acquire(200), 0)
+
+    def test_acquire_sheds_load_beyond_max_wait(self):
+        """Test callers wait at most max_wait before getting RateLimitExceeded"""
+        limiter = RateLimiter("test", requests_per_minute=1, tokens_per_minute=0, max_wait=1)
+        limiter.acquire(10)
+
+        with self.assertRaises(RateLimitExceeded) as raised:
+            limiter.acquire(10)
+        self.assertAlmostEqual(raised.exception.retry_after, 60, delta=1)
+
+    @override_settings(GEMINI_API_KEY="test")
+    def test_usage_is_recorded_per_scope(self):
+        """Test each Gemini call adds its actual tokens to the active user and training"""
+        user, training = self.user, self.training
+        service = GeminiService()
+        service.client = MagicMock()
+        service.client.models.generate_content.return_value = MagicMock(
+            text="A summary.",
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=120, candidates_token_count=30
+            ),
+        )
+
+        with usage_scope(user.id, training.id):
+            service.summarize_text("Some text to summarize.")
+            service.summarize_text("Some more text to summarize.")
+
+        usage = GeminiUsage.objects.get()
+        self.assertEqual((usage.user, usage.training, usage.date), (user, training, timezone.localdate()))
+        self.assertEqual((usage.requests, usage.input_tokens, usage.output_tokens), (2, 240, 60))
+
+    def test_usage_row_created_concurrently_is_added_to(self):
+        """Test a call that loses the race to create today's row adds to the other process's row"""
+        GeminiUsage.objects.create(date=timezone.localdate(), requests=1, input_tokens=100, output_tokens=20)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            GeminiUsage.objects.create(date=timezone.localdate())
+
+        real_update = QuerySet.update
+        updates = []
+
+        def update_before_the_other_commit(queryset, **fields):
+            updates.append(fields)
+            return 0 if len(updates) == 1 else real_update(queryset, **fields)
+
+        with patch.object(QuerySet, "update", update_before_the_other_commit):
+            record_usage(100, 20)
+
+        usage = GeminiUsage.objects.get()
+        self.assertEqual((usage.requests, usage.input_tokens, usage.output_tokens), (2, 200, 40))
+
+
+class TestRateLimitedViews(ContentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = self.make_content()
+        self.url = reverse("content-summarize", kwargs={"pk": self.content.id})
+
+    @patch("content.views.get_llm_backend")
+    def test_summarize_returns_429_with_retry_after(self, mock_gemini_service):
+        """Test quota exhaustion is reported as 429 instead of 500"""
+        mock_service_instance = MagicMock()
+        mock_service_instance.summarize_text.side_effect = RateLimitExceeded(12.3)
+        mock_gemini_service.return_value = mock_service_instance
+
+        response = self.client.post(self.url, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "13")
+        self.assertEqual(response.data["retry_after"], 13)
+
+    @patch("content.jobs.get_llm_backend")
+    def test_rate_limited_job_keeps_its_attempts(self, mock_gemini_service):
+        """Test a job that hits the rate limit is postponed without using an attempt"""
+        mock_service_instance = MagicMock()
+        mock_service_instance.summarize_text.side_effect = RateLimitExceeded(30)
+        mock_gemini_service.return_value = mock_service_instance
+        self.client.post(self.url, data={"async": True}, format="json")
+
+        self.assertTrue(process_next_job())
+
+        job = SummaryJob.objects.get()
+        self.assertEqual(job.status, JobStatus.PENDING)
+        self.assertEqual(job.attempts, 0)
+        self.assertGreater(job.run_after, timezone.now())
@@ -0,0 +1,132 @@
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from content.ingestion import update_progress
+from content.models import Content, StageStatus, Training
+from content.tests.base import SharedCacheMixin
+from users.access import load_access_scope
+from users.response_cache import reset_response_cache_stats, response_cache_snapshot
+from datetime import date
+
+User = get_user_model()
+
+
+class TestResponseCache(SharedCacheMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.manager = User.objects.create_user(
+            username="manager",
+            password="testpass",
+            email="manager@email.com",
+            role="manager",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+
+        self.trainings = []
+        self.employees = []
+        for i in range(2):
+            training = Training.objects.create(
+                name=f"Training {i}",
+                start_date=date.today(),
+                end_date=date.today(),
+                duration_days=1,
+                created_by=self.manager,
+            )
+            employee = User.objects.create_user(
+                username=f"employee{i}",
+                password="testpass",
+                email=f"employee{i}@email.com",
+                role="employee",
+            )
+            training.employees.add(employee)
+            for j in range(i + 1):
+                Content.objects.create(
+                    title=f"Content {i}.{j}",
+                    training=training,
+                    content_type="text",
+                    text_content=f"Sample text {i}.{j}.",
+                    created_by=self.manager,
+                )
+            self.trainings.append(training)
+            self.employees.append(employee)
+
+        self.url = reverse("content-list")
+        reset_response_cache_stats()
+
+    def test_hit_reads_nothing_from_the_database(self):
+        """Test a repeated list is served from the cache and counted as a hit"""
+        load_access_scope(self.manager)
+        first = self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        stats = response_cache_snapshot()["content-list"]
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (2, 1, 0.6667))
+
+    def test_entries_are_per_scope(self):
+        """Test employees never see each other's cached lists"""
+        counts = []
+        for employee in self.employees:
+            self.client.force_authenticate(user=employee)
+            counts.append(self.client.get(self.url).data["count"])
+        self.assertEqual(counts, [1, 2])
+
+        self.client.force_authenticate(user=self.manager)
+        self.assertEqual(self.client.get(self.url).data["count"], 3)
+
+    def test_query_params_are_part_of_the_key(self):
+        """Test different filters are cached separately"""
+        url = reverse("content-by-training")
+        for training, count in zip(self.trainings, [1, 2]):
+            self.assertEqual(len(self.client.get(url, {"training_id": training.id}).data), count)
+
+    def test_changes_invalidate_cached_lists(self):
+        """Test saves of content and of the trainings and users it shows are never hidden by the cache"""
+        url = reverse("content-by-training")
+        params = {"training_id": self.trainings[0].id}
+        self.client.get(url, params)
+
+        content = Content.objects.get(training=self.trainings[0])
+        content.title = "Updated"
+        content.save()
+        self.assertEqual(self.client.get(url, params).data[0]["title"], "Updated")
+
+        self.trainings[0].name = "Renamed"
+        self.trainings[0].save()
+        self.assertEqual(self.client.get(url, params).data[0]["training_name"], "Renamed")
+
+        self.manager.first_name = "Manny"
+        self.manager.save()
+        self.assertEqual(self.client.get(url, params).data[0]["created_by_name"], self.manager.get_full_name())
+
+        # The ingestion pipeline writes its progress without signals
+        update_progress(content.id, index_status=StageStatus.SUCCEEDED)
+        self.assertEqual(self.client.get(url, params).data[0]["index_status"], StageStatus.SUCCEEDED)
+
+        content.delete()
+        self.assertEqual(self.client.get(url, params).data, [])
+        self.assertEqual(response_cache_snapshot()["content-by_training"]["misses"], 6)
+
+    @override_settings(RESPONSE_CACHE_TTL=0)
+    def test_disabled(self):
+        """Test a TTL of 0 turns the cache off"""
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.assertEqual(response_cache_snapshot(), {})
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_disabled_without_a_shared_cache(self):
+        """Test a per-process cache, which other workers cannot invalidate, is not used for responses"""
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.assertEqual(response_cache_snapshot(), {})
@@ -0,0 +1,191 @@
+import numpy as np
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from content.jobs import process_next_job
+from content.models import Content, ContentChunk, IngestionJob
+from content.retrieval import HashingEmbedder, get_training_index, index_content, queue_unindexed_content, search_training
+from content.tests.base import ContentFixtureMixin
+from django.core.management import call_command
+from django.test import override_settings
+from io import StringIO
+from unittest.mock import patch, MagicMock
+
+
+@override_settings(INGESTION_SUMMARY_LENGTHS=[])
+class TestRetrieval(ContentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.fire = Content.objects.create(
+            title="Fire Safety",
+            training=self.training,
+            content_type="text",
+            text_content="Fire extinguishers are inspected monthly. Evacuate through the marked fire exits.",
+            created_by=self.user,
+        )
+        self.expenses = Content.objects.create(
+            title="Expenses",
+            training=self.training,
+            content_type="text",
+            text_content="Expense reports need receipts and are reimbursed with the next payroll.",
+            created_by=self.user,
+        )
+        self.url = reverse("content-chat")
+
+    def ingest(self):
+        queue_unindexed_content(self.training.id, HashingEmbedder.name)
+        while process_next_job():
+            pass
+
+    def test_hashing_embedder_is_deterministic_and_normalized(self):
+        """Test the local embedder returns stable unit vectors"""
+        embedder = HashingEmbedder()
+        first = embedder.embed(["fire exits", "payroll receipts"])
+        second = embedder.embed(["fire exits", "payroll receipts"])
+
+        np.testing.assert_array_equal(first, second)
+        np.testing.assert_allclose(np.linalg.norm(first, axis=1), [1.0, 1.0], rtol=1e-5)
+
+    def test_search_returns_most_relevant_content_first(self):
+        """Test top-k search ranks the matching content's chunk first"""
+        self.assertEqual(search_training(self.training.id, "where are the fire exits", k=1), [])
+        self.assertEqual(IngestionJob.objects.count(), 2)
+        self.ingest()
+
+        hits = search_training(self.training.id, "where are the fire exits", k=1)
+
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(hits[0][0].content_id, self.fire.id)
+        self.assertEqual(ContentChunk.objects.filter(training=self.training).count(), 2)
+
+    def test_index_reloads_when_chunks_change(self):
+        """Test editing content drops stale chunks and the cached index is rebuilt"""
+        search_training(self.training.id, "fire")
+        self.ingest()
+        name = HashingEmbedder.name
+        self.assertEqual(len(get_training_index(self.training.id, name).chunk_ids), 2)
+
+        self.expenses.is_active = False
+        self.expenses.save()
+        self.assertEqual(len(get_training_index(self.training.id, name).chunk_ids), 1)
+
+        self.fire.text_content = "Badges must be worn at all times."
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fire.save()
+        process_next_job()
+        self.assertEqual(
+            list(ContentChunk.objects.filter(content=self.fire).values_list("text", flat=True)),
+            ["Badges must be worn at all times."],
+        )
+
+        hits = search_training(self.training.id, "badges")
+        self.assertEqual(hits[0][0].text, "Badges must be worn at all times.")
+
+    @override_settings(RETRIEVAL_CHUNK_TOKENS=40)
+    def test_edit_only_reembeds_changed_chunks(self):
+        """Test the ingestion job after a save re-embeds changed chunks and deletes stale ones"""
+        paragraphs = [f"Section {i}. " + " ".join(f"word{i}x{j}" for j in range(30)) for i in range(12)]
+        self.fire.text_content = "\n\n".join(paragraphs)
+        self.fire.save()
+        self.assertEqual(index_content(self.fire).kept, 0)
+        before = dict(ContentChunk.objects.filter(content=self.fire).values_list("text_hash", "id"))
+
+        paragraphs[6] = "Section 6 was rewritten to cover the new assembly point."
+        self.fire.text_content = "\n\n".join(paragraphs)
+        with patch.object(HashingEmbedder, "embed", autospec=True, side_effect=HashingEmbedder.embed) as embed:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.fire.save()
+            # Left to the ingestion job rather than embedded twice
+            embed.assert_not_called()
+            process_next_job()
+
+        embedded = [text for call in embed.call_args_list for text in call[0][1]]
+        after = dict(ContentChunk.objects.filter(content=self.fire).values_list("text_hash", "id"))
+        self.assertTrue(any("assembly point" in text for text in embedded))
+        self.assertLess(len(embedded), len(after))
+        unchanged = set(before) & set(after)
+        self.assertTrue(unchanged)
+        self.assertTrue(all(before[h] == after[h] for h in unchanged))
+        self.assertFalse(ContentChunk.objects.filter(content=self.fire).exclude(text_hash__in=after).exists())
+
+    def test_reindex_command_batches_embedding_calls(self):
+        """Test the reconcile command indexes everything in shared embedding batches"""
+        with patch.object(HashingEmbedder, "embed", autospec=True, side_effect=HashingEmbedder.embed) as embed:
+            out = StringIO()
+            call_command("reindex_content", "--batch-size", "10", stdout=out)
+
+        self.assertEqual(embed.call_count, 1)
+        self.assertEqual(ContentChunk.objects.filter(training=self.training).count(), 2)
+        self.assertIn("embedded 2", out.getvalue())
+
+        out = StringIO()
+        call_command("reindex_content", stdout=out)
+        self.assertIn("Kept 2 chunks, embedded 0, deleted 0", out.getvalue())
+
+    @patch("content.views.get_llm_backend")
+    def test_chat_answers_from_retrieved_chunks(self, mock_gemini_service):
+        """Test the chat endpoint sends only retrieved chunks to Gemini"""
+        mock_service_instance = MagicMock()
+        mock_service_instance.answer_question.return_value = "Use the marked fire exits."
+        mock_gemini_service.return_value = mock_service_instance
+        self.ingest()
+
+        response = self.client.post(
+            self.url,
+            data={"training_id": self.training.id, "question": "How do I leave during a fire?", "top_k": 1},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["answer"], "Use the marked fire exits.")
+        self.assertEqual([source["content_id"] for source in response.data["sources"]], [self.fire.id])
+        question, passages = mock_service_instance.answer_question.call_args[0]
+        self.assertEqual(passages, [self.fire.text_content])
+
+    @patch("content.views.get_llm_backend")
+    def test_chat_does_not_embed_unindexed_content(self, mock_gemini_service):
+        """Test chat queues content that was never ingested and asks the client to retry"""
+        data = {"training_id": self.training.id, "question": "How do I leave during a fire?"}
+        with patch.object(HashingEmbedder, "embed", autospec=True, side_effect=HashingEmbedder.embed) as embed:
+            response = self.client.post(self.url, data=data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "5")
+        self.assertEqual(embed.call_count, 1)  # The question only
+        self.assertFalse(ContentChunk.objects.exists())
+        self.assertEqual(
+            set(IngestionJob.objects.values_list("content_id", flat=True)), {self.fire.id, self.expenses.id}
+        )
+
+        self.client.post(self.url, data=data, format="json")
+        self.assertEqual(IngestionJob.objects.count(), 2)
+
+        mock_gemini_service.return_value.answer_question.return_value = "Use the marked fire exits."
+        self.ingest()
+        response = self.client.post(self.url, data=data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_chat_unknown_training(self):
+        """Test chat about a training without visible content returns 404"""
+        response = self.client.post(
+            self.url, data={"training_id": self.training.id + 1, "question": "Anything?"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch("content.views.get_llm_backend")
+    def test_employee_may_chat_but_not_summarize(self, mock_gemini_service):
+        """Test an enrolled employee may POST to chat, while summarize stays with managers and trainers"""
+        mock_gemini_service.return_value.answer_question.return_value = "Use the marked fire exits."
+        employee = self.make_user("employee", "employee")
+        self.training.employees.add(employee)
+        self.ingest()
+        self.client.force_authenticate(user=employee)
+
+        response = self.client.post(
+            self.url, data={"training_id": self.training.id, "question": "How do I leave during a fire?"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.post(reverse("content-summarize", kwargs={"pk": self.fire.id}), format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
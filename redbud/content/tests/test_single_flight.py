@@ -0,0 +1,93 @@
+import threading
+import time
+from django.test import TestCase, override_settings
+from content.models import SummaryLock
+from content.single_flight import SingleFlight, acquire_lock, release_lock
+from django.utils import timezone
+from datetime import timedelta
+
+
+class TestSingleFlight(TestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        """Test callers with the same key wait for the in-flight call"""
+        flight = SingleFlight()
+        calls = []
+        results = []
+
+        def slow_summary():
+            calls.append(1)
+            time.sleep(0.2)
+            return "shared summary"
+
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do("key", slow_summary)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual({summary for summary, _ in results}, {"shared summary"})
+        self.assertEqual(sorted(shared for _, shared in results), [False] + [True] * 7)
+
+    def test_errors_are_shared_and_key_is_released(self):
+        """Test waiters see the leader's error and the next call runs again"""
+        flight = SingleFlight()
+        errors = []
+        started = threading.Event()
+
+        def failing():
+            started.set()
+            time.sleep(0.1)
+            raise RuntimeError("quota exceeded")
+
+        def call():
+            try:
+                flight.do("key", failing)
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        follower = threading.Thread(target=call)
+        follower.start()
+        leader.join()
+        follower.join()
+
+        self.assertEqual(errors, ["quota exceeded", "quota exceeded"])
+        self.assertEqual(flight.do("key", lambda: "retried"), ("retried", False))
+
+
+class TestSummaryLock(TestCase):
+    def test_lock_is_exclusive_until_released(self):
+        """Test only one holder can take the cross-process lock"""
+        token = acquire_lock("summary-key")
+        self.assertIsNotNone(token)
+        self.assertIsNone(acquire_lock("summary-key"))
+
+        release_lock("summary-key", token)
+        self.assertIsNotNone(acquire_lock("summary-key"))
+
+    @override_settings(SUMMARY_LOCK_TIMEOUT=60)
+    def test_expired_lock_can_be_taken_over(self):
+        """Test a lock left by a dead process expires"""
+        SummaryLock.objects.create(key="summary-key", expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertIsNotNone(acquire_lock("summary-key"))
+        self.assertGreater(SummaryLock.objects.get().expires_at, timezone.now() + timedelta(seconds=50))
+
+    def test_late_release_keeps_the_new_holders_lock(self):
+        """Test a holder whose lock expired and was taken over cannot release the new holder's lock"""
+        stale = acquire_lock("summary-key")
+        SummaryLock.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        current = acquire_lock("summary-key")
+        self.assertNotEqual(stale, current)
+
+        release_lock("summary-key", stale)
+        self.assertIsNone(acquire_lock("summary-key"))
+
+        release_lock("summary-key", current)
+        self.assertIsNotNone(acquire_lock("summary-key"))
@@ -36,7 +36,7 @@ class TestContentViewSet(APITestCase):
             created_by=self.user,
         )
 
-    @patch("content.views.get_gemini_service")
+    @patch("content.views.get_llm_backend")
     def test_summarize_text_content(self, mock_gemini_service):
         """Test summarizing text content"""
         # Mock the Gemini service
@@ -63,8 +63,9 @@ class TestContentViewSet(APITestCase):
             self.content.text_content, 100
         )
 
-    @patch("content.views.get_gemini_service")
-    def test_summarize_pdf_content(self, mock_gemini_service):
+    @patch("content.text_extraction.extract_pdf_pages", return_value=["Extracted PDF text."])
+    @patch("content.views.get_llm_backend")
+    def test_summarize_pdf_content(self, mock_gemini_service, mock_extract_pdf_pages):
         """Test summarizing PDF content"""
         # Create PDF content
         from django.core.files.uploadedfile import SimpleUploadedFile
@@ -81,7 +82,7 @@ class TestContentViewSet(APITestCase):
 
         # Mock the Gemini service
         mock_service_instance = MagicMock()
-        mock_service_instance.summarize_pdf.return_value = "This is a PDF summary."
+        mock_service_instance.summarize_text.return_value = "This is a PDF summary."
         mock_gemini_service.return_value = mock_service_instance
 
         url = reverse("content-summarize", kwargs={"pk": pdf_content.id})
@@ -90,8 +91,11 @@ class TestContentViewSet(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn("summary", response.data)
         self.assertEqual(response.data["summary"], "This is a PDF summary.")
+        mock_service_instance.summarize_text.assert_called_once_with(
+            "Extracted PDF text.", None
+        )
 
-    @patch("content.views.get_gemini_service")
+    @patch("content.views.get_llm_backend")
     def test_summarize_unsupported_content_type(self, mock_gemini_service):
         """Test summarizing unsupported content type (video, youtube, link)"""
         video_content = Content.objects.create(
@@ -108,7 +112,7 @@ class TestContentViewSet(APITestCase):
         self.assertIn("error", response.data)
         self.assertIn("only supported for text and PDF", response.data["error"])
 
-    @patch("content.views.get_gemini_service")
+    @patch("content.views.get_llm_backend")
     def test_summarize_with_invalid_max_length(self, mock_gemini_service):
         """Test summarize with invalid max_length"""
         url = reverse("content-summarize", kwargs={"pk": self.content.id})
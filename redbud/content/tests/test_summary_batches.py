@@ -0,0 +1,107 @@
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from content.jobs import process_next_job
+from content.models import Content, SummaryCache, SummaryJob
+from content.summaries import summarize_content
+from content.tests.base import ContentFixtureMixin
+from io import StringIO
+from unittest.mock import patch, MagicMock
+
+User = get_user_model()
+
+
+class TestSummaryBatches(ContentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.contents = [
+            Content.objects.create(
+                title=f"Content {i}",
+                training=self.training,
+                content_type="text",
+                text_content=f"Sample text content number {i} for testing.",
+                created_by=self.user,
+            )
+            for i in range(3)
+        ]
+        Content.objects.create(
+            title="Video",
+            training=self.training,
+            content_type="video",
+            url="https://example.com/video",
+            created_by=self.user,
+        )
+        self.url = reverse("training-summarize", kwargs={"pk": self.training.id})
+
+        self.mock_service_instance = MagicMock()
+        self.mock_service_instance.summarize_text.return_value = "This is a summary."
+        summarize_content(self.contents[0], 100, get_service=lambda: self.mock_service_instance)
+        self.mock_service_instance.reset_mock()
+
+    @patch("content.jobs.get_llm_backend")
+    def test_batch_skips_cached_content_and_reports_progress(self, mock_gemini_service):
+        """Test only uncached text content is queued and progress reaches 100%"""
+        mock_gemini_service.return_value = self.mock_service_instance
+
+        response = self.client.post(self.url, data={"max_length": 100}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["total"], 3)
+        self.assertEqual(response.data["cached"], 1)
+        self.assertEqual(response.data["progress"]["pending"], 2)
+        self.assertFalse(response.data["progress"]["done"])
+        self.assertEqual(
+            set(SummaryJob.objects.values_list("content_id", flat=True)),
+            {self.contents[1].id, self.contents[2].id},
+        )
+
+        while process_next_job():
+            pass
+
+        progress = self.client.get(self.url).data["progress"]
+        self.assertEqual(progress["succeeded"], 2)
+        self.assertEqual(progress["percent_complete"], 100)
+        self.assertTrue(progress["done"])
+        self.assertEqual(self.mock_service_instance.summarize_text.call_count, 2)
+
+    def test_progress_without_batch(self):
+        """Test polling a training that was never summarized returns 404"""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_batch_id(self):
+        """Test polling with a batch id that is not a number returns 400"""
+        response = self.client.get(self.url, {"batch": "abc"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_employee_cannot_start_batch(self):
+        """Test employees cannot summarize a whole training"""
+        employee = User.objects.create_user(
+            username="employee",
+            password="testpass",
+            email="employee@email.com",
+            role="employee",
+        )
+        self.training.employees.add(employee)
+        self.client.force_authenticate(user=employee)
+
+        response = self.client.post(self.url, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @patch("content.management.commands.summarize_training.get_llm_backend")
+    def test_command_summarizes_uncached_content(self, mock_gemini_service):
+        """Test the management command generates missing summaries and reports progress"""
+        mock_gemini_service.return_value = self.mock_service_instance
+        out = StringIO()
+
+        call_command("summarize_training", str(self.training.id), "--max-length", "100", "--workers", "1", stdout=out)
+
+        self.assertEqual(self.mock_service_instance.summarize_text.call_count, 2)
+        self.assertEqual(SummaryCache.objects.filter(max_length=100).count(), 3)
+        self.assertIn("[2/2]", out.getvalue())
+        self.assertIn("2 generated, 1 cached, 0 failed of 3", out.getvalue())
@@ -0,0 +1,89 @@
+from django.urls import reverse
+from django.utils import timezone
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from content.models import SummaryCache
+from content.tests.base import ContentFixtureMixin
+from unittest.mock import patch, MagicMock
+from datetime import timedelta
+
+
+class TestSummaryCache(ContentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = self.make_content()
+        self.url = reverse("content-summarize", kwargs={"pk": self.content.id})
+
+    def mock_service(self, mock_gemini_service):
+        mock_service_instance = MagicMock()
+        mock_service_instance.summarize_text.return_value = "This is a summary."
+        mock_gemini_service.return_value = mock_service_instance
+        return mock_service_instance
+
+    @patch("content.views.get_llm_backend")
+    def test_repeat_summary_is_served_from_cache(self, mock_gemini_service):
+        """Test second identical request does not call Gemini"""
+        service = self.mock_service(mock_gemini_service)
+
+        first = self.client.post(self.url, data={"max_length": 100}, format="json")
+        second = self.client.post(self.url, data={"max_length": 100}, format="json")
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertFalse(first.data["cached"])
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertTrue(second.data["cached"])
+        self.assertEqual(second.data["summary"], "This is a summary.")
+        service.summarize_text.assert_called_once()
+        self.assertEqual(SummaryCache.objects.get().hit_count, 1)
+
+    @patch("content.views.get_llm_backend")
+    def test_max_length_is_part_of_cache_key(self, mock_gemini_service):
+        """Test different max_length values are cached separately"""
+        service = self.mock_service(mock_gemini_service)
+
+        self.client.post(self.url, data={"max_length": 100}, format="json")
+        self.client.post(self.url, data={"max_length": 200}, format="json")
+
+        self.assertEqual(service.summarize_text.call_count, 2)
+        self.assertEqual(SummaryCache.objects.count(), 2)
+
+    @patch("content.views.get_llm_backend")
+    def test_editing_text_invalidates_cache(self, mock_gemini_service):
+        """Test changing text_content drops cached summaries"""
+        service = self.mock_service(mock_gemini_service)
+        self.client.post(self.url, format="json")
+
+        self.content.text_content = "Completely different text."
+        self.content.save()
+        self.assertFalse(SummaryCache.objects.exists())
+
+        response = self.client.post(self.url, format="json")
+        self.assertFalse(response.data["cached"])
+        self.assertEqual(service.summarize_text.call_count, 2)
+
+    @patch("content.views.get_llm_backend")
+    def test_expired_entry_is_regenerated(self, mock_gemini_service):
+        """Test entries older than SUMMARY_CACHE_TTL are ignored"""
+        service = self.mock_service(mock_gemini_service)
+        self.client.post(self.url, format="json")
+        SummaryCache.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+        with override_settings(SUMMARY_CACHE_TTL=60 * 60 * 24):
+            response = self.client.post(self.url, format="json")
+
+        self.assertFalse(response.data["cached"])
+        self.assertEqual(service.summarize_text.call_count, 2)
+
+    @patch("content.views.get_llm_backend")
+    def test_least_recently_used_entries_are_evicted(self, mock_gemini_service):
+        """Test cache keeps at most SUMMARY_CACHE_MAX_ENTRIES rows"""
+        self.mock_service(mock_gemini_service)
+
+        with override_settings(SUMMARY_CACHE_MAX_ENTRIES=2):
+            for max_length in (100, 200, 300):
+                self.client.post(self.url, data={"max_length": max_length}, format="json")
+
+        self.assertEqual(
+            sorted(SummaryCache.objects.values_list("max_length", flat=True)), [200, 300]
+        )
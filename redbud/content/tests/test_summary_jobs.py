@@ -0,0 +1,109 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from content.jobs import process_next_job, requeue_stale_jobs
+from content.models import IngestionJob, JobStatus, SummaryJob
+from content.tests.base import ContentFixtureMixin
+from unittest.mock import patch, MagicMock
+from datetime import timedelta
+
+User = get_user_model()
+
+
+class TestSummaryJobs(ContentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = self.make_content()
+        self.url = reverse("content-summarize", kwargs={"pk": self.content.id})
+
+    @patch("content.jobs.get_llm_backend")
+    def test_async_summarize_returns_job_and_worker_completes_it(self, mock_gemini_service):
+        """Test async mode returns 202 and the job result can be polled"""
+        mock_service_instance = MagicMock()
+        mock_service_instance.summarize_text.return_value = "This is a summary."
+        mock_gemini_service.return_value = mock_service_instance
+
+        response = self.client.post(self.url + "?async=true", data={"max_length": 100}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], JobStatus.PENDING)
+        self.assertIn(response.data["status_url"], response["Location"])
+        mock_service_instance.summarize_text.assert_not_called()
+
+        self.assertTrue(process_next_job())
+        self.assertFalse(process_next_job())
+
+        job_url = reverse("summary-job-detail", kwargs={"pk": response.data["id"]})
+        job = self.client.get(job_url)
+        self.assertEqual(job.status_code, status.HTTP_200_OK)
+        self.assertEqual(job.data["status"], JobStatus.SUCCEEDED)
+        self.assertEqual(job.data["summary"], "This is a summary.")
+        self.assertEqual(job.data["attempts"], 1)
+
+    @override_settings(SUMMARY_JOB_MAX_ATTEMPTS=2)
+    @patch("content.jobs.get_llm_backend")
+    def test_failed_job_is_retried_with_backoff(self, mock_gemini_service):
+        """Test upstream errors are retried later and fail after max attempts"""
+        mock_service_instance = MagicMock()
+        mock_service_instance.summarize_text.side_effect = Exception("upstream unavailable")
+        mock_gemini_service.return_value = mock_service_instance
+        self.client.post(self.url, data={"async": True}, format="json")
+
+        self.assertTrue(process_next_job())
+        job = SummaryJob.objects.get()
+        self.assertEqual(job.status, JobStatus.PENDING)
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertFalse(process_next_job())
+
+        SummaryJob.objects.update(run_after=timezone.now())
+        self.assertTrue(process_next_job())
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertIn("upstream unavailable", job.error)
+
+    @override_settings(SUMMARY_JOB_MAX_ATTEMPTS=2, SUMMARY_JOB_TIMEOUT=60)
+    def test_stale_jobs_are_requeued_until_max_attempts(self):
+        """Test jobs of a crashed worker run again, but not once they used up their attempts"""
+        started_at = timezone.now() - timedelta(minutes=5)
+        retried, exhausted, current = [
+            SummaryJob.objects.create(
+                content=self.content, status=JobStatus.RUNNING, started_at=started_at, attempts=attempts
+            )
+            for attempts in [1, 2, 1]
+        ]
+        SummaryJob.objects.filter(pk=current.pk).update(started_at=timezone.now())
+        ingestion = IngestionJob.objects.create(
+            content=self.content, status=JobStatus.RUNNING, started_at=started_at, attempts=2
+        )
+
+        self.assertEqual(requeue_stale_jobs(), 3)
+
+        statuses = {job.pk: job.status for job in SummaryJob.objects.all()}
+        self.assertEqual(
+            [statuses[retried.pk], statuses[exhausted.pk], statuses[current.pk]],
+            [JobStatus.PENDING, JobStatus.FAILED, JobStatus.RUNNING],
+        )
+        ingestion.refresh_from_db()
+        self.content.refresh_from_db()
+        self.assertEqual(ingestion.status, JobStatus.FAILED)
+        self.assertEqual(self.content.ingestion_error, ingestion.error)
+
+    def test_jobs_are_only_visible_to_requester(self):
+        """Test employees cannot poll other users' jobs"""
+        self.client.post(self.url, data={"async": True}, format="json")
+        job = SummaryJob.objects.get()
+
+        other = User.objects.create_user(
+            username="employee",
+            password="testpass",
+            email="employee@email.com",
+            role="employee",
+        )
+        self.client.force_authenticate(user=other)
+        response = self.client.get(reverse("summary-job-detail", kwargs={"pk": job.id}))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,66 @@
+import json
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from content.models import SummaryCache
+from content.tests.base import ContentFixtureMixin
+from unittest.mock import patch, MagicMock
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+class TestSummaryStream(ContentFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = self.make_content()
+        self.url = reverse("content-summarize-stream", kwargs={"pk": self.content.id})
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    async def read_stream(self, url):
+        response = await self.async_client.get(url, headers=self.headers)
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        return response, parse_events(body.decode())
+
+    @patch("content.async_views.get_llm_backend")
+    async def test_summary_is_streamed_and_cached(self, mock_gemini_service):
+        """Test fragments arrive as SSE chunks and the result is cached"""
+        async def fake_stream(text, max_length):
+            for part in ["This is ", "a streamed ", "summary."]:
+                yield part
+
+        mock_service_instance = MagicMock()
+        mock_service_instance.astream_summary = fake_stream
+        mock_gemini_service.return_value = mock_service_instance
+
+        response, events = await self.read_stream(self.url + "?max_length=100")
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual([event for event, _ in events], ["chunk", "chunk", "chunk", "done"])
+        self.assertEqual(events[-1][1]["summary"], "This is a streamed summary.")
+        self.assertFalse(events[-1][1]["cached"])
+
+        entry = await SummaryCache.objects.aget(content=self.content)
+        self.assertEqual(entry.summary, "This is a streamed summary.")
+        self.assertEqual(entry.max_length, 100)
+
+        response, events = await self.read_stream(self.url + "?max_length=100")
+        self.assertEqual(events[-1][1]["summary"], "This is a streamed summary.")
+        self.assertTrue(events[-1][1]["cached"])
+
+    async def test_requires_authentication(self):
+        """Test requests without a valid JWT are rejected"""
+        response = await self.async_client.get(self.url)
+
+        self.assertEqual(response.status_code, 401)
+
+    async def test_invalid_max_length(self):
+        """Test max_length is validated before streaming starts"""
+        response = await self.async_client.get(self.url + "?max_length=10", headers=self.headers)
+
+        self.assertEqual(response.status_code, 400)
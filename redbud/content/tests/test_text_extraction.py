@@ -0,0 +1,96 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from benchmarks.fixtures import make_text_pdf
+from content.models import Content, ExtractedText
+from content import text_extraction
+from content.text_extraction import extract_pdf_pages, get_content_text, get_extracted_text
+from content.tests.base import ContentFixtureMixin
+from unittest.mock import patch
+
+
+class TestExtractedTextStore(ContentFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = Content.objects.create(
+            title="Test PDF",
+            training=self.training,
+            content_type="pdf",
+            file=SimpleUploadedFile("manual.pdf", b"pdf bytes", content_type="application/pdf"),
+            created_by=self.user,
+        )
+
+    def tearDown(self):
+        self.content.file.delete(save=False)
+
+    @patch("content.text_extraction.extract_pdf_pages", return_value=["Page one", "Page two"])
+    def test_pdf_is_extracted_once(self, mock_extract):
+        """Test extracted text is stored and reused on later reads"""
+        self.assertEqual(get_content_text(self.content), "Page one\nPage two")
+        self.assertEqual(get_content_text(self.content), "Page one\nPage two")
+
+        mock_extract.assert_called_once()
+        extracted = ExtractedText.objects.get(content=self.content)
+        self.assertEqual(extracted.page_count, 2)
+        self.assertEqual(len(extracted.checksum), 64)
+
+    @patch("content.text_extraction.extract_pdf_pages", return_value=["Old text"])
+    def test_replaced_file_is_re_extracted(self, mock_extract):
+        """Test a different file invalidates the stored text"""
+        get_extracted_text(self.content)
+
+        self.content.file.delete(save=False)
+        self.content.file = SimpleUploadedFile("manual-v2.pdf", b"new pdf bytes")
+        self.content.save()
+        mock_extract.return_value = ["New text"]
+
+        self.assertEqual(get_content_text(self.content), "New text")
+        self.assertEqual(mock_extract.call_count, 2)
+
+    @patch("content.text_extraction.extract_pdf_pages", return_value=["Same text"])
+    def test_identical_reupload_reuses_text(self, mock_extract):
+        """Test re-uploading identical bytes matches on checksum"""
+        get_extracted_text(self.content)
+
+        self.content.file.delete(save=False)
+        self.content.file = SimpleUploadedFile("manual-copy.pdf", b"pdf bytes")
+        self.content.save()
+
+        self.assertEqual(get_content_text(self.content), "Same text")
+        mock_extract.assert_called_once()
+
+
+class TestPdfPageExtraction(ContentFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = Content.objects.create(
+            title="Test PDF",
+            training=self.training,
+            content_type="pdf",
+            file=SimpleUploadedFile("manual.pdf", make_text_pdf(6, lines_per_page=2)),
+            created_by=self.user,
+        )
+
+    def tearDown(self):
+        self.content.file.delete(save=False)
+
+    @override_settings(PDF_EXTRACTION_PARALLEL_MIN_PAGES=1)
+    def test_process_pool_matches_sequential(self):
+        """Test parallel extraction returns the same pages in order"""
+        path = self.content.file.path
+        sequential = extract_pdf_pages(path, workers=1)
+
+        self.assertEqual(len(sequential), 6)
+        self.assertIn("Page 4 line 2", sequential[3])
+        self.assertEqual(extract_pdf_pages(path, workers=2), sequential)
+        pool = text_extraction._pools[2]
+        self.assertEqual(extract_pdf_pages(path, start=2, stop=4, workers=2), sequential[2:4])
+        self.assertIs(text_extraction._pools[2], pool)  # Reused rather than started per document
+
+    def test_stored_page_offsets(self):
+        """Test page ranges can be read back from the store"""
+        pages = extract_pdf_pages(self.content.file.path)
+        extracted = get_extracted_text(self.content)
+
+        self.assertEqual(extracted.page_count, 6)
+        self.assertEqual(extracted.get_pages(), pages)
+        self.assertEqual(extracted.get_pages(1, 3), pages[1:3])
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+"""
+Extracted text store for content files.
+
+PDF text is extracted once per file and kept in ExtractedText, keyed by the
+file checksum. Summaries, search and Q&A read from this store through
+get_content_text() instead of parsing the PDF on every request.
+"""
+
+import atexit
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+
+from content.models import Content, ExtractedText
+
+
+def file_checksum(field_file) -> str:
+    """Return the SHA-256 checksum of a stored file."""
+    digest = hashlib.sha256()
+    field_file.open('rb')
+    try:
+        for chunk in field_file.chunks():
+            digest.update(chunk)
+    finally:
+        field_file.close()
+    return digest.hexdigest()
+
+
+def _page_ranges(pages: range, workers: int) -> List[range]:
+    """Split pages into contiguous ranges, a few per worker to even out slow pages."""
+    size = max(1, -(-len(pages) // (workers * 4)))
+    return [pages[i:i + size] for i in range(0, len(pages), size)]
+
+
+def _extract_page_range(pdf_path: str, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) in a worker process."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(pdf_path)
+    return [reader.pages[i].extract_text() or '' for i in range(start, stop)]
+
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the shared extraction pool with this many workers, starting it on first use."""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return pool
+
+
+def _discard_pool(workers: int, pool: ProcessPoolExecutor) -> None:
+    with _pools_lock:
+        if _pools.get(workers) is pool:
+            del _pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def shutdown_pools() -> None:
+    """Stop the extraction worker processes."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def iter_pdf_pages(pdf_path: str, start: int = 0, stop: Optional[int] = None,
+                   workers: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield the text of each PDF page in order.
+
+    Documents with at least PDF_EXTRACTION_PARALLEL_MIN_PAGES selected pages
+    are split into page ranges extracted by a process pool; results are still
+    yielded in page order as soon as each range is ready. The pool is started
+    on first use and kept for later documents, so its worker processes are
+    not forked again for every extraction.
+
+    Args:
+        pdf_path: Path to the PDF file
+        start: First page to extract (0-based)
+        stop: Page to stop before, defaults to the last page
+        workers: Process count, defaults to PDF_EXTRACTION_WORKERS
+
+    Raises:
+        Exception: If PDF extraction fails
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise Exception("pypdf library not installed. Install with: pip install pypdf")
+
+    try:
+        reader = PdfReader(pdf_path)
+        pages = range(len(reader.pages))[start:stop]
+        workers = workers or settings.PDF_EXTRACTION_WORKERS
+
+        if workers <= 1 or len(pages) < settings.PDF_EXTRACTION_PARALLEL_MIN_PAGES:
+            for i in pages:
+                yield reader.pages[i].extract_text() or ''
+            return
+
+        pool = _get_pool(workers)
+        futures = []
+        try:
+            for chunk in _page_ranges(pages, workers):
+                futures.append(pool.submit(_extract_page_range, pdf_path, chunk.start, chunk.stop))
+            for future in futures:
+                yield from future.result()
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next document
+            _discard_pool(workers, pool)
+            raise
+        finally:
+            # Ranges not read yet, when the caller stopped early or a range failed
+            for future in futures:
+                future.cancel()
+
+    except Exception as e:
+        raise Exception(f"Failed to extract text from PDF: {str(e)}")
+
+
+def extract_pdf_pages(pdf_path: str, start: int = 0, stop: Optional[int] = None,
+                      workers: Optional[int] = None) -> List[str]:
+    """Return the text of each page in [start, stop), see iter_pdf_pages()."""
+    return list(iter_pdf_pages(pdf_path, start, stop, workers))
+
+
+def join_pages(pages: List[str]) -> Tuple[str, List[int]]:
+    """
+    Join page texts in a single pass.
+
+    Returns:
+        Tuple of (full text, start offset of each page within the text)
+    """
+    offsets = []
+    position = 0
+    for page in pages:
+        offsets.append(position)
+        position += len(page) + 1
+
+    return "\n".join(pages), offsets
+
+
+def get_extracted_text(content: Content) -> ExtractedText:
+    """
+    Return the stored extracted text for a file-backed content, filling it on first use.
+
+    The stored row is reused while the file name is unchanged, and after a
+    re-upload as long as the file checksum still matches.
+    """
+    extracted = ExtractedText.objects.filter(content=content).first()
+    if extracted is not None and extracted.file_name == content.file.name:
+        return extracted
+
+    checksum = file_checksum(content.file)
+    if extracted is not None and extracted.checksum == checksum:
+        extracted.file_name = content.file.name
+        extracted.save(update_fields=['file_name'])
+        return extracted
+
+    pages = extract_pdf_pages(content.file.path)
+    text, page_offsets = join_pages(pages)
+    extracted, _ = ExtractedText.objects.update_or_create(
+        content=content,
+        defaults={
+            'file_name': content.file.name,
+            'checksum': checksum,
+            'text': text,
+            'page_count': len(pages),
+            'page_offsets': page_offsets,
+        },
+    )
+    return extracted
+
+
+def get_content_text(content: Content) -> str:
+    """Return the plain text of text or PDF content."""
+    if content.content_type == 'text':
+        return content.text_content or ''
+    return get_extracted_text(content).text
@@ -2,11 +2,16 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ContentViewSet
+from .views import BackendMetricsView, ContentViewSet, SummaryJobViewSet
+from .async_views import summarize, summarize_stream
 
 router = DefaultRouter()
 router.register(r'contents', ContentViewSet, basename='content')
+router.register(r'summaries/jobs', SummaryJobViewSet, basename='summary-job')
 
 urlpatterns = [
+    path('contents/<int:pk>/summarize/asgi/', summarize, name='content-summarize-asgi'),
+    path('contents/<int:pk>/summarize/stream/', summarize_stream, name='content-summarize-stream'),
+    path('metrics/', BackendMetricsView.as_view(), name='backend-metrics'),
     path('', include(router.urls)),
 ]
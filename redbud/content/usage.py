@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+"""
+Attribution of Gemini usage to users and trainings.
+
+Views and workers wrap their work in usage_scope(); the LLM backend records
+every call against the scope active at that point. The scope lives in a
+context variable, so it follows the request through sync_to_async and
+coroutines without being passed down the call chain.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from content.models import GeminiUsage
+
+_usage_scope: ContextVar[Tuple[Optional[int], Optional[int]]] = ContextVar(
+    'gemini_usage_scope', default=(None, None)
+)
+
+
+@contextmanager
+def usage_scope(user_id: Optional[int] = None, training_id: Optional[int] = None):
+    """Attribute Gemini calls made inside the block to a user and training."""
+    token = _usage_scope.set((user_id, training_id))
+    try:
+        yield
+    finally:
+        _usage_scope.reset(token)
+
+
+def record_usage(input_tokens: int, output_tokens: int) -> None:
+    """Add one call and its tokens to today's counters for the current scope."""
+    user_id, training_id = _usage_scope.get()
+    today = timezone.localdate()
+
+    rows = GeminiUsage.objects.filter(date=today, user_id=user_id, training_id=training_id)
+    increments = {
+        'requests': F('requests') + 1,
+        'input_tokens': F('input_tokens') + input_tokens,
+        'output_tokens': F('output_tokens') + output_tokens,
+    }
+    if rows.update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            GeminiUsage.objects.create(
+                date=today,
+                user_id=user_id,
+                training_id=training_id,
+                requests=1,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+            )
+    except IntegrityError:
+        # Another process created today's row since the update
+        rows.update(**increments)
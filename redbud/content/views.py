@@ -1,17 +1,81 @@
-from rest_framework import viewsets, status
+import math
+from typing import Optional
+
+from django.conf import settings
+from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.exceptions import PermissionDenied  # ✅ Add this
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
-from content.models import Content
-from content.serializers import ContentSerializer, ContentListSerializer, ContentSummarySerializer
+from content.models import Content, SummaryJob
+from content.serializers import (
+    ContentSerializer,
+    ContentListSerializer,
+    ContentSummarySerializer,
+    ContentChatSerializer,
+    ContentChatResponseSerializer,
+    SummaryJobSerializer,
+)
 from content.permissions import IsManagerOrTrainerForContent
-from users.models import Training
-from content.gemini_service import get_gemini_service
+from users.access import get_access_scope
+from users.conditional import ConditionalGetMixin
+from users.models import Training, User
+from users.response_cache import ResponseCacheMixin, response_cache_snapshot
+from users.permissions import IsManager
+from users.sync import DeltaSyncMixin
+from content.llm import get_llm_backend
+from content.summaries import get_last_summary, parse_max_length, summarize_content
+from content.downloads import serve_file
+from content.jobs import enqueue_summary_job
+from content.retrieval import IndexingInProgress, answer_question
+from content.rate_limit import RateLimitExceeded
+from content.resilience import UpstreamError, UpstreamUnavailable, breaker_snapshots, get_breaker
+from content.usage import usage_scope
+
+
+def rate_limited_response(error: RateLimitExceeded) -> Response:
+    """429 response telling the client when the Gemini budget frees up."""
+    return Response(
+        {'error': str(error), 'retry_after': math.ceil(error.retry_after)},
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={'Retry-After': str(math.ceil(error.retry_after))}
+    )
+
+
+def upstream_error_response(error: UpstreamError, message: str) -> Response:
+    """503 with Retry-After while the circuit breaker is open, else 502."""
+    if isinstance(error, UpstreamUnavailable):
+        return Response(
+            {'error': str(error), 'retry_after': math.ceil(error.retry_after)},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={'Retry-After': str(math.ceil(error.retry_after))}
+        )
+    return Response(
+        {'error': f'{message}: {str(error)}'},
+        status=status.HTTP_502_BAD_GATEWAY
+    )
+
+
+def stale_summary_response(content: Content) -> Optional[Response]:
+    """Serve the last cached summary of the content while Gemini is failing, if there is one."""
+    summary = get_last_summary(content)
+    if summary is None:
+        return None
+
+    get_breaker(settings.LLM_BACKEND).count('stale_served')
+    return Response({
+        'summary': summary,
+        'content_id': content.id,
+        'content_type': content.content_type,
+        'cached': True,
+        'stale': True,
+    }, status=status.HTTP_200_OK)
 
 
 @extend_schema_view(
@@ -40,14 +104,18 @@ from content.gemini_service import get_gemini_service
         description="Delete training content (Manager or assigned Trainer).",
         tags=['Content']
     ),
+    changes=extend_schema(tags=['Content']),
 )
-class ContentViewSet(viewsets.ModelViewSet):
+class ContentViewSet(ResponseCacheMixin, ConditionalGetMixin, DeltaSyncMixin, viewsets.ModelViewSet):
     """ViewSet for Content management with file upload support."""
 
     queryset = Content.objects.all()
     serializer_class = ContentSerializer
     permission_classes = [IsAuthenticated, IsManagerOrTrainerForContent]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    # Both serializers show the training name and the creator's name
+    validator_timestamps = ['updated_at', 'training__updated_at', 'created_by__updated_at']
+    response_cache_models = [Content, Training, User]
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -55,16 +123,19 @@ class ContentViewSet(viewsets.ModelViewSet):
         return ContentSerializer
 
     def get_queryset(self):
-        user = self.request.user
+        # Both serializers show the training name and creator's name of every row
+        scope = get_access_scope(self.request)
+        return Content.objects.in_scope(scope).select_related('training', 'created_by')
 
-        if user.role == 'manager':
-            return Content.objects.all()
-        elif user.role == 'trainer':
-            training_ids = Training.objects.filter(assigned_trainer=user).values_list('id', flat=True)
-            return Content.objects.filter(training_id__in=training_ids)
-        else:  # trainee or other roles
-            training_ids = user.trainings.values_list('id', flat=True)
-            return Content.objects.filter(training_id__in=training_ids, is_active=True)
+    def get_removed_ids(self, since, scope):
+        removed = super().get_removed_ids(since, scope)
+        if scope.sees_everything or scope.role == 'trainer':
+            return removed
+        # Deactivated content disappears from the lists of everyone else
+        hidden = Content.objects.filter(
+            training_id__in=scope.training_filter(), is_active=False, updated_at__gt=since
+        ).values_list('id', flat=True)
+        return removed + list(hidden)
 
     def perform_create(self, serializer):
         training = serializer.validated_data.get('training')
@@ -96,8 +167,9 @@ class ContentViewSet(viewsets.ModelViewSet):
         training_id = request.query_params.get('training_id', None)
         if training_id:
             contents = self.get_queryset().filter(training_id=training_id)
-            serializer = self.get_serializer(contents, many=True)
-            return Response(serializer.data)
+            return self.cached_response(lambda: self.list_conditionally(
+                contents, lambda: Response(self.get_serializer(contents, many=True).data)
+            ))
         return Response(
             {'error': 'training_id parameter is required'},
             status=status.HTTP_400_BAD_REQUEST
@@ -125,8 +197,9 @@ class ContentViewSet(viewsets.ModelViewSet):
         content_type = request.query_params.get('content_type', None)
         if content_type:
             contents = self.get_queryset().filter(content_type=content_type)
-            serializer = self.get_serializer(contents, many=True)
-            return Response(serializer.data)
+            return self.cached_response(lambda: self.list_conditionally(
+                contents, lambda: Response(self.get_serializer(contents, many=True).data)
+            ))
         return Response(
             {'error': 'content_type parameter is required'},
             status=status.HTTP_400_BAD_REQUEST
@@ -147,14 +220,64 @@ class ContentViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(content)
         return Response(serializer.data)
 
+    @extend_schema(
+        summary="Download content file",
+        description="Download the PDF or video of the content, for users who can see it. Single byte ranges are served with 206 Partial Content, so videos can be seeked. In production the bytes are sent by the front proxy (X-Accel-Redirect or X-Sendfile).",
+        parameters=[
+            OpenApiParameter(
+                name='Range',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.HEADER,
+                description='Byte range, e.g. bytes=0-1048575',
+                required=False
+            )
+        ],
+        responses={
+            (200, 'application/octet-stream'): OpenApiTypes.BINARY,
+            (206, 'application/octet-stream'): OpenApiTypes.BINARY,
+            404: OpenApiTypes.OBJECT,
+            416: OpenApiTypes.NONE
+        },
+        tags=['Content']
+    )
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Serve the content's file"""
+        content = self.get_object()
+        if not content.file:
+            return Response(
+                {'error': 'This content has no file'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        try:
+            return serve_file(request, content.file)
+        except FileNotFoundError:
+            return Response(
+                {'error': 'The file of this content is missing'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
     @extend_schema(
         summary="Summarize content",
-        description="Generate AI-powered summary of text or PDF content using Gemini API. Available to all authenticated users.",
+        description="Generate AI-powered summary of text or PDF content using Gemini API. Repeat requests for unchanged content are served from the summary cache. If Gemini is failing or its circuit breaker is open, the last cached summary of the content is returned with stale=true. Pass async=true to queue the summary as a background job and poll its status URL instead. Available to all authenticated users.",
         request=ContentSummarySerializer,
+        parameters=[
+            OpenApiParameter(
+                name='async',
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                description='Queue a background job and return 202 with the job',
+                required=False
+            )
+        ],
         responses={
             200: ContentSummarySerializer,
+            202: SummaryJobSerializer,
             400: OpenApiTypes.OBJECT,
-            500: OpenApiTypes.OBJECT
+            429: OpenApiTypes.OBJECT,
+            500: OpenApiTypes.OBJECT,
+            502: OpenApiTypes.OBJECT,
+            503: OpenApiTypes.OBJECT
         },
         tags=['Content'],
         methods=['POST']
@@ -172,45 +295,45 @@ class ContentViewSet(viewsets.ModelViewSet):
             )
 
         # Get optional max_length parameter
-        max_length = request.data.get('max_length', None)
-        if max_length:
-            try:
-                max_length = int(max_length)
-                if max_length < 50 or max_length > 1000:
-                    return Response(
-                        {'error': 'max_length must be between 50 and 1000'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            except ValueError:
-                return Response(
-                    {'error': 'max_length must be a valid integer'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        try:
+            max_length = parse_max_length(request.data.get('max_length', None))
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if content.content_type == 'text' and not content.text_content:
+            return Response(
+                {'error': 'No text content available to summarize'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if content.content_type == 'pdf' and not content.file:
+            return Response(
+                {'error': 'No PDF file available to summarize'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        run_async = request.data.get('async', request.query_params.get('async', ''))
+        if str(run_async).lower() in ['1', 'true', 'yes']:
+            job = enqueue_summary_job(content, max_length, request.user)
+            serializer = SummaryJobSerializer(job, context={'request': request})
+            return Response(
+                serializer.data,
+                status=status.HTTP_202_ACCEPTED,
+                headers={'Location': reverse('summary-job-detail', args=[job.id], request=request)}
+            )
 
         try:
-            gemini_service = get_gemini_service()
-
-            if content.content_type == 'text':
-                if not content.text_content:
-                    return Response(
-                        {'error': 'No text content available to summarize'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                summary = gemini_service.summarize_text(content.text_content, max_length)
-
-            elif content.content_type == 'pdf':
-                if not content.file:
-                    return Response(
-                        {'error': 'No PDF file available to summarize'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                pdf_path = content.file.path
-                summary = gemini_service.summarize_pdf(pdf_path, max_length)
+            # Served from the summary cache when the content is unchanged
+            with usage_scope(request.user.id, content.training_id):
+                summary, cached = summarize_content(content, max_length, get_service=get_llm_backend)
 
             response_data = {
                 'summary': summary,
                 'content_id': content.id,
                 'content_type': content.content_type,
+                'cached': cached,
             }
 
             if max_length:
@@ -218,6 +341,10 @@ class ContentViewSet(viewsets.ModelViewSet):
 
             return Response(response_data, status=status.HTTP_200_OK)
 
+        except RateLimitExceeded as e:
+            return rate_limited_response(e)
+        except UpstreamError as e:
+            return stale_summary_response(content) or upstream_error_response(e, 'Failed to generate summary')
         except ValueError as e:
             return Response(
                 {'error': str(e)},
@@ -228,3 +355,113 @@ class ContentViewSet(viewsets.ModelViewSet):
                 {'error': f'Failed to generate summary: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+    @extend_schema(
+        summary="Chat with training content",
+        description="Answer a question about a training with retrieval-augmented generation. Only the most relevant chunks of the training's text and PDF content are sent to Gemini. Available to all users who can see the training's content.",
+        request=ContentChatSerializer,
+        responses={
+            200: ContentChatResponseSerializer,
+            400: OpenApiTypes.OBJECT,
+            404: OpenApiTypes.OBJECT,
+            429: OpenApiTypes.OBJECT,
+            500: OpenApiTypes.OBJECT,
+            502: OpenApiTypes.OBJECT,
+            503: OpenApiTypes.OBJECT
+        },
+        tags=['Content']
+    )
+    @action(detail=False, methods=['post'])
+    def chat(self, request):
+        """Answer a question from the most relevant training content"""
+        serializer = ContentChatSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        training_id = serializer.validated_data['training_id']
+
+        if not self.get_queryset().filter(training_id=training_id).exists():
+            return Response(
+                {'error': 'Training not found or has no content available to you'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        try:
+            with usage_scope(request.user.id, training_id):
+                answer, hits = answer_question(
+                    training_id,
+                    serializer.validated_data['question'],
+                    serializer.validated_data.get('top_k'),
+                    get_service=get_llm_backend,
+                )
+        except IndexingInProgress as e:
+            return Response(
+                {'error': str(e), 'retry_after': e.retry_after},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(e.retry_after)}
+            )
+        except RateLimitExceeded as e:
+            return rate_limited_response(e)
+        except UpstreamError as e:
+            return upstream_error_response(e, 'Failed to answer question')
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except Exception as e:
+            return Response(
+                {'error': f'Failed to answer question: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        return Response({
+            'answer': answer,
+            'training_id': training_id,
+            'sources': [
+                {
+                    'content_id': chunk.content_id,
+                    'content_title': chunk.content.title,
+                    'position': chunk.position,
+                    'text': chunk.text,
+                    'score': round(score, 4),
+                }
+                for chunk, score in hits
+            ],
+        })
+
+
+@extend_schema_view(
+    retrieve=extend_schema(
+        summary="Get summary job status",
+        description="Poll the status of an asynchronous summarization job. The summary is included once the job has succeeded.",
+        tags=['Content']
+    ),
+)
+class SummaryJobViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """ViewSet for polling asynchronous summarization jobs."""
+
+    queryset = SummaryJob.objects.all()
+    serializer_class = SummaryJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        user = self.request.user
+
+        if user.role == 'manager':
+            return SummaryJob.objects.all()
+        return SummaryJob.objects.filter(requested_by=user)
+
+
+class BackendMetricsView(APIView):
+    """Circuit breaker state and call counters of the LLM backends, and response cache counters."""
+
+    permission_classes = [IsAuthenticated, IsManager]
+
+    @extend_schema(
+        summary="LLM backend metrics",
+        description="Circuit breaker state and counts of calls, failures, retries, timeouts, short-circuited calls and stale summaries served, and response cache hits and misses per list endpoint, for the process handling the request (Manager only).",
+        responses={200: OpenApiTypes.OBJECT},
+        tags=['Content']
+    )
+    def get(self, request):
+        get_breaker(settings.LLM_BACKEND)  # Reported as closed before the first call
+        return Response({'backends': breaker_snapshots(), 'response_cache': response_cache_snapshot()})
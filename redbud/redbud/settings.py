@@ -153,7 +153,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'users.pagination.OptInCursorPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
@@ -208,6 +208,11 @@ SPECTACULAR_SETTINGS = {
         }
     },
 
+    # The three ingestion stage fields share one choice set
+    'ENUM_NAME_OVERRIDES': {
+        'StageStatusEnum': 'content.models.StageStatus',
+    },
+
     # UI customization
     'SWAGGER_UI_SETTINGS': {
         'deepLinking': True,
@@ -228,3 +233,108 @@ SPECTACULAR_SETTINGS = {
 
 
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
+
+GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.5-flash')
+
+# Summary cache
+SUMMARY_CACHE_TTL = int(os.getenv('SUMMARY_CACHE_TTL', 60 * 60 * 24 * 30))  # seconds
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv('SUMMARY_CACHE_MAX_ENTRIES', 10000))
+
+# PDF text extraction
+PDF_EXTRACTION_WORKERS = int(os.getenv('PDF_EXTRACTION_WORKERS', os.cpu_count() or 1))
+PDF_EXTRACTION_PARALLEL_MIN_PAGES = int(os.getenv('PDF_EXTRACTION_PARALLEL_MIN_PAGES', 50))
+
+# Map-reduce summarization for documents larger than one prompt
+SUMMARY_CHUNK_TOKENS = int(os.getenv('SUMMARY_CHUNK_TOKENS', 8000))
+SUMMARY_MAP_CONCURRENCY = int(os.getenv('SUMMARY_MAP_CONCURRENCY', 4))
+
+# Background summary jobs
+SUMMARY_JOB_WORKERS = int(os.getenv('SUMMARY_JOB_WORKERS', 4))
+SUMMARY_JOB_MAX_ATTEMPTS = int(os.getenv('SUMMARY_JOB_MAX_ATTEMPTS', 3))
+SUMMARY_JOB_RETRY_BACKOFF = int(os.getenv('SUMMARY_JOB_RETRY_BACKOFF', 5))  # seconds, doubled per attempt
+SUMMARY_JOB_POLL_INTERVAL = float(os.getenv('SUMMARY_JOB_POLL_INTERVAL', 1))  # seconds
+SUMMARY_JOB_TIMEOUT = int(os.getenv('SUMMARY_JOB_TIMEOUT', 600))  # seconds before a running job is requeued
+SUMMARY_BATCH_WORKERS = int(os.getenv('SUMMARY_BATCH_WORKERS', 8))  # threads for manage.py summarize_training
+
+# Single-flight deduplication of identical concurrent summary requests
+SUMMARY_LOCK_TIMEOUT = int(os.getenv('SUMMARY_LOCK_TIMEOUT', 120))  # seconds
+SUMMARY_LOCK_POLL_INTERVAL = float(os.getenv('SUMMARY_LOCK_POLL_INTERVAL', 0.5))  # seconds
+
+# Retrieval (RAG chat)
+RETRIEVAL_EMBEDDER = os.getenv('RETRIEVAL_EMBEDDER', 'content.retrieval.HashingEmbedder')
+RETRIEVAL_CHUNK_TOKENS = int(os.getenv('RETRIEVAL_CHUNK_TOKENS', 300))
+RETRIEVAL_TOP_K = int(os.getenv('RETRIEVAL_TOP_K', 5))
+RETRIEVAL_EMBED_BATCH_SIZE = int(os.getenv('RETRIEVAL_EMBED_BATCH_SIZE', 100))
+RETRIEVAL_INDEXING_RETRY_AFTER = int(os.getenv('RETRIEVAL_INDEXING_RETRY_AFTER', 5))  # seconds before chat retries
+GEMINI_EMBEDDING_MODEL = os.getenv('GEMINI_EMBEDDING_MODEL', 'gemini-embedding-001')
+
+# Gemini HTTP client
+GEMINI_BASE_URL = os.getenv('GEMINI_BASE_URL', '')  # Override the API endpoint, e.g. for a proxy or a local fake
+GEMINI_MAX_CONNECTIONS = int(os.getenv('GEMINI_MAX_CONNECTIONS', 200))  # Pooled connections per event loop
+
+# Gemini quota shared by all processes; 0 disables a budget
+GEMINI_REQUESTS_PER_MINUTE = int(os.getenv('GEMINI_REQUESTS_PER_MINUTE', 1000))
+GEMINI_TOKENS_PER_MINUTE = int(os.getenv('GEMINI_TOKENS_PER_MINUTE', 1000000))
+GEMINI_RATE_LIMIT_MAX_WAIT = float(os.getenv('GEMINI_RATE_LIMIT_MAX_WAIT', 10))  # seconds to queue before answering 429
+
+# Gemini retries and circuit breaker
+GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', 30))  # seconds per HTTP attempt
+GEMINI_DEADLINE = float(os.getenv('GEMINI_DEADLINE', 60))  # seconds after which no further retry is started
+GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', 2))
+GEMINI_RETRY_BACKOFF = float(os.getenv('GEMINI_RETRY_BACKOFF', 0.5))  # seconds, doubled per retry, with jitter
+GEMINI_RETRY_MAX_BACKOFF = float(os.getenv('GEMINI_RETRY_MAX_BACKOFF', 8))  # seconds
+GEMINI_BREAKER_FAILURE_THRESHOLD = int(os.getenv('GEMINI_BREAKER_FAILURE_THRESHOLD', 5))  # consecutive failed calls
+GEMINI_BREAKER_RESET_TIMEOUT = float(os.getenv('GEMINI_BREAKER_RESET_TIMEOUT', 30))  # seconds open before a trial call
+
+# LLM backends; LLM_BACKEND selects the one used for summaries and chat
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'gemini')
+LLM_BACKENDS = {
+    'gemini': {
+        'BACKEND': 'content.gemini_service.GeminiService',
+        'MODEL': GEMINI_MODEL,
+    },
+    # Deterministic local backend for load tests without network access
+    'stub': {
+        'BACKEND': 'content.stub_backend.StubBackend',
+        'MODEL': 'stub',
+        'OPTIONS': {
+            'latency': float(os.getenv('LLM_STUB_LATENCY', 0.5)),  # seconds per call
+            'jitter': float(os.getenv('LLM_STUB_JITTER', 0)),  # extra random seconds per call
+            'failure_rate': float(os.getenv('LLM_STUB_FAILURE_RATE', 0)),  # share of calls failing, 0 to 1
+            'failure_status': int(os.getenv('LLM_STUB_FAILURE_STATUS', 503)),  # HTTP status injected failures mimic
+        },
+    },
+}
+
+# Ingestion pipeline run by the summary worker for new and changed content
+# Summary lengths precomputed per content, in words; 0 is the default length. 200 is the frontend default.
+INGESTION_SUMMARY_LENGTHS = [
+    int(length) for length in os.getenv('INGESTION_SUMMARY_LENGTHS', '200').split(',') if length.strip()
+]
+
+# Cache shared by all processes when REDIS_URL is set. The local-memory fallback is per process,
+# so access scopes and list responses are then not cached across requests.
+REDIS_URL = os.getenv('REDIS_URL', '')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# Access scopes: the trainings and employees each user may see
+ACCESS_SCOPE_CACHE_TTL = int(os.getenv('ACCESS_SCOPE_CACHE_TTL', 300))  # seconds
+ACCESS_SCOPE_MAX_IDS = int(os.getenv('ACCESS_SCOPE_MAX_IDS', 5000))  # larger id sets are filtered with subqueries
+
+# Delta sync of list endpoints
+SYNC_TOMBSTONE_RETENTION = int(os.getenv('SYNC_TOMBSTONE_RETENTION', 60 * 60 * 24 * 30))  # seconds deletions are kept
+SYNC_OVERLAP = int(os.getenv('SYNC_OVERLAP', 5))  # seconds each sync reaches back for late commits
+
+# Server-side cache of list responses, keyed by role and access scope
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 60))  # seconds; 0 disables the cache
+
+# Content file downloads: '' streams from Django, 'nginx' sends X-Accel-Redirect, 'sendfile' sends X-Sendfile
+MEDIA_SENDFILE_BACKEND = os.getenv('MEDIA_SENDFILE_BACKEND', '')
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')  # internal nginx location
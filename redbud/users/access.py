@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+"""
+Access scope of a user: the trainings and employees they may see.
+
+Viewsets and permissions read the scope instead of each filtering on
+assignments and enrollments with their own subqueries. It is computed once
+per request (get_access_scope) and cached across requests in the default
+cache backend (load_access_scope).
+
+Cache keys include a version number. signals.py bumps it whenever an
+enrollment or a trainer assignment changes, so a changed scope is never
+read again. Bulk operations that bypass signals must call
+invalidate_access_scopes() themselves. ACCESS_SCOPE_CACHE_TTL bounds how
+long unused entries are kept.
+
+A bumped version only reaches the processes that share the cache. With a
+per-process cache (local memory, the default without REDIS_URL) scopes are
+therefore not kept across requests at all; another worker would go on
+granting access that was just revoked.
+
+Managers see everything, so their scope lists no ids. Id sets larger than
+ACCESS_SCOPE_MAX_IDS are not stored; querysets then filter with the
+equivalent subquery.
+"""
+
+import hashlib
+import time
+from typing import FrozenSet, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from .models import Training, User
+
+VERSION_KEY = 'access-scope:version'
+
+
+def _training_ids(user_id: int, role: str):
+    """Subquery of the ids of the trainings a trainer or employee may see."""
+    if role == 'trainer':
+        return Training.objects.filter(assigned_trainer_id=user_id).order_by().values('id')
+    return Training.employees.through.objects.filter(user_id=user_id).values('training_id')
+
+
+def _employee_ids(user_id: int, role: str):
+    """Subquery of the ids of the employees a trainer or employee may see."""
+    if role == 'trainer':
+        return Training.employees.through.objects.filter(training__assigned_trainer_id=user_id).values('user_id')
+    return User.objects.filter(pk=user_id).values('id')
+
+
+class AccessScope(NamedTuple):
+    """What one user may see. Id sets are None when there were too many to store."""
+    user_id: int
+    role: str
+    training_ids: Optional[FrozenSet[int]]
+    employee_ids: Optional[FrozenSet[int]]
+    version: int
+
+    @property
+    def sees_everything(self) -> bool:
+        return self.role == 'manager'
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Hash of what the user may see, which changes only when their own scope does.
+
+        Scopes too large to store fall back to the version, which changes
+        with every enrollment and trainer assignment.
+        """
+        if self.sees_everything:
+            parts = (self.role,)
+        elif self.training_ids is None or self.employee_ids is None:
+            parts = (self.role, self.version)
+        else:
+            parts = (self.role, sorted(self.training_ids), sorted(self.employee_ids))
+        return hashlib.sha256(repr(parts).encode()).hexdigest()[:16]
+
+    def training_filter(self):
+        """Value for a training_id__in lookup. Not meaningful for managers."""
+        if self.training_ids is not None:
+            return self.training_ids
+        return _training_ids(self.user_id, self.role)
+
+    def employee_filter(self):
+        """Value for a user id__in lookup. Not meaningful for managers."""
+        if self.employee_ids is not None:
+            return self.employee_ids
+        return _employee_ids(self.user_id, self.role)
+
+    def can_access_training(self, training_id: int) -> bool:
+        """Whether the user is a manager, the training's trainer or enrolled in it."""
+        if self.sees_everything:
+            return True
+        if self.training_ids is not None:
+            return training_id in self.training_ids
+        return Training.objects.filter(
+            pk=training_id, id__in=_training_ids(self.user_id, self.role)
+        ).exists()
+
+
+def cache_is_shared() -> bool:
+    """Whether the default cache is shared by all processes, so invalidations reach every worker."""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def get_scope_version() -> int:
+    """Return the current scope version, starting a new one if the cache lost it."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Not 1, so entries cached under a lost version are never read again
+        version = time.time_ns()
+        if not cache.add(VERSION_KEY, version, timeout=None):
+            version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def invalidate_access_scopes() -> None:
+    """Bump the scope version, so every cached scope is computed again on next use."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def _id_set(values) -> Optional[FrozenSet[int]]:
+    ids = list(values[:settings.ACCESS_SCOPE_MAX_IDS + 1])
+    if len(ids) > settings.ACCESS_SCOPE_MAX_IDS:
+        return None
+    return frozenset(ids)
+
+
+def load_access_scope(user) -> AccessScope:
+    """Return the user's scope from the shared cache, computing and caching it on a miss."""
+    version = get_scope_version()
+    key = f'access-scope:{version}:{user.pk}:{user.role}'
+    shared = cache_is_shared()
+    scope = cache.get(key) if shared else None
+    if scope is not None:
+        return scope
+
+    if user.role == 'manager':
+        training_ids = employee_ids = frozenset()
+    elif user.role == 'trainer':
+        training_ids = _id_set(_training_ids(user.pk, user.role).values_list('id', flat=True))
+        employee_ids = _id_set(
+            _employee_ids(user.pk, user.role).values_list('user_id', flat=True).distinct()
+        )
+    else:
+        training_ids = _id_set(_training_ids(user.pk, user.role).values_list('training_id', flat=True))
+        employee_ids = frozenset([user.pk])
+
+    scope = AccessScope(user.pk, user.role, training_ids, employee_ids, version)
+    if shared:
+        cache.set(key, scope, timeout=settings.ACCESS_SCOPE_CACHE_TTL)
+    return scope
+
+
+def get_access_scope(request) -> AccessScope:
+    """Return the scope of the request's user, loading it at most once per request."""
+    scope = getattr(request, '_access_scope', None)
+    if scope is None or scope.user_id != request.user.pk:
+        scope = load_access_scope(request.user)
+        request._access_scope = scope
+    return scope
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+"""
+Conditional GET: ETag and Last-Modified validators for read endpoints.
+
+Validators are derived from the rows a response is built from, not from
+the rendered JSON: the latest updated_at of the rows and of the related
+rows the serializer shows, the number of rows, and the fingerprint of the
+user's access scope. Lists read them with one aggregate query. Detail responses compute
+them from the object already loaded for the permission checks. A request
+whose If-None-Match matches gets 304 Not Modified without serializing.
+
+Deleting a row changes no timestamp, only the counts. Last-Modified is
+therefore sent for information, but If-Modified-Since alone never yields
+a 304; clients must revalidate with the ETag. Responses are marked
+`private, no-cache` so browsers always revalidate.
+"""
+
+import hashlib
+
+from django.db.models import Count, Manager, Max
+from django.db.models.constants import LOOKUP_SEP
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .access import get_access_scope
+
+
+def _lookup_values(obj, lookup):
+    """Values at the end of a lookup such as 'modules__created_by__updated_at', following loaded relations."""
+    values = [obj]
+    for name in lookup.split(LOOKUP_SEP):
+        found = []
+        for value in values:
+            if value is None:
+                continue
+            value = getattr(value, name)
+            if isinstance(value, Manager):
+                found.extend(value.all())
+            else:
+                found.append(value)
+        values = found
+    return [value for value in values if value is not None]
+
+
+class ConditionalGetMixin:
+    """Adds the validators described above to list, retrieve and the viewset's own list actions."""
+
+    # updated_at fields of the rows and of every related row the serializers show
+    validator_timestamps = ['updated_at']
+    # Rows and related rows whose removal changes the response
+    validator_counts = ['pk']
+
+    def get_validators(self, timestamps, counts):
+        """Return the (etag, last_modified) of rows with these latest timestamps and counts."""
+        scope = get_access_scope(self.request)
+        last_modified = max((timestamp for timestamp in timestamps if timestamp is not None), default=None)
+        raw = '|'.join(map(str, [
+            self.request.user.pk, scope.fingerprint, *counts,
+            *(timestamp.isoformat() if timestamp else '' for timestamp in timestamps),
+        ]))
+        etag = quote_etag(hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32])
+        return etag, last_modified
+
+    def get_queryset_validators(self, queryset):
+        """Validators of the rows of a queryset, read in one aggregate query."""
+        aggregates = {
+            **{f'max_{i}': Max(lookup) for i, lookup in enumerate(self.validator_timestamps)},
+            **{f'count_{i}': Count(lookup, distinct=True) for i, lookup in enumerate(self.validator_counts)},
+        }
+        values = queryset.order_by().aggregate(**aggregates)
+        return self.get_validators(
+            [values[f'max_{i}'] for i in range(len(self.validator_timestamps))],
+            [values[f'count_{i}'] for i in range(len(self.validator_counts))],
+        )
+
+    def get_instance_validators(self, instance):
+        """Validators of one object whose related rows are already loaded."""
+        return self.get_validators(
+            [max(_lookup_values(instance, lookup), default=None) for lookup in self.validator_timestamps],
+            [len(_lookup_values(instance, lookup)) for lookup in self.validator_counts],
+        )
+
+    def respond_conditionally(self, validators, respond):
+        """304 if the client's copy is current, else respond() with the validators attached."""
+        etag, last_modified = validators
+        # last_modified is left out on purpose, see the module docstring
+        response = get_conditional_response(self.request, etag=etag)
+        if response is None:
+            response = respond()
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified.timestamp())
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list_conditionally(self, queryset, respond):
+        """Conditional response for a list action serializing the given queryset."""
+        return self.respond_conditionally(self.get_queryset_validators(queryset), respond)
+
+    def list(self, request, *args, **kwargs):
+        respond = super().list
+        return self.list_conditionally(
+            self.filter_queryset(self.get_queryset()), lambda: respond(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return self.respond_conditionally(
+            self.get_instance_validators(instance),
+            lambda: Response(self.get_serializer(instance).data),
+        )
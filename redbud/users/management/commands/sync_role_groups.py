@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from users.models import ROLE_GROUPS, User, role_group_id
+
+
+def role_filter(role):
+    """Users whose group is the role's group; unknown roles get the Employee group."""
+    if role == 'employee':
+        return ~Q(role__in=[other for other in ROLE_GROUPS if other != 'employee'])
+    return Q(role=role)
+
+
+class Command(BaseCommand):
+    help = "Put every user in their role's group and no other, e.g. after a migration or bulk import"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Memberships inserted per query')
+
+    def handle(self, *args, **options):
+        Membership = User.groups.through
+        added = removed = 0
+
+        with transaction.atomic():
+            for role in ROLE_GROUPS:
+                group_id = role_group_id(role)
+                users = User.objects.filter(role_filter(role))
+
+                removed += (
+                    Membership.objects.filter(user__in=users.values('id'))
+                    .exclude(group_id=group_id)
+                    .delete()[0]
+                )
+                missing = users.exclude(groups__id=group_id).values_list('id', flat=True)
+                memberships = [Membership(user_id=user_id, group_id=group_id) for user_id in missing.iterator()]
+                Membership.objects.bulk_create(memberships, batch_size=options['batch_size'])
+                added += len(memberships)
+
+        self.stdout.write(self.style.SUCCESS(f"Added {added} group memberships, removed {removed}"))
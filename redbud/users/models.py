@@ -1,5 +1,5 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 
 from .managers import CustomUserManager
@@ -21,6 +21,7 @@ class User(AbstractUser):
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='employee')
     phone_number = models.CharField(max_length=15, blank=True, null=True)
     date_joined = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'role']
@@ -28,6 +29,7 @@ class User(AbstractUser):
     objects = CustomUserManager()
 
     class Meta:
+        indexes = [models.Index(fields=['updated_at'], name='user_updated_at_idx')]
         verbose_name = _('User')
         verbose_name_plural = _('Users')
         permissions = [
@@ -49,24 +51,54 @@ class User(AbstractUser):
     def is_employee(self):
         return self.role == 'employee'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The role whose group the user is known to be in, see save()
+        instance._synced_role = instance.__dict__.get('role')
+        return instance
+
     def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
         super().save(*args, **kwargs)
-        self.assign_role_permissions()
+
+        # Saves that leave the role alone, like last_login on every JWT login, skip the group sync
+        if update_fields is not None and 'role' not in update_fields:
+            return
+        if self.role != getattr(self, '_synced_role', None):
+            self.assign_role_permissions()
 
     def assign_role_permissions(self):
-        """Automatically assign permissions based on user role"""
-        from django.contrib.auth.models import Group
+        """Make the user's role group their only group"""
+        self.groups.set([role_group_id(self.role)])
+        self._synced_role = self.role
+
+
+ROLE_GROUPS = {
+    'manager': 'Manager',
+    'trainer': 'Trainer',
+    'employee': 'Employee',
+}
 
-        self.groups.clear()
+# Group ids by name, kept once the group is committed; cleared by signals when a group changes
+_role_group_ids = {}
 
-        if self.role == 'manager':
-            group, created = Group.objects.get_or_create(name='Manager')
-        elif self.role == 'trainer':
-            group, created = Group.objects.get_or_create(name='Trainer')
-        else:
-            group, created = Group.objects.get_or_create(name='Employee')
 
-        self.groups.add(group)
+def role_group_id(role):
+    """Return the id of the role's group, creating the group if needed"""
+    from django.contrib.auth.models import Group
+
+    name = ROLE_GROUPS.get(role, 'Employee')
+    group_id = _role_group_ids.get(name)
+    if group_id is None:
+        group_id = Group.objects.get_or_create(name=name)[0].pk
+        # Not before commit: a rolled back group would leave a dangling id
+        transaction.on_commit(lambda: _role_group_ids.setdefault(name, group_id))
+    return group_id
+
+
+def clear_role_group_ids():
+    _role_group_ids.clear()
 
 
 class Training(models.Model):
@@ -99,6 +131,12 @@ class Training(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Newest first lists, for all trainings and for one trainer's
+            models.Index(fields=['-created_at'], name='training_created_at_idx'),
+            models.Index(fields=['assigned_trainer', '-created_at'], name='training_trainer_created_idx'),
+            models.Index(fields=['updated_at'], name='training_updated_at_idx'),
+        ]
         verbose_name = 'Training'
         verbose_name_plural = 'Trainings'
 
@@ -121,9 +159,31 @@ class TrainingModule(models.Model):
 
     class Meta:
         ordering = ['training', 'order']
+        indexes = [models.Index(fields=['updated_at'], name='module_updated_at_idx')]
         verbose_name = 'Training Module'
         verbose_name_plural = 'Training Modules'
         unique_together = ['training', 'order']
 
     def __str__(self):
         return f"{self.training.name} - {self.title}"
+
+
+class Tombstone(models.Model):
+    """
+    Record of a deleted object, so delta sync clients learn about deletions
+    """
+    model = models.CharField(max_length=50, help_text="App label and model name, e.g. content.content")
+    object_id = models.BigIntegerField()
+    training_id = models.BigIntegerField(
+        blank=True, null=True, help_text="Training the object belonged to, to show the deletion only to its users"
+    )
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['deleted_at']
+        indexes = [models.Index(fields=['model', 'deleted_at'])]
+        verbose_name = 'Tombstone'
+        verbose_name_plural = 'Tombstones'
+
+    def __str__(self):
+        return f"{self.model} {self.object_id}"
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+"""
+Pagination for the API's list endpoints.
+
+Lists are paginated by page number by default. The frontend relies on the
+`count` that style returns. Clients that walk large lists can opt in to
+keyset (cursor) pagination with `?pagination=cursor`. They then follow the
+`next` links, which carry a `cursor` parameter. Each page is then one
+indexed range query, however deep it is, and there is no COUNT(*).
+"""
+
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination on the view's `cursor_ordering`, by default the primary key.
+
+    Orderings should be unique or nearly unique and unchanging, such as the id.
+    """
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', self.ordering)
+        return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+
+
+class OptInCursorPagination(PageNumberPagination):
+    """Page number pagination, or keyset pagination for requests that ask for it."""
+
+    def __init__(self):
+        self.keyset = None
+
+    @staticmethod
+    def wants_cursor(request) -> bool:
+        params = request.query_params
+        return params.get('pagination') == 'cursor' or KeysetPagination.cursor_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.wants_cursor(request):
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': 'pagination',
+                'required': False,
+                'in': 'query',
+                'description': "Pass 'cursor' for keyset pagination without a total count",
+                'schema': {'type': 'string', 'enum': ['cursor']},
+            },
+            *KeysetPagination().get_schema_operation_parameters(view),
+        ]
@@ -4,6 +4,8 @@
 
 from rest_framework import permissions
 
+from .access import get_access_scope
+
 
 class IsManager(permissions.BasePermission):
     """
@@ -61,18 +63,5 @@ class CanAccessTraining(permissions.BasePermission):
     Permission to check if user can access a training
     """
     def has_object_permission(self, request, view, obj):
-        user = request.user
-
-        # Manager can access all trainings
-        if user.role == 'manager':
-            return True
-
-        # Trainer can access assigned trainings
-        if user.role == 'trainer' and obj.assigned_trainer == user:
-            return True
-
-        # Employee can access their trainings
-        if user.role == 'employee' and user in obj.employees.all():
-            return True
-
-        return False
+        # Managers see all trainings, trainers their assigned ones, employees their enrollments
+        return get_access_scope(request).can_access_training(obj.pk)
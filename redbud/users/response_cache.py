@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+"""
+Server-side cache of the API's list responses.
+
+What a list shows depends on who asks: managers see everything, trainers
+and employees only their access scope (see access.py). Responses are
+therefore cached under the endpoint, the role, the user unless the role
+sees everything, the access-scope version, the host (pagination links are
+absolute) and the query parameters.
+
+Keys also hold a generation number for every model the response shows.
+signals.py bumps a model's generation on post_save, post_delete and
+m2m_changed, at once and again on commit like the scope version, so a
+change is never followed by a cached copy of the old rows. Writes that
+bypass signals must call invalidate_responses() themselves. Saves that
+only record a login are ignored.
+
+Only 200 responses are cached, with their ETag and Last-Modified (see
+conditional.py). A hit whose If-None-Match matches gets 304. Hits and
+misses are counted per endpoint and process and reported by the backend
+metrics endpoint. RESPONSE_CACHE_TTL bounds how long entries are kept;
+0 disables the cache. So does a per-process cache backend, which the
+other workers' invalidations would never reach.
+"""
+
+import hashlib
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import urlencode
+from rest_framework.response import Response
+
+from .access import cache_is_shared, get_access_scope
+
+CACHED_HEADERS = ['ETag', 'Last-Modified', 'Cache-Control']
+
+_stats: Dict[str, Counter] = defaultdict(Counter)
+_stats_lock = threading.Lock()
+
+
+def _generation_key(model) -> str:
+    return f'response-cache:generation:{model._meta.label_lower}'
+
+
+def get_generations(models: Iterable) -> list:
+    """Current generation of each model, starting new ones for models the cache lost."""
+    keys = [_generation_key(model) for model in models]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            # Not 1, so entries cached under a lost generation are never read again
+            cache.add(key, time.time_ns(), timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def invalidate_responses(*models) -> None:
+    """Bump the generation of the models, so responses showing their rows are not served again."""
+    for model in models:
+        key = _generation_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def count(endpoint: str, metric: str) -> None:
+    with _stats_lock:
+        _stats[endpoint][metric] += 1
+
+
+def response_cache_snapshot() -> Dict[str, dict]:
+    """Hits, misses and hit rate of each endpoint in this process, for the metrics endpoint."""
+    with _stats_lock:
+        stats = {endpoint: dict(counts) for endpoint, counts in _stats.items()}
+    for counts in stats.values():
+        lookups = counts.get('hits', 0) + counts.get('misses', 0)
+        counts['hit_rate'] = round(counts.get('hits', 0) / lookups, 4) if lookups else 0.0
+    return stats
+
+
+def reset_response_cache_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+class ResponseCacheMixin:
+    """Caches the responses of list and of actions wrapped in cached_response()."""
+
+    # Models whose rows the cached responses show
+    response_cache_models = []
+
+    def get_response_cache_key(self) -> str:
+        request = self.request
+        scope = get_access_scope(request)
+        generations = ':'.join(map(str, get_generations(self.response_cache_models)))
+        params = urlencode(sorted(request.query_params.lists()), doseq=True)
+        principal = 'all' if scope.sees_everything else request.user.pk
+        return ':'.join(map(str, [
+            'response-cache', self.basename, self.action, scope.role, principal, scope.version, generations,
+            hashlib.sha256(f'{request.get_host()}?{params}'.encode('utf-8')).hexdigest(),
+        ]))
+
+    def cached_response(self, respond):
+        """Return the cached response of this request, or respond() and cache it if it is a 200."""
+        if not settings.RESPONSE_CACHE_TTL or not cache_is_shared():
+            return respond()
+
+        endpoint = f'{self.basename}-{self.action}'
+        key = self.get_response_cache_key()
+        cached = cache.get(key)
+        if cached is not None:
+            count(endpoint, 'hits')
+            data, headers = cached
+            response = None
+            if 'ETag' in headers:
+                response = get_conditional_response(self.request, etag=headers['ETag'])
+            if response is None:
+                response = Response(data)
+            for name, value in headers.items():
+                response[name] = value
+            return response
+
+        count(endpoint, 'misses')
+        response = respond()
+        if response.status_code == 200:
+            headers = {name: response[name] for name in CACHED_HEADERS if name in response}
+            cache.set(key, (response.data, headers), timeout=settings.RESPONSE_CACHE_TTL)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        respond = super().list
+        return self.cached_response(lambda: respond(request, *args, **kwargs))
@@ -80,7 +80,8 @@ class TrainingSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_by', 'created_at', 'updated_at']
 
     def get_employee_count(self, obj)-> int:
-        return obj.employees.count()
+        # Counts the employees already loaded for the employees field
+        return len(obj.employees.all())
 
 
 class TrainingListSerializer(serializers.ModelSerializer):
@@ -97,6 +98,9 @@ class TrainingListSerializer(serializers.ModelSerializer):
                   'created_by_name', 'assigned_trainer_name', 'module_count', 'is_active']
 
     def get_module_count(self, obj)-> int:
+        # Annotated by TrainingViewSet.get_queryset
+        if hasattr(obj, 'module_count'):
+            return obj.module_count
         return obj.modules.count()
 
 
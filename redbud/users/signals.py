@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+"""
+Signal handlers for the users app.
+
+Deleted users, trainings and modules leave tombstones for delta sync
+(see sync.py). The in-process cache of role group ids is cleared when a group changes.
+Cached access scopes (see access.py) are invalidated when an enrollment or
+a trainer assignment changes. The version is bumped at once, so this
+process stops reading the old scopes, and again on commit, so a scope read
+by a concurrent request before the commit is not kept either. Cached list
+responses (see response_cache.py) are invalidated the same way whenever a
+user, training, module or enrollment changes.
+"""
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.contrib.auth.models import Group
+from django.dispatch import receiver
+
+from .access import invalidate_access_scopes
+from .models import Training, TrainingModule, User, clear_role_group_ids
+from .response_cache import invalidate_responses
+from .sync import record_tombstone
+
+
+def _invalidate():
+    invalidate_access_scopes()
+    transaction.on_commit(invalidate_access_scopes)
+
+
+def _invalidate_responses(model):
+    invalidate_responses(model)
+    transaction.on_commit(lambda: invalidate_responses(model))
+
+
+@receiver(m2m_changed, sender=Training.employees.through)
+def enrollment_changed(sender, action, **kwargs):
+    """Invalidate scopes when employees are added to or removed from a training."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _invalidate()
+        _invalidate_responses(Training)
+
+
+@receiver(pre_save, sender=Training)
+def detect_trainer_change(sender, instance, **kwargs):
+    """Note whether a save assigns the training to a different trainer."""
+    if instance.pk is None:
+        return
+    previous = Training.objects.filter(pk=instance.pk).values_list('assigned_trainer_id', flat=True).first()
+    instance._trainer_changed = previous != instance.assigned_trainer_id
+
+
+@receiver(post_save, sender=Training)
+def training_saved(sender, instance, created, **kwargs):
+    """Invalidate scopes when a training is created or reassigned."""
+    trainer_changed = getattr(instance, '_trainer_changed', False)
+    instance._trainer_changed = False
+    if created or trainer_changed:
+        _invalidate()
+
+
+@receiver(post_delete, sender=Training)
+def training_deleted(sender, instance, **kwargs):
+    """Invalidate scopes when a training and its enrollments are deleted."""
+    record_tombstone(instance, training_id=instance.pk)
+    _invalidate()
+
+
+@receiver(post_delete, sender=TrainingModule)
+def module_deleted(sender, instance, **kwargs):
+    record_tombstone(instance, training_id=instance.training_id)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    record_tombstone(instance)
+
+
+@receiver(post_save, sender=Training)
+@receiver(post_delete, sender=Training)
+@receiver(post_save, sender=TrainingModule)
+@receiver(post_delete, sender=TrainingModule)
+@receiver(post_delete, sender=User)
+def rows_changed(sender, **kwargs):
+    """Invalidate cached responses showing rows of the model."""
+    _invalidate_responses(sender)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, update_fields=None, **kwargs):
+    """Invalidate cached responses showing users, unless the save only recorded a login."""
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    _invalidate_responses(User)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, **kwargs):
+    """Forget cached role group ids when a group is renamed or deleted."""
+    clear_role_group_ids()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+"""
+Delta sync: clients download only what changed since their last sync.
+
+`GET <list endpoint>/changes/?updated_since=<ISO 8601 time>` returns the
+visible objects created or updated after that time. Results come in keyset
+pages ordered by (updated_at, id). The first page also lists the ids of
+objects removed since then: deleted, or no longer visible to the user.
+Clients keep the `synced_at` of the last page and pass it as
+updated_since next time.
+
+Each query reaches SYNC_OVERLAP seconds further back than updated_since.
+A save that commits late, with an earlier updated_at, is therefore still
+picked up; clients must apply changes idempotently. Deletions are kept as
+Tombstone rows for SYNC_TOMBSTONE_RETENTION seconds. An older
+updated_since gets 410 Gone and the client must download everything
+again. It must also do so when `access_version` changes, because
+enrollments and trainer assignments change what a user may see without
+touching updated_at. The value is a fingerprint of the user's own scope,
+so changes to other users' enrollments do not force a resync.
+"""
+
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .access import get_access_scope
+from .models import Tombstone
+from .pagination import KeysetPagination
+
+
+def record_tombstone(instance, training_id=None) -> None:
+    """Record the deletion of an object and drop tombstones past their retention."""
+    Tombstone.objects.create(
+        model=instance._meta.label_lower, object_id=instance.pk, training_id=training_id
+    )
+    cutoff = timezone.now() - timedelta(seconds=settings.SYNC_TOMBSTONE_RETENTION)
+    Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+
+
+class ChangesPagination(KeysetPagination):
+    def get_ordering(self, request, queryset, view):
+        return ('updated_at', 'id')
+
+
+class DeltaSyncMixin:
+    """Adds the `changes` action described above to a model viewset."""
+
+    def get_removed_ids(self, since, scope):
+        """Ids of objects deleted since the given time that the user could see."""
+        tombstones = Tombstone.objects.filter(
+            model=self.get_queryset().model._meta.label_lower, deleted_at__gt=since
+        )
+        if not scope.sees_everything:
+            tombstones = tombstones.filter(Q(training_id__isnull=True) | Q(training_id__in=scope.training_filter()))
+        return list(tombstones.values_list('object_id', flat=True))
+
+    @extend_schema(
+        summary="Get changes since a time",
+        description="Objects created or updated after updated_since, in pages ordered by update time, with the ids of objects removed since then on the first page. Store synced_at and pass it as updated_since next time. Resync in full after 410 Gone or when access_version changes.",
+        parameters=[
+            OpenApiParameter(
+                name='updated_since',
+                type=OpenApiTypes.DATETIME,
+                location=OpenApiParameter.QUERY,
+                description='synced_at of the previous sync',
+                required=True,
+            ),
+            OpenApiParameter(
+                name='cursor',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='The pagination cursor value',
+                required=False,
+            ),
+        ],
+        responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT, 410: OpenApiTypes.OBJECT},
+    )
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """Return objects changed and removed since updated_since"""
+        try:
+            since = parse_datetime(request.query_params.get('updated_since', ''))
+        except ValueError:
+            # Well formed but not a valid date, e.g. month 13
+            since = None
+        if since is None:
+            return Response(
+                {'error': 'updated_since must be an ISO 8601 date and time'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since, dt_timezone.utc)
+
+        synced_at = timezone.now()
+        if since < synced_at - timedelta(seconds=settings.SYNC_TOMBSTONE_RETENTION):
+            return Response(
+                {'error': 'updated_since is older than the deletion history, resync in full'},
+                status=status.HTTP_410_GONE,
+            )
+
+        since -= timedelta(seconds=settings.SYNC_OVERLAP)
+        scope = get_access_scope(request)
+        queryset = self.filter_queryset(self.get_queryset()).filter(updated_at__gt=since)
+
+        paginator = ChangesPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        first_page = paginator.cursor_query_param not in request.query_params
+
+        return Response({
+            'next': paginator.get_next_link(),
+            'results': self.get_serializer(page, many=True).data,
+            'removed': self.get_removed_ids(since, scope) if first_page else [],
+            'synced_at': synced_at,
+            'access_version': scope.fingerprint,
+        })
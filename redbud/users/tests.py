@@ -1,3 +1,453 @@
-from django.test import TestCase
+from django.contrib.auth.models import Group, update_last_login
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory
+from rest_framework import status
+from .access import invalidate_access_scopes, load_access_scope
+from .models import User, Training, TrainingModule, clear_role_group_ids
+from .permissions import CanAccessTraining
+from .response_cache import reset_response_cache_stats, response_cache_snapshot
+from content.models import Content
+from content.permissions import IsManagerOrTrainerForContent
+from content.tests.base import ContentFixtureMixin, SharedCacheMixin
+from unittest.mock import MagicMock, patch
+from datetime import date
+from io import StringIO
 
-# Create your tests here.
+
+class TestTrainingQueryCounts(SharedCacheMixin, ContentFixtureMixin, APITestCase):
+    """Training endpoints keep a fixed query count as trainings grow, and their ETags and cached lists follow changes."""
+
+    def setUp(self):
+        super().setUp()
+        self.manager = self.user
+        self.trainer = self.make_user("trainer", "trainer")
+        self.employee = self.make_user("employee", "employee")
+
+    def create_trainings(self, count):
+        trainings = Training.objects.bulk_create([
+            Training(
+                name=f"Training {i}",
+                description="Description",
+                start_date=date.today(),
+                end_date=date.today(),
+                duration_days=1,
+                created_by=self.manager,
+                assigned_trainer=self.trainer,
+            )
+            for i in range(count)
+        ])
+        TrainingModule.objects.bulk_create([
+            TrainingModule(
+                training=training,
+                title=f"Module {order}",
+                description="Description",
+                order=order,
+                duration_hours=1,
+                created_by=self.trainer,
+            )
+            for training in trainings
+            for order in range(3)
+        ])
+        Training.employees.through.objects.bulk_create([
+            Training.employees.through(training_id=training.id, user_id=self.employee.id)
+            for training in trainings
+        ])
+        invalidate_access_scopes()  # bulk_create sends no signals
+        return trainings
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries), response
+
+    def test_list_1000_trainings(self):
+        """Test each role lists 1000 trainings with their validators, a COUNT and one SELECT"""
+        self.create_trainings(1000)
+
+        # The manager also sees the fixture's own training
+        for user, count in ((self.manager, 1001), (self.trainer, 1000), (self.employee, 1000)):
+            self.client.force_authenticate(user=user)
+            load_access_scope(user)  # Cached by the user's first request
+            queries, response = self.count_queries(reverse("training-list"))
+
+            self.assertEqual(queries, 3)
+            self.assertEqual(response.data["count"], count)
+            self.assertEqual(response.data["results"][0]["module_count"], 3)
+            self.assertEqual(response.data["results"][0]["assigned_trainer_name"], self.trainer.get_full_name())
+
+    def test_detail(self):
+        """Test training detail with its employees and modules is read in three queries"""
+        training = self.create_trainings(1)[0]
+        employees = [
+            User.objects.create_user(
+                username=f"employee{i}",
+                password="testpass",
+                email=f"employee{i}@email.com",
+                role="employee",
+            )
+            for i in range(3)
+        ]
+        url = reverse("training-detail", kwargs={"pk": training.id})
+        self.client.force_authenticate(user=self.manager)
+
+        counts = []
+        for employee in employees:
+            training.employees.add(employee)
+            queries, response = self.count_queries(url)
+            counts.append(queries)
+
+        self.assertEqual(counts, [3, 3, 3])
+        self.assertEqual(response.data["employee_count"], 4)
+        self.assertEqual(len(response.data["modules"]), 3)
+
+    def test_conditional_detail(self):
+        """Test unchanged training detail is 304 and module changes change its ETag"""
+        training = self.create_trainings(1)[0]
+        url = reverse("training-detail", kwargs={"pk": training.id})
+        self.client.force_authenticate(user=self.employee)
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(3):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        training.modules.last().delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["modules"]), 2)
+
+        self.trainer.first_name = "Renamed"
+        self.trainer.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.data["modules"][0]["created_by_name"], self.trainer.get_full_name())
+
+    def test_conditional_list(self):
+        """Test an unchanged training list is 304 and a new enrollment changes its ETag"""
+        self.create_trainings(2)
+        url = reverse("training-list")
+        self.client.force_authenticate(user=self.employee)
+        etag = self.client.get(url)["ETag"]
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.create_trainings(1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 3)
+
+    def test_cached_lists_follow_changes(self):
+        """Test cached lists see new modules and enrollments but survive logins"""
+        training = self.create_trainings(1)[0]
+        reset_response_cache_stats()
+        self.client.force_authenticate(user=self.manager)
+        self.client.get(reverse("training-list"))
+
+        TrainingModule.objects.create(
+            training=training, title="Extra", description="", order=3, duration_hours=1, created_by=self.trainer
+        )
+        response = self.client.get(reverse("training-list"))
+        self.assertEqual(response.data["results"][0]["module_count"], 4)
+
+        self.client.get(reverse("user-list"))
+        update_last_login(None, self.employee)
+        self.client.get(reverse("user-list"))
+        self.assertEqual(response_cache_snapshot()["user-list"], {"misses": 1, "hits": 1, "hit_rate": 0.5})
+
+        self.client.force_authenticate(user=self.employee)
+        self.client.get(reverse("training-list"))
+        self.create_trainings(1)[0].employees.add(self.employee)
+        self.assertEqual(self.client.get(reverse("training-list")).data["count"], 2)
+
+    def test_employee_count_after_assignment(self):
+        """Test the count returned by assign_employees reflects the new enrollment"""
+        training = self.create_trainings(1)[0]
+        self.client.force_authenticate(user=self.manager)
+
+        url = reverse("training-assign-employees", kwargs={"pk": training.id})
+        response = self.client.post(url, {"employee_ids": []}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["employee_count"], 0)
+        self.assertEqual(response.data["employees"], [])
+
+
+class TestAccessPermissions(SharedCacheMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.manager = User.objects.create_user(
+            username="manager",
+            password="testpass",
+            email="manager@email.com",
+            role="manager",
+        )
+        self.trainer = User.objects.create_user(
+            username="trainer",
+            password="testpass",
+            email="trainer@email.com",
+            role="trainer",
+        )
+        self.training = Training.objects.create(
+            name="Test Training",
+            description="Description",
+            start_date=date.today(),
+            end_date=date.today(),
+            duration_days=1,
+            created_by=self.manager,
+            assigned_trainer=self.trainer,
+        )
+        self.employees = User.objects.bulk_create([
+            User(username=f"employee{i}", email=f"employee{i}@email.com", role="employee")
+            for i in range(500)
+        ])
+        self.training.employees.add(*self.employees[:-1])
+        self.content = Content.objects.create(
+            title="Test Content",
+            training=self.training,
+            content_type="text",
+            text_content="This is a sample text content for testing.",
+            created_by=self.manager,
+        )
+
+    def check(self, permission, user, obj):
+        request = APIRequestFactory().get("/")
+        request.user = user
+        return permission.has_object_permission(request, MagicMock(action="retrieve"), obj)
+
+    def test_training_access(self):
+        """Test access follows enrollment and trainer assignment"""
+        enrolled, outsider = self.employees[0], self.employees[-1]
+
+        self.assertTrue(self.check(CanAccessTraining(), enrolled, self.training))
+        self.assertFalse(self.check(CanAccessTraining(), outsider, self.training))
+        self.assertTrue(self.check(CanAccessTraining(), self.trainer, self.training))
+        self.assertTrue(self.check(CanAccessTraining(), self.manager, self.training))
+
+    def test_scope_is_cached_across_requests(self):
+        """Test the scope costs one query for the first request and none after that"""
+        enrolled = self.employees[0]
+
+        with self.assertNumQueries(1):
+            self.assertTrue(self.check(CanAccessTraining(), enrolled, self.training))
+        with self.assertNumQueries(0):
+            self.assertTrue(self.check(CanAccessTraining(), enrolled, self.training))
+            self.assertTrue(self.check(IsManagerOrTrainerForContent(), enrolled, self.content))
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_scope_is_not_kept_in_a_local_cache(self):
+        """Test a per-process cache is not trusted with scopes another worker could not invalidate"""
+        enrolled = self.employees[0]
+
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.assertTrue(self.check(CanAccessTraining(), enrolled, self.training))
+
+    def test_invalidation_reaches_other_processes(self):
+        """Test an enrollment removed in one worker is seen by another worker that cached the scope"""
+        enrolled = self.employees[0]
+        worker_a, worker_b = caches.create_connection("default"), caches.create_connection("default")
+
+        with patch("users.access.cache", worker_a):
+            self.assertTrue(self.check(CanAccessTraining(), enrolled, self.training))
+            with self.assertNumQueries(0):
+                self.assertTrue(self.check(CanAccessTraining(), enrolled, self.training))
+
+        with patch("users.access.cache", worker_b), self.captureOnCommitCallbacks(execute=True):
+            self.training.employees.remove(enrolled)
+
+        with patch("users.access.cache", worker_a):
+            self.assertFalse(self.check(CanAccessTraining(), enrolled, self.training))
+
+    def test_scope_is_invalidated(self):
+        """Test enrollment and trainer changes are seen at once despite the cache"""
+        outsider = self.employees[-1]
+        other_trainer = User.objects.create_user(
+            username="trainer2",
+            password="testpass",
+            email="trainer2@email.com",
+            role="trainer",
+        )
+        self.assertFalse(self.check(CanAccessTraining(), outsider, self.training))
+        self.assertTrue(self.check(CanAccessTraining(), self.trainer, self.training))
+
+        self.training.employees.add(outsider)
+        self.assertTrue(self.check(CanAccessTraining(), outsider, self.training))
+
+        self.training.employees.remove(outsider)
+        self.assertFalse(self.check(CanAccessTraining(), outsider, self.training))
+
+        self.training.assigned_trainer = other_trainer
+        self.training.save()
+        self.assertFalse(self.check(CanAccessTraining(), self.trainer, self.training))
+        self.assertTrue(self.check(CanAccessTraining(), other_trainer, self.training))
+
+    @override_settings(ACCESS_SCOPE_MAX_IDS=10)
+    def test_large_scope_uses_subqueries(self):
+        """Test a trainer with too many employees to store filters them with a subquery"""
+        scope = load_access_scope(self.trainer)
+        self.assertIsNone(scope.employee_ids)
+
+        self.client.force_authenticate(user=self.trainer)
+        response = self.client.get(reverse("user-list"))
+        self.assertEqual(response.data["count"], 500)
+
+    @override_settings(ACCESS_SCOPE_MAX_IDS=0)
+    def test_training_access_without_stored_ids(self):
+        """Test each role's training check is right when the scope is too large to store"""
+        other = Training.objects.create(
+            name="Other Training",
+            start_date=date.today(),
+            end_date=date.today(),
+            duration_days=1,
+            created_by=self.manager,
+        )
+        outsider = self.employees[-1]
+        other.employees.add(outsider)
+        for user in (self.trainer, outsider):
+            self.assertIsNone(load_access_scope(user).training_ids)
+
+        self.assertTrue(load_access_scope(self.manager).can_access_training(other.id))
+        self.assertTrue(load_access_scope(self.trainer).can_access_training(self.training.id))
+        self.assertFalse(load_access_scope(self.trainer).can_access_training(other.id))
+        self.assertTrue(load_access_scope(outsider).can_access_training(other.id))
+        self.assertFalse(load_access_scope(outsider).can_access_training(self.training.id))
+
+    def test_content_access(self):
+        """Test content read access for enrolled employees and the assigned trainer"""
+        enrolled, outsider = self.employees[0], self.employees[-1]
+        content = Content.objects.select_related("training").get()
+
+        self.assertTrue(self.check(IsManagerOrTrainerForContent(), enrolled, content))
+        self.assertFalse(self.check(IsManagerOrTrainerForContent(), outsider, content))
+        self.assertTrue(self.check(IsManagerOrTrainerForContent(), self.trainer, content))
+
+
+class TestRoleGroups(APITestCase):
+    def setUp(self):
+        clear_role_group_ids()
+        self.addCleanup(clear_role_group_ids)  # Ids of groups rolled back with the test
+        self.user = User.objects.create_user(
+            username="employee",
+            password="testpass",
+            email="employee@email.com",
+            role="employee",
+        )
+
+    def group_names(self, user):
+        return list(user.groups.values_list("name", flat=True))
+
+    def test_new_user_gets_role_group(self):
+        """Test a new user is put in their role's group"""
+        self.assertEqual(self.group_names(self.user), ["Employee"])
+
+    def test_saves_without_role_change_skip_sync(self):
+        """Test logins and other saves that keep the role run only their UPDATE"""
+        with self.assertNumQueries(1):
+            update_last_login(None, self.user)
+
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = "Ann"
+        with self.assertNumQueries(1):
+            user.save()
+
+    def test_role_change_moves_group(self):
+        """Test changing the role replaces the old role group with the new one"""
+        user = User.objects.get(pk=self.user.pk)
+        user.role = "trainer"
+        user.save()
+
+        self.assertEqual(self.group_names(user), ["Trainer"])
+
+    def test_group_ids_are_cached_once_committed(self):
+        """Test the role group is looked up once and then read from the cache"""
+        user = User.objects.get(pk=self.user.pk)
+        user.role = "trainer"
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+
+        user.role = "employee"
+        user.save()
+        user.role = "trainer"
+        with patch.object(Group.objects, "get_or_create") as get_or_create:
+            user.save()
+        get_or_create.assert_not_called()
+        self.assertEqual(self.group_names(user), ["Trainer"])
+
+    def test_sync_role_groups_command(self):
+        """Test the command fixes memberships of users created without signals"""
+        User.objects.bulk_create([
+            User(username="manager", email="manager@email.com", role="manager"),
+            User(username="trainer", email="trainer@email.com", role="trainer"),
+        ])
+        self.user.groups.add(Group.objects.create(name="Stale"))
+
+        out = StringIO()
+        call_command("sync_role_groups", stdout=out)
+
+        self.assertIn("Added 2 group memberships, removed 1", out.getvalue())
+        for user in User.objects.all():
+            self.assertEqual(self.group_names(user), [user.get_role_display()])
+
+
+class TestUserSync(APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user(
+            username="manager",
+            password="testpass",
+            email="manager@email.com",
+            role="manager",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+
+    def test_trainings_cursor_pages_newest_first(self):
+        """Test keyset pages of trainings follow the list's newest-first order"""
+        trainings = [
+            Training.objects.create(
+                name=f"Training {i}",
+                description="Description",
+                start_date=date.today(),
+                end_date=date.today(),
+                duration_days=1,
+                created_by=self.manager,
+            )
+            for i in range(3)
+        ]
+
+        response = self.client.get(reverse("training-list"), {"pagination": "cursor", "page_size": 2})
+
+        self.assertEqual([t["id"] for t in response.data["results"]], [trainings[2].id, trainings[1].id])
+        self.assertIsNotNone(response.data["next"])
+
+    @override_settings(SYNC_OVERLAP=0)
+    def test_user_changes(self):
+        """Test edited and deleted users are returned by the users changes endpoint"""
+        employee = User.objects.create_user(
+            username="employee",
+            password="testpass",
+            email="employee@email.com",
+            role="employee",
+        )
+        since = timezone.now()
+        employee.first_name = "Ann"
+        employee.save()
+        removed = User.objects.create_user(
+            username="removed",
+            password="testpass",
+            email="removed@email.com",
+            role="employee",
+        )
+        removed_id = removed.id
+        removed.delete()
+
+        response = self.client.get(reverse("user-changes"), {"updated_since": since.isoformat()})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([user["first_name"] for user in response.data["results"]], ["Ann"])
+        self.assertEqual(response.data["removed"], [removed_id])
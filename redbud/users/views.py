@@ -3,7 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.views import TokenObtainPairView
-from django.db.models import Q
+from django.db.models import Count, Prefetch, Q
 from drf_spectacular.utils import (
     extend_schema,
     extend_schema_view,
@@ -12,6 +12,14 @@ from drf_spectacular.utils import (
 )
 from drf_spectacular.types import OpenApiTypes
 
+from content.batches import start_summary_batch
+from content.models import SummaryBatch
+from content.serializers import SummaryBatchSerializer
+from content.summaries import parse_max_length
+from .access import get_access_scope
+from .conditional import ConditionalGetMixin
+from .response_cache import ResponseCacheMixin
+from .sync import DeltaSyncMixin
 from .models import User, Training, TrainingModule
 from .serializers import (
     UserSerializer,
@@ -73,8 +81,9 @@ class RegisterView(generics.CreateAPIView):
         description="Delete a user from the system (Manager only).",
         tags=["Users"],
     ),
+    changes=extend_schema(tags=["Users"]),
 )
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ResponseCacheMixin, DeltaSyncMixin, viewsets.ModelViewSet):
     """
     ViewSet for User management with role-based access control.
     """
@@ -82,6 +91,7 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    response_cache_models = [User]
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -97,17 +107,12 @@ class UserViewSet(viewsets.ModelViewSet):
         user = self.request.user
 
         if user.role == "manager":
-            return User.objects.all()
+            return User.objects.order_by("id")
         elif user.role == "trainer":
-            training_ids = Training.objects.filter(assigned_trainer=user).values_list(
-                "id", flat=True
-            )
-            employee_ids = Training.objects.filter(id__in=training_ids).values_list(
-                "employees", flat=True
-            )
-            return User.objects.filter(Q(id=user.id) | Q(id__in=employee_ids))
+            employee_ids = get_access_scope(self.request).employee_filter()
+            return User.objects.filter(Q(id=user.id) | Q(id__in=employee_ids)).order_by("id")
         else:
-            return User.objects.filter(id=user.id)
+            return User.objects.filter(id=user.id).order_by("id")
 
     @extend_schema(
         summary="Get current user information",
@@ -145,8 +150,7 @@ class UserViewSet(viewsets.ModelViewSet):
             users = User.objects.filter(role=role)
         else:
             users = User.objects.all()
-        serializer = UserListSerializer(users, many=True)
-        return Response(serializer.data)
+        return self.cached_response(lambda: Response(UserListSerializer(users, many=True).data))
 
 
 @extend_schema_view(
@@ -180,8 +184,9 @@ class UserViewSet(viewsets.ModelViewSet):
         description="Delete a training (Manager only).",
         tags=["Trainings"],
     ),
+    changes=extend_schema(tags=["Trainings"]),
 )
-class TrainingViewSet(viewsets.ModelViewSet):
+class TrainingViewSet(ResponseCacheMixin, ConditionalGetMixin, DeltaSyncMixin, viewsets.ModelViewSet):
     """
     ViewSet for Training management with role-based permissions.
     """
@@ -189,6 +194,17 @@ class TrainingViewSet(viewsets.ModelViewSet):
     queryset = Training.objects.all()
     serializer_class = TrainingSerializer
     permission_classes = [IsAuthenticated]
+    cursor_ordering = "-id"  # Newest first, like the page-numbered list
+    # Names of the creator and trainer, and the modules with their creators' names
+    validator_timestamps = [
+        "updated_at",
+        "created_by__updated_at",
+        "assigned_trainer__updated_at",
+        "modules__updated_at",
+        "modules__created_by__updated_at",
+    ]
+    validator_counts = ["pk", "modules"]
+    response_cache_models = [Training, TrainingModule, User]
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -198,19 +214,29 @@ class TrainingViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         if self.action in ["create", "destroy"]:
             return [IsManager()]
-        elif self.action in ["update", "partial_update"]:
+        elif self.action in ["update", "partial_update", "summarize"]:
             return [IsManagerOrTrainer()]
         return [IsAuthenticated()]
 
     def get_queryset(self):
-        user = self.request.user
-
-        if user.role == "manager":
-            return Training.objects.all()
-        elif user.role == "trainer":
-            return Training.objects.filter(assigned_trainer=user)
+        scope = get_access_scope(self.request)
+        if scope.sees_everything:
+            queryset = Training.objects.all()
         else:
-            return Training.objects.filter(employees=user)
+            queryset = Training.objects.filter(id__in=scope.training_filter())
+
+        queryset = queryset.select_related("created_by", "assigned_trainer")
+        if self.action == "list":
+            # Meta.ordering is not applied to GROUP BY queries, so it is repeated here
+            return queryset.annotate(module_count=Count("modules")).order_by(*Training._meta.ordering)
+        if self.action == "summarize":
+            return queryset
+
+        # TrainingSerializer lists employee ids and nests the modules with their creators
+        return queryset.prefetch_related(
+            Prefetch("employees", queryset=User.objects.only("id")),
+            Prefetch("modules", queryset=TrainingModule.objects.select_related("created_by")),
+        )
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -258,6 +284,56 @@ class TrainingViewSet(viewsets.ModelViewSet):
                 {"error": "Trainer not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
+    @extend_schema(
+        methods=["POST"],
+        summary="Summarize all training content",
+        description="Queue AI summaries for every active text and PDF content of the training (Manager or assigned Trainer). Contents with a cached summary are skipped; the rest are processed by the background summary worker. Returns 202 with the batch and its progress.",
+        request={"application/json": {"example": {"max_length": 200}}},
+        responses={202: SummaryBatchSerializer, 400: OpenApiTypes.OBJECT},
+        tags=["Trainings"],
+    )
+    @extend_schema(
+        methods=["GET"],
+        summary="Get training summarization progress",
+        description="Progress of the latest summarization batch of the training, or of the batch given by the 'batch' query parameter.",
+        parameters=[
+            OpenApiParameter(
+                name="batch",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Batch ID (default: latest)",
+                required=False,
+            )
+        ],
+        responses={200: SummaryBatchSerializer, 404: OpenApiTypes.OBJECT},
+        tags=["Trainings"],
+    )
+    @action(detail=True, methods=["get", "post"])
+    def summarize(self, request, pk=None):
+        """Start or poll summarization of all content in a training"""
+        training = self.get_object()
+
+        if request.method == "GET":
+            batches = SummaryBatch.objects.filter(training=training)
+            batch_id = request.query_params.get("batch")
+            if batch_id and not batch_id.isdigit():
+                return Response({"error": "batch must be a batch id"}, status=status.HTTP_400_BAD_REQUEST)
+            batch = batches.filter(id=batch_id).first() if batch_id else batches.first()
+            if batch is None:
+                return Response(
+                    {"error": "No summarization batch found for this training"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            return Response(SummaryBatchSerializer(batch).data)
+
+        try:
+            max_length = parse_max_length(request.data.get("max_length"))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        batch = start_summary_batch(training, max_length, request.user)
+        return Response(SummaryBatchSerializer(batch).data, status=status.HTTP_202_ACCEPTED)
+
 
 @extend_schema_view(
     list=extend_schema(
@@ -285,8 +361,9 @@ class TrainingViewSet(viewsets.ModelViewSet):
         description="Delete a training module (Manager or assigned Trainer).",
         tags=["Training Modules"],
     ),
+    changes=extend_schema(tags=["Training Modules"]),
 )
-class TrainingModuleViewSet(viewsets.ModelViewSet):
+class TrainingModuleViewSet(ResponseCacheMixin, DeltaSyncMixin, viewsets.ModelViewSet):
     """
     ViewSet for TrainingModule management.
     """
@@ -294,6 +371,7 @@ class TrainingModuleViewSet(viewsets.ModelViewSet):
     queryset = TrainingModule.objects.all()
     serializer_class = TrainingModuleSerializer
     permission_classes = [IsAuthenticated]
+    response_cache_models = [TrainingModule, User]
 
     def get_permissions(self):
         if self.action in ["create", "update", "partial_update", "destroy"]:
@@ -301,18 +379,10 @@ class TrainingModuleViewSet(viewsets.ModelViewSet):
         return [IsAuthenticated()]
 
     def get_queryset(self):
-        user = self.request.user
-
-        if user.role == "manager":
+        scope = get_access_scope(self.request)
+        if scope.sees_everything:
             return TrainingModule.objects.all()
-        elif user.role == "trainer":
-            training_ids = Training.objects.filter(assigned_trainer=user).values_list(
-                "id", flat=True
-            )
-            return TrainingModule.objects.filter(training_id__in=training_ids)
-        else:
-            training_ids = user.trainings.values_list("id", flat=True)
-            return TrainingModule.objects.filter(training_id__in=training_ids)
+        return TrainingModule.objects.filter(training_id__in=scope.training_filter())
 
     def perform_create(self, serializer):
         training = serializer.validated_data.get("training")
@@ -347,8 +417,7 @@ class TrainingModuleViewSet(viewsets.ModelViewSet):
         training_id = request.query_params.get("training_id", None)
         if training_id:
             modules = self.get_queryset().filter(training_id=training_id)
-            serializer = self.get_serializer(modules, many=True)
-            return Response(serializer.data)
+            return self.cached_response(lambda: Response(self.get_serializer(modules, many=True).data))
         return Response(
             {"error": "training_id parameter is required"},
             status=status.HTTP_400_BAD_REQUEST,